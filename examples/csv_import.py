@@ -107,35 +107,42 @@ def calculate_and_show(
 
 
 def export_to_csv(
-    usage: pd.Series,
+    source: str,
     plan_id: str = "residential_simple_2_tier",
     filename: str = "result.csv",
+    chunk_size: int = 100_000,
 ) -> None:
-    """Export hourly results to CSV file."""
-    # Calculate hourly costs by multiplying usage by rate at each timepoint
+    """Export hourly results to CSV file, reading and writing in chunks."""
     plan = tou.plan(plan_id)
-
-    # Get the rate for each hour
-    context_df = plan.profile.evaluate(usage.index)
-    hourly_rates = []
-    for _, row in context_df.iterrows():
-        season = row["season"]
-        period = row["period"]
-        rate = plan.rates.get_cost(season, period)
-        hourly_rates.append(rate)
-
-    # Calculate hourly costs
-    hourly_costs = usage.values * pd.Series(hourly_rates, index=usage.index).values
-
-    result = pd.DataFrame(
-        {
-            "timestamp": usage.index.strftime("%Y-%m-%d %H:%M"),
-            "usage_kwh": usage.values,
-            "rate_twd_per_kwh": hourly_rates,
-            "cost_twd": hourly_costs,
-        }
-    )
-    result.to_csv(filename, index=False, encoding="utf-8-sig")
+    rate_map: dict[tuple[str, str], float] = {}
+
+    reader = pd.read_csv(source, encoding="utf-8-sig", chunksize=chunk_size)
+    for i, chunk in enumerate(reader):
+        timestamps = pd.DatetimeIndex(pd.to_datetime(chunk["timestamp"]))
+        usage = chunk["usage_kwh"].to_numpy(dtype=float)
+
+        # Look up each (season, period) pair once across all chunks
+        context_df = plan.profile.evaluate(timestamps)
+        keys = pd.MultiIndex.from_frame(context_df[["season", "period"]])
+        for key in keys.unique():
+            if key not in rate_map:
+                rate_map[key] = plan.rates.get_cost(*key)
+        rates = keys.map(rate_map).to_numpy(dtype=float)
+
+        pd.DataFrame(
+            {
+                "timestamp": timestamps.strftime("%Y-%m-%d %H:%M"),
+                "usage_kwh": usage,
+                "rate_twd_per_kwh": rates,
+                "cost_twd": usage * rates,
+            }
+        ).to_csv(
+            filename,
+            index=False,
+            mode="w" if i == 0 else "a",
+            header=i == 0,
+            encoding="utf-8-sig" if i == 0 else "utf-8",
+        )
     print(f"Results exported to: {filename}")
 
 
@@ -168,7 +175,7 @@ def main() -> None:
 
     # Step 4: Export results
     print("Step 4: Exporting results to CSV...")
-    export_to_csv(usage, "residential_simple_2_tier", "result.csv")
+    export_to_csv("sample_usage.csv", "residential_simple_2_tier", "result.csv")
     print()
 
     # Clean up sample files
@@ -0,0 +1,160 @@
+/**
+ * 計算引擎效能量測
+ *
+ * 涵蓋 plans.json 所有方案，資料規模為 1 天、1 個月、1 年、10 年，
+ * 時間解析度為每小時與每 15 分鐘；帳單試算依方案數與計費期間長度分組。
+ *
+ * 執行：npm run bench（結果寫入 bench/results.json）
+ * 比對：npm run bench:check（與 bench/baseline.json 比較，超過門檻即失敗）
+ */
+import { afterAll, beforeAll, bench, describe } from 'vitest';
+import rawPlans from '../public/data/plans.json';
+import { PlansLoader } from '../src/services/calculation/plans';
+import type { RawPlansData } from '../src/services/calculation/plans';
+import { CompiledPlan } from '../src/services/calculation/CompiledPlan';
+import { TieredBilling } from '../src/services/calculation/TieredBilling';
+import { RateCalculator } from '../src/services/calculation/RateCalculator';
+import { DemandCharges } from '../src/services/calculation/DemandCharges';
+import { EstimationMode } from '../src/types';
+import type { CalculationInput } from '../src/types';
+
+const { plans } = PlansLoader.loadFromData(rawPlans as unknown as RawPlansData);
+
+const SCALES = [
+  { label: '1 天', days: 1 },
+  { label: '1 個月', days: 30 },
+  { label: '1 年', days: 365 },
+  { label: '10 年', days: 3650 },
+];
+
+const STEPS_MINUTES = [60, 15];
+
+/** 每項至少取 30 個樣本，中位數才夠穩定，回歸檢查不會被單次雜訊誤判 */
+const BENCH_OPTIONS = { time: 500, iterations: 30, warmupTime: 100, warmupIterations: 5 };
+
+const PLAN_SETS = [
+  { label: '單一方案', plans: plans.slice(0, 1) },
+  { label: '表燈方案', plans: plans.filter((plan) => plan.category === 'lighting') },
+  { label: '全部方案', plans },
+];
+
+function createSeries(days: number, stepMinutes: number): { timestamps: Date[]; usage: Float64Array } {
+  const count = (days * 24 * 60) / stepMinutes;
+  const start = new Date(2025, 0, 1).getTime();
+  const timestamps = Array.from({ length: count }, (_, i) => new Date(start + i * stepMinutes * 60 * 1000));
+  const usage = Float64Array.from(timestamps, (ts) => (ts.getHours() >= 18 ? 0.6 : 0.2) * (stepMinutes / 60));
+  return { timestamps, usage };
+}
+
+for (const scale of SCALES) {
+  for (const stepMinutes of STEPS_MINUTES) {
+    describe(`${scale.label} / ${stepMinutes} 分鐘`, () => {
+      const { timestamps, usage } = createSeries(scale.days, stepMinutes);
+      const monthlyKwh = new Float64Array(Math.max(1, Math.round(scale.days / 30))).fill(
+        usage.reduce((sum, value) => sum + value, 0) / Math.max(1, Math.round(scale.days / 30))
+      );
+      const summerFraction = new Float64Array(monthlyKwh.length).fill(4 / 12);
+
+      for (const plan of plans) {
+        const compiled = CompiledPlan.compile(plan);
+
+        bench(`${plan.id} classify`, () => {
+          compiled.classify(timestamps);
+        }, BENCH_OPTIONS);
+
+        bench(`${plan.id} classifyRegular`, () => {
+          compiled.classifyRegular(timestamps[0], stepMinutes, timestamps.length);
+        }, BENCH_OPTIONS);
+
+        if (plan.tierRates) {
+          const tiered = TieredBilling.compile(plan);
+          bench(`${plan.id} tiered`, () => {
+            tiered.bill(monthlyKwh, summerFraction);
+          }, BENCH_OPTIONS);
+          continue;
+        }
+
+        bench(`${plan.id} priceUsage`, () => {
+          compiled.priceUsage(timestamps, usage);
+        }, BENCH_OPTIONS);
+
+        bench(`${plan.id} intervalCosts`, () => {
+          compiled.intervalCosts(timestamps, usage);
+        }, BENCH_OPTIONS);
+      }
+    });
+  }
+}
+
+describe('需量計費 / 10 年 / 15 分鐘', () => {
+  const start = new Date(2016, 0, 1);
+  const demandKw = Float64Array.from({ length: 3653 * 96 }, (_, i) => 80 + ((i * 37) % 50));
+  const periods = Array.from({ length: 120 }, (_, month) => ({
+    start: new Date(2016, month, 1),
+    end: new Date(2016, month + 1, 0),
+    days: new Date(2016, month + 1, 0).getDate(),
+  }));
+  const contracts = { regular: 100, non_summer: 20, saturday_semi_peak: 10, off_peak: 10 };
+
+  for (const plan of plans.filter((candidate) => candidate.raw?.billing_rules?.basic_fee_formula)) {
+    const demand = DemandCharges.compile(plan);
+    bench(`${plan.id} demand`, () => {
+      demand.bill({ start, stepMinutes: 15, demandKw }, periods, { contracts, powerFactor: 90 });
+    }, BENCH_OPTIONS);
+  }
+});
+
+function createBillInput(days: number): CalculationInput {
+  return {
+    consumption: 10 * days,
+    billingPeriod: { start: new Date(2025, 0, 1), end: new Date(2025, 0, days), days },
+    voltageType: 'low_voltage',
+    phase: 'single',
+    estimationSettings: { mode: EstimationMode.AVERAGE, season: 'summer' },
+  };
+}
+
+const billInput = createBillInput(62);
+
+describe('帳單試算', () => {
+  let cacheEntries = 0;
+
+  // 停用共用結果快取，量測實際計算而非快取命中
+  beforeAll(() => {
+    cacheEntries = RateCalculator.resultCache.stats().maxEntries;
+    RateCalculator.resultCache.setMaxEntries(0);
+  });
+
+  afterAll(() => {
+    RateCalculator.resultCache.setMaxEntries(cacheEntries);
+  });
+
+  for (const planSet of PLAN_SETS) {
+    for (const scale of SCALES) {
+      describe(`${planSet.label} / ${scale.label}`, () => {
+        const calculator = new RateCalculator(planSet.plans);
+        const input = createBillInput(scale.days);
+
+        bench('calculateAll', () => {
+          calculator.calculateAll(input);
+        }, BENCH_OPTIONS);
+
+        bench('compare', () => {
+          calculator.compare(input);
+        }, BENCH_OPTIONS);
+      });
+    }
+  }
+});
+
+describe('帳單試算（快取命中）', () => {
+  const calculator = new RateCalculator(plans);
+
+  bench('calculateAll cached', () => {
+    calculator.calculateAll(billInput);
+  }, BENCH_OPTIONS);
+
+  bench('compare cached', () => {
+    calculator.compare(billInput);
+  }, BENCH_OPTIONS);
+});
@@ -0,0 +1,85 @@
+#!/usr/bin/env node
+/**
+ * 效能回歸檢查
+ *
+ * 讀取 vitest bench --outputJson 的結果，與 baseline.json 比較各項耗時的中位數，
+ * 超過容許範圍即以非零狀態結束。容許範圍取門檻（預設 10%）與兩次量測相對誤差（RME）
+ * 之和的較大者，量測雜訊大的項目不會被誤判為回歸。
+ *
+ * 用法：
+ *   node bench/check-regression.mjs [--results bench/results.json] [--threshold 0.1]
+ *   node bench/check-regression.mjs --update   # 以本次結果更新基準
+ */
+import { existsSync, readFileSync, writeFileSync } from 'node:fs';
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(name);
+  return index >= 0 ? args[index + 1] : fallback;
+};
+
+const resultsPath = option('--results', 'bench/results.json');
+const baselinePath = option('--baseline', 'bench/baseline.json');
+const threshold = Number(option('--threshold', '0.1'));
+const update = args.includes('--update');
+
+/**
+ * 將 vitest bench 結果攤平為 { "群組 > 名稱": { median: 中位數毫秒, rme: 相對誤差（%） } }
+ */
+function flatten(report) {
+  const entries = {};
+  for (const file of report.files ?? []) {
+    for (const group of file.groups ?? []) {
+      for (const benchmark of group.benchmarks ?? []) {
+        entries[`${group.fullName} > ${benchmark.name}`] = {
+          median: benchmark.median ?? benchmark.mean,
+          rme: benchmark.rme ?? 0,
+        };
+      }
+    }
+  }
+  return entries;
+}
+
+if (!existsSync(resultsPath)) {
+  console.error(`找不到量測結果：${resultsPath}（請先執行 npm run bench）`);
+  process.exit(2);
+}
+
+const current = flatten(JSON.parse(readFileSync(resultsPath, 'utf8')));
+
+if (update || !existsSync(baselinePath)) {
+  writeFileSync(baselinePath, `${JSON.stringify({ createdAt: new Date().toISOString(), entries: current }, null, 2)}\n`);
+  console.log(`已寫入基準：${baselinePath}（${Object.keys(current).length} 項）`);
+  process.exit(0);
+}
+
+const baseline = JSON.parse(readFileSync(baselinePath, 'utf8')).entries ?? {};
+const regressions = [];
+
+for (const [name, { median, rme }] of Object.entries(current)) {
+  const base = baseline[name];
+  if (base === undefined || base.median <= 0) continue;
+  const change = (median - base.median) / base.median;
+  const tolerance = Math.max(threshold, (base.rme + rme) / 100);
+  if (change > tolerance) {
+    regressions.push({ name, base: base.median, median, change, tolerance });
+  }
+}
+
+const missing = Object.keys(baseline).filter((name) => !(name in current));
+if (missing.length > 0) {
+  console.warn(`基準中有 ${missing.length} 項未出現在本次結果`);
+}
+
+if (regressions.length > 0) {
+  console.error(`❌ ${regressions.length} 項超過容許範圍：`);
+  for (const { name, base, median, change, tolerance } of regressions.sort((a, b) => b.change - a.change)) {
+    console.error(
+      `  ${name}: ${base.toFixed(3)}ms → ${median.toFixed(3)}ms (+${(change * 100).toFixed(1)}%，容許 ${(tolerance * 100).toFixed(1)}%)`
+    );
+  }
+  process.exit(1);
+}
+
+console.log(`✅ ${Object.keys(current).length} 項皆在容許範圍內（門檻 ${(threshold * 100).toFixed(0)}%）`);
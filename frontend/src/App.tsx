@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useAppStore } from './stores/useAppStore';
 import { UploadZone } from './components/upload/UploadZone';
 import { ImagePreview } from './components/upload/ImagePreview';
@@ -14,8 +14,7 @@ import { HeroSection } from './components/landing';
 import { Header } from './components/layout/Header';
 import { Footer } from './components/layout/Footer';
 import { StageTransition } from './components/ui/StageTransition';
-import { PlansLoader } from './services/calculation/plans';
-import { RateCalculator } from './services/calculation/RateCalculator';
+import { loadCalculationEngine } from './services/calculation/engine';
 import { DataCompletenessLevel } from './types';
 import type { CalculationInput } from './types';
 import { Button, Divider } from '@nextui-org/react';
@@ -61,6 +60,13 @@ function App() {
   const setStage = useAppStore((state) => state.setStage);
   const setBillType = useAppStore((state) => state.setBillType);
 
+  // 背景暖機：首頁顯示後才載入計算引擎與費率資料並編譯方案，第一次試算不必等待
+  useEffect(() => {
+    loadCalculationEngine().then(({ EngineWarmUp }) => EngineWarmUp.run()).catch((error) => {
+      console.warn('計算引擎暖機失敗，將於試算時再載入：', error);
+    });
+  }, []);
+
   // 處理 OCR 識別完成後，進入確認階段
   const handleConfirmFromHabit = async (estimatedData?: { peakOnPeak: number; semiPeak: number; offPeak: number }) => {
     if (!billData) return;
@@ -85,6 +91,7 @@ function App() {
         setBillData(updatedBillData);
       }
 
+      const { PlansLoader, RateCalculator } = await loadCalculationEngine();
       const plans = await PlansLoader.getAll();
       const calculator = new RateCalculator(plans);
 
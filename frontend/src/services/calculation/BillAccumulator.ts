@@ -0,0 +1,397 @@
+import type { BillingInputs, BillingPeriod, CalculationInput, Plan } from '../../types';
+import { CompiledPlan, rateCell } from './CompiledPlan';
+import { HolidayCalendar } from './HolidayCalendar';
+import { RateCalculator } from './RateCalculator';
+import { TieredBilling } from './TieredBilling';
+import { NO_PERIOD, PERIODS, SEASON_NAMES } from './PeriodLookup';
+import type { PeriodClassification } from './PeriodLookup';
+import { CalculationMetrics } from './CalculationMetrics';
+
+const CELLS = SEASON_NAMES.length * PERIODS.length;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+/**
+ * 單一計費期間的累計結果
+ */
+export interface AccumulatedPeriodBill {
+  start: Date;
+  end: Date;
+  /** [季節][時段] 的度數小計 */
+  kwh: Float64Array;
+  /** 基本電費 */
+  basic: number;
+  /** 流動電費 */
+  energy: number;
+  /** 總電費 */
+  total: number;
+  /** 總度數 */
+  totalKwh: number;
+  /** 無對應時段或費率而未計價的度數 */
+  unpricedKwh: number;
+  /** 已輸入的時間點數量 */
+  intervalCount: number;
+}
+
+/**
+ * 目前的累計電費
+ */
+export interface AccumulatedBill {
+  planId: string;
+  periods: AccumulatedPeriodBill[];
+  /** 各計費期間的基本電費合計 */
+  basic: number;
+  /** 各計費期間的流動電費合計 */
+  energy: number;
+  /** 各計費期間的總電費合計 */
+  total: number;
+  totalKwh: number;
+  unpricedKwh: number;
+  /** 最後輸入的時間點（尚未輸入為 null） */
+  lastTimestamp: Date | null;
+}
+
+/**
+ * 可序列化的累計狀態（JSON 相容）
+ */
+export interface BillAccumulatorState {
+  version: number;
+  planId: string;
+  periods: Array<{ start: string; end: string }>;
+  lastTime: number | null;
+  kwh: number[][];
+  totalKwh: number[];
+  unpricedKwh: number[];
+  intervalCount: number[];
+}
+
+/**
+ * 一段用電資料（如 UsageCsvParser.batches 輸出的批次）
+ */
+export interface UsageChunk {
+  /** 各筆資料的時間（epoch 毫秒） */
+  times: ArrayLike<number>;
+  /** 各筆資料的用電度數 */
+  usage: ArrayLike<number>;
+}
+
+/**
+ * 累計器選項
+ */
+export interface BillAccumulatorOptions {
+  /** 計費條件（契約容量、相位、電壓） */
+  inputs?: BillingInputs;
+  /** 假日行事曆（預設為臺灣國定假日） */
+  calendar?: HolidayCalendar;
+  /** 累進方案的級距上限倍數（預設依各計費期間的日數換算月數） */
+  cycleMonths?: number;
+}
+
+export const BILL_ACCUMULATOR_STATE_VERSION = 2;
+
+/**
+ * 增量電費累計器
+ *
+ * 綁定一個方案、計費條件與一組計費期間，依時間順序接收分段的用電資料（如每日的 AMI 資料），
+ * 每段只分類新進的時間點，並累加到 [計費期間][季節][時段] 的度數小計。
+ * 目前電費由各期間的時段度數以實測用電交給 RateCalculator 計算（含基本電費、最低用電與附加費），
+ * 與已輸入的資料量無關；累計狀態可序列化，重新啟動後接續累計。
+ */
+export class BillAccumulator {
+  readonly plan: Plan;
+
+  private readonly compiled: CompiledPlan;
+  private readonly calculator: RateCalculator;
+  private readonly inputs: BillingInputs;
+  private readonly calendar: HolidayCalendar;
+  private readonly cycleMonths?: number;
+  private readonly periods: BillingPeriod[];
+  /** 各計費期間的起點（epoch 毫秒） */
+  private readonly starts: Float64Array;
+  /** 各計費期間的終點（epoch 毫秒，不含） */
+  private readonly ends: Float64Array;
+
+  private readonly kwh: Float64Array;
+  private readonly totalKwh: Float64Array;
+  private readonly unpricedKwh: Float64Array;
+  private readonly intervalCount: Float64Array;
+  private lastTime: number | null = null;
+  private cursor = 0;
+
+  /**
+   * @param periods 計費期間，須依時間排序且不重疊；end 為期間最後一天（含當日）
+   */
+  constructor(plan: Plan, periods: BillingPeriod[], options: BillAccumulatorOptions = {}) {
+    if (periods.length === 0) {
+      throw new Error('至少需要一個計費期間');
+    }
+
+    this.plan = plan;
+    this.compiled = CompiledPlan.compile(plan);
+    this.inputs = { ...options.inputs };
+    this.calendar = options.calendar ?? HolidayCalendar.taiwan();
+    this.calculator = new RateCalculator([plan], this.calendar);
+    this.cycleMonths = options.cycleMonths;
+    this.periods = periods.map((period) => ({ ...period }));
+
+    this.starts = Float64Array.from(periods, (period) => period.start.getTime());
+    this.ends = Float64Array.from(periods, ({ end }) =>
+      new Date(end.getFullYear(), end.getMonth(), end.getDate() + 1).getTime()
+    );
+    for (let p = 0; p < periods.length; p++) {
+      if (this.starts[p] >= this.ends[p] || (p > 0 && this.starts[p] < this.ends[p - 1])) {
+        throw new Error('計費期間須依時間排序且不可重疊');
+      }
+    }
+
+    this.kwh = new Float64Array(periods.length * CELLS);
+    this.totalKwh = new Float64Array(periods.length);
+    this.unpricedKwh = new Float64Array(periods.length);
+    this.intervalCount = new Float64Array(periods.length);
+  }
+
+  /**
+   * 逐批累計整份用電資料並回傳電費；一次只持有一批資料，
+   * 記憶體用量與批次大小有關，與資料總長度無關
+   */
+  static async accumulate(
+    plan: Plan,
+    periods: BillingPeriod[],
+    chunks: AsyncIterable<UsageChunk> | Iterable<UsageChunk>,
+    options: BillAccumulatorOptions = {}
+  ): Promise<AccumulatedBill> {
+    const accumulator = new BillAccumulator(plan, periods, options);
+    for await (const chunk of chunks) {
+      accumulator.pushTimes(chunk.times, chunk.usage);
+    }
+    return accumulator.current();
+  }
+
+  /**
+   * 由序列化狀態接續累計
+   */
+  static resume(plan: Plan, state: BillAccumulatorState, options: BillAccumulatorOptions = {}): BillAccumulator {
+    if (state.version !== BILL_ACCUMULATOR_STATE_VERSION) {
+      throw new Error(`不支援的累計狀態版本：${state.version}`);
+    }
+    if (state.planId !== plan.id) {
+      throw new Error(`累計狀態屬於方案 ${state.planId}，與 ${plan.id} 不符`);
+    }
+
+    const periods = state.periods.map(({ start, end }) => {
+      const startDate = new Date(start);
+      const endDate = new Date(end);
+      return {
+        start: startDate,
+        end: endDate,
+        days: Math.round((endDate.getTime() - startDate.getTime()) / DAY_MS) + 1,
+      };
+    });
+    const accumulator = new BillAccumulator(plan, periods, options);
+    const perPeriod = [state.kwh, state.totalKwh, state.unpricedKwh, state.intervalCount];
+    if (
+      perPeriod.some((values) => values.length !== periods.length) ||
+      state.kwh.some((cells) => cells.length !== CELLS)
+    ) {
+      throw new Error('累計狀態格式錯誤');
+    }
+
+    state.kwh.forEach((cells, p) => accumulator.kwh.set(cells, p * CELLS));
+    accumulator.totalKwh.set(state.totalKwh);
+    accumulator.unpricedKwh.set(state.unpricedKwh);
+    accumulator.intervalCount.set(state.intervalCount);
+    accumulator.lastTime = state.lastTime;
+    if (state.lastTime !== null) {
+      accumulator.cursor = accumulator.periodIndex(state.lastTime, 0);
+    }
+    return accumulator;
+  }
+
+  /**
+   * 輸入一段用電資料；時間點須嚴格遞增，且晚於先前輸入的資料
+   */
+  push(timestamps: ArrayLike<Date>, usage: ArrayLike<number>): void {
+    this.ingest(
+      Float64Array.from(timestamps, (timestamp) => timestamp.getTime()),
+      usage,
+      () => this.compiled.classify(timestamps, this.calendar)
+    );
+  }
+
+  /**
+   * 輸入一段以 epoch 毫秒表示時間的用電資料；間隔固定時以日模板分類，不逐筆建立 Date
+   */
+  pushTimes(times: ArrayLike<number>, usage: ArrayLike<number>): void {
+    const n = times.length;
+    const step = n > 1 ? times[1] - times[0] : 0;
+    let regular = step > 0 && step % 60000 === 0;
+    for (let i = 2; regular && i < n; i++) {
+      regular = times[i] - times[i - 1] === step;
+    }
+
+    this.ingest(times, usage, () => regular
+      ? this.compiled.classifyRegular(new Date(times[0]), step / 60000, n, this.calendar)
+      : this.compiled.classify(Array.from(times, (time) => new Date(time)), this.calendar)
+    );
+  }
+
+  private ingest(
+    times: ArrayLike<number>,
+    usage: ArrayLike<number>,
+    classify: () => PeriodClassification
+  ): void {
+    if (times.length !== usage.length) {
+      throw new Error('用電資料與時間點數量不一致');
+    }
+    const n = times.length;
+    if (n === 0) return;
+
+    // 先驗證整段資料，避免錯誤時留下只累計一半的狀態
+    const periodOf = new Uint32Array(n);
+    let previous = this.lastTime;
+    let cursor = this.cursor;
+    for (let i = 0; i < n; i++) {
+      const time = times[i];
+      if (previous !== null && time <= previous) {
+        throw new Error('用電資料須依時間順序輸入，且不可與已輸入的資料重複');
+      }
+      cursor = this.periodIndex(time, cursor);
+      periodOf[i] = cursor;
+      previous = time;
+    }
+
+    const { seasons, dayTypes, periods } = CalculationMetrics.time('classification', classify);
+
+    CalculationMetrics.time('accumulate', () => {
+      const rates = this.compiled.rates;
+      // 非時間電價方案依總度數計費，不計未計價度數
+      const nonTOU = this.plan.touType === 'none';
+      for (let i = 0; i < n; i++) {
+        const p = periodOf[i];
+        const value = usage[i];
+        const season = seasons[i];
+        this.intervalCount[p]++;
+        this.totalKwh[p] += value;
+
+        const period = periods[i];
+        if (period === NO_PERIOD) {
+          if (!nonTOU) this.unpricedKwh[p] += value;
+          continue;
+        }
+        this.kwh[p * CELLS + season * PERIODS.length + period] += value;
+        if (!nonTOU && Number.isNaN(rates[rateCell(season, dayTypes[i], period)])) {
+          this.unpricedKwh[p] += value;
+        }
+      }
+    });
+
+    this.lastTime = previous;
+    this.cursor = cursor;
+  }
+
+  /**
+   * 目前的累計電費（只由小計彙總，與已輸入的資料量無關）
+   *
+   * 各期間的時段度數以實測用電交給 RateCalculator 計價，與整期資料一次計算的結果相同；
+   * 尚未輸入資料的期間電費為 0。
+   */
+  current(): AccumulatedBill {
+    const periods = this.periods.map((period, p): AccumulatedPeriodBill => {
+      const kwh = this.kwh.slice(p * CELLS, (p + 1) * CELLS);
+      const charges = this.intervalCount[p] > 0
+        ? this.calculator.calculateMeasured(this.plan, this.measuredInput(period, kwh, this.totalKwh[p])).charges
+        : { base: 0, energy: 0, total: 0 };
+      return {
+        start: period.start,
+        end: period.end,
+        kwh,
+        basic: charges.base,
+        energy: charges.energy,
+        total: charges.total,
+        totalKwh: this.totalKwh[p],
+        unpricedKwh: this.unpricedKwh[p],
+        intervalCount: this.intervalCount[p],
+      };
+    });
+
+    const sum = (field: 'basic' | 'energy' | 'total' | 'totalKwh' | 'unpricedKwh') =>
+      periods.reduce((total, period) => total + period[field], 0);
+
+    return {
+      planId: this.plan.id,
+      periods,
+      basic: sum('basic'),
+      energy: sum('energy'),
+      total: sum('total'),
+      totalKwh: sum('totalKwh'),
+      unpricedKwh: sum('unpricedKwh'),
+      lastTimestamp: this.lastTime === null ? null : new Date(this.lastTime),
+    };
+  }
+
+  /**
+   * 單一計費期間的計費輸入：各季節的時段度數合併為實測時段用電
+   */
+  private measuredInput(period: BillingPeriod, kwh: Float64Array, totalKwh: number): CalculationInput {
+    const periodKwh = (name: (typeof PERIODS)[number]) => {
+      const index = PERIODS.indexOf(name);
+      let total = 0;
+      for (let season = 0; season < SEASON_NAMES.length; season++) {
+        total += kwh[season * PERIODS.length + index];
+      }
+      return total;
+    };
+
+    return {
+      consumption: totalKwh,
+      billingPeriod: period,
+      voltageType: this.inputs.voltageType ?? 'low_voltage',
+      voltageV: this.inputs.voltageV,
+      phase: this.inputs.phase ?? 'single',
+      contractCapacity: this.inputs.contractCapacity,
+      cycleMonths: this.cycleMonths ?? TieredBilling.cycleMonthsForDays(period.days),
+      touConsumption: this.plan.touType === 'none'
+        ? undefined
+        : {
+            peakOnPeak: periodKwh('peak'),
+            semiPeak: periodKwh('semi_peak'),
+            offPeak: periodKwh('off_peak'),
+            isEstimated: false,
+          },
+    };
+  }
+
+  /**
+   * 序列化累計狀態
+   */
+  serialize(): BillAccumulatorState {
+    const rows = (values: Float64Array): number[][] =>
+      this.periods.map((_, p) => Array.from(values.subarray(p * CELLS, (p + 1) * CELLS)));
+
+    return {
+      version: BILL_ACCUMULATOR_STATE_VERSION,
+      planId: this.plan.id,
+      periods: this.periods.map((period) => ({
+        start: period.start.toISOString(),
+        end: period.end.toISOString(),
+      })),
+      lastTime: this.lastTime,
+      kwh: rows(this.kwh),
+      totalKwh: Array.from(this.totalKwh),
+      unpricedKwh: Array.from(this.unpricedKwh),
+      intervalCount: Array.from(this.intervalCount),
+    };
+  }
+
+  /**
+   * 時間點所屬的計費期間（時間遞增，從 cursor 往後找）
+   */
+  private periodIndex(time: number, cursor: number): number {
+    while (cursor < this.ends.length && time >= this.ends[cursor]) {
+      cursor++;
+    }
+    if (cursor === this.ends.length || time < this.starts[cursor]) {
+      throw new Error(`用電資料時間 ${new Date(time).toISOString()} 不在計費期間內`);
+    }
+    return cursor;
+  }
+}
@@ -0,0 +1,131 @@
+/**
+ * 耗時直方圖的上限（秒）
+ */
+export const DURATION_BUCKETS = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5];
+
+/**
+ * 單一階段的耗時統計
+ */
+export interface StageTiming {
+  count: number;
+  sumSeconds: number;
+  /** 與 DURATION_BUCKETS 對應的累積次數 */
+  buckets: number[];
+}
+
+/**
+ * 計量快照
+ */
+export interface MetricsSnapshot {
+  stages: Record<string, StageTiming>;
+  counters: Record<string, number>;
+  gauges: Record<string, number>;
+}
+
+const now = (): number => (typeof performance !== 'undefined' ? performance.now() : Date.now());
+
+/**
+ * 計算效能計量
+ *
+ * 記錄各階段（分類、估算、計價、解析等）的耗時直方圖與計數，
+ * 可輸出 Prometheus 文字格式，用於找出變慢的階段。
+ * 快取命中率等即時數值以 gauge 提供者註冊，輸出時才讀取。
+ */
+export class CalculationMetrics {
+  private static stages = new Map<string, StageTiming>();
+  private static counters = new Map<string, number>();
+  private static gaugeProviders = new Map<string, () => number>();
+
+  /**
+   * 執行並記錄階段耗時
+   */
+  static time<T>(stage: string, fn: () => T): T {
+    const start = now();
+    try {
+      return fn();
+    } finally {
+      this.observe(stage, (now() - start) / 1000);
+    }
+  }
+
+  /**
+   * 記錄一次階段耗時（秒）
+   */
+  static observe(stage: string, seconds: number): void {
+    let timing = this.stages.get(stage);
+    if (!timing) {
+      timing = { count: 0, sumSeconds: 0, buckets: new Array(DURATION_BUCKETS.length).fill(0) };
+      this.stages.set(stage, timing);
+    }
+    timing.count++;
+    timing.sumSeconds += seconds;
+    for (let i = DURATION_BUCKETS.length - 1; i >= 0 && seconds <= DURATION_BUCKETS[i]; i--) {
+      timing.buckets[i]++;
+    }
+  }
+
+  /**
+   * 累加計數
+   */
+  static increment(name: string, value = 1): void {
+    this.counters.set(name, (this.counters.get(name) ?? 0) + value);
+  }
+
+  /**
+   * 註冊即時數值（輸出時呼叫 provider 取值）
+   */
+  static registerGauge(name: string, provider: () => number): void {
+    this.gaugeProviders.set(name, provider);
+  }
+
+  static snapshot(): MetricsSnapshot {
+    const stages: Record<string, StageTiming> = {};
+    for (const [stage, timing] of this.stages) {
+      stages[stage] = { ...timing, buckets: [...timing.buckets] };
+    }
+    const gauges: Record<string, number> = {};
+    for (const [name, provider] of this.gaugeProviders) {
+      gauges[name] = provider();
+    }
+    return { stages, counters: Object.fromEntries(this.counters), gauges };
+  }
+
+  /**
+   * 清除耗時與計數（保留已註冊的 gauge）
+   */
+  static reset(): void {
+    this.stages.clear();
+    this.counters.clear();
+  }
+
+  /**
+   * 輸出 Prometheus 文字格式
+   */
+  static toPrometheus(prefix = 'tou'): string {
+    const { stages, counters, gauges } = this.snapshot();
+    const lines: string[] = [];
+
+    lines.push(`# HELP ${prefix}_stage_duration_seconds 計算各階段耗時`);
+    lines.push(`# TYPE ${prefix}_stage_duration_seconds histogram`);
+    for (const [stage, timing] of Object.entries(stages)) {
+      DURATION_BUCKETS.forEach((le, i) => {
+        lines.push(`${prefix}_stage_duration_seconds_bucket{stage="${stage}",le="${le}"} ${timing.buckets[i]}`);
+      });
+      lines.push(`${prefix}_stage_duration_seconds_bucket{stage="${stage}",le="+Inf"} ${timing.count}`);
+      lines.push(`${prefix}_stage_duration_seconds_sum{stage="${stage}"} ${timing.sumSeconds}`);
+      lines.push(`${prefix}_stage_duration_seconds_count{stage="${stage}"} ${timing.count}`);
+    }
+
+    for (const [name, value] of Object.entries(counters)) {
+      lines.push(`# TYPE ${prefix}_${name}_total counter`);
+      lines.push(`${prefix}_${name}_total ${value}`);
+    }
+
+    for (const [name, value] of Object.entries(gauges)) {
+      lines.push(`# TYPE ${prefix}_${name} gauge`);
+      lines.push(`${prefix}_${name} ${value}`);
+    }
+
+    return `${lines.join('\n')}\n`;
+  }
+}
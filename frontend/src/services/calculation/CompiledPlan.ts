@@ -0,0 +1,316 @@
+import type { DayType, Period, Plan, Season } from '../../types';
+import {
+  DAY_TYPES,
+  NO_PERIOD,
+  PERIODS,
+  PeriodLookupTable,
+  SEASON_NAMES,
+  MINUTES_PER_DAY,
+  SeasonLookup,
+  dayTypeCode,
+  isRegularStep,
+  tileDayTemplates,
+} from './PeriodLookup';
+import type { PeriodClassification } from './PeriodLookup';
+import { HolidayCalendar } from './HolidayCalendar';
+import { CalculationMetrics } from './CalculationMetrics';
+
+const FLAT = PERIODS.indexOf('flat');
+
+/**
+ * [季節][日期型別][時段] 在密集陣列中的位置
+ */
+export function rateCell(season: number, dayType: number, period: number): number {
+  return (season * DAY_TYPES.length + dayType) * PERIODS.length + period;
+}
+
+/**
+ * 逐時段計價的彙總結果
+ */
+export interface PricedUsage {
+  /** [季節][日期型別][時段] 的度數小計 */
+  kwh: Float64Array;
+  /** [季節][日期型別][時段] 的流動電費小計 */
+  cost: Float64Array;
+  /** 流動電費合計 */
+  total: number;
+  /** 總度數 */
+  totalKwh: number;
+  /** 無對應時段或費率而未計價的度數 */
+  unpricedKwh: number;
+}
+
+/**
+ * 逐時段的費率與電費（與輸入時間點一一對應）
+ */
+export interface IntervalCosts {
+  /** 各時間點的費率（元/kWh），無時段或費率為 NaN */
+  rates: Float64Array;
+  /** 各時間點的流動電費，無時段或費率為 0 */
+  costs: Float64Array;
+  /** 流動電費合計 */
+  total: number;
+  /** 無對應時段或費率而未計價的度數 */
+  unpricedKwh: number;
+}
+
+/**
+ * 編譯後的方案
+ *
+ * 將方案的流動電費整理成 [季節][日期型別][時段] 的密集費率陣列，
+ * 搭配時段查表後，逐時段計價只需查表取費率再依格彙總，不必逐筆搜尋費率清單。
+ */
+export class CompiledPlan {
+  private static cache = new WeakMap<Plan, CompiledPlan>();
+
+  readonly plan: Plan;
+
+  /** 時段查表（無時段排程的方案為 null） */
+  readonly periodTable: PeriodLookupTable | null;
+
+  /** 季節查表 */
+  readonly seasonLookup: SeasonLookup;
+
+  /** [季節][日期型別][時段] 的費率（元/kWh），無費率為 NaN */
+  readonly rates: Float64Array;
+
+  /** 分類特徵字串，季節定義與時段排程相同的方案可共用同一份分類結果 */
+  readonly classificationKey: string;
+
+  /** [季節][時段] 的費率，取該季節該時段的第一筆費率 */
+  private readonly seasonRates: Float64Array;
+
+  private constructor(plan: Plan) {
+    this.plan = plan;
+    this.periodTable = PeriodLookupTable.forPlan(plan);
+    this.seasonLookup = this.periodTable?.seasonLookup ?? SeasonLookup.forSeasons(plan.seasons);
+    this.classificationKey = `${plan.seasons.summer.start}~${plan.seasons.summer.end}|${this.periodTable?.scheduleSignature ?? 'flat'}`;
+    this.rates = new Float64Array(SEASON_NAMES.length * DAY_TYPES.length * PERIODS.length).fill(NaN);
+    this.seasonRates = new Float64Array(SEASON_NAMES.length * PERIODS.length).fill(NaN);
+
+    const seasonKeys = ['summer', 'nonSummer'] as const;
+    seasonKeys.forEach((seasonKey, season) => {
+      for (const charge of plan.energyCharges[seasonKey]) {
+        const period = PERIODS.indexOf(charge.period);
+        if (period < 0) continue;
+
+        const seasonIndex = season * PERIODS.length + period;
+        if (Number.isNaN(this.seasonRates[seasonIndex])) {
+          this.seasonRates[seasonIndex] = charge.rate;
+        }
+
+        // 未指定日期型別的費率適用於所有日期型別
+        for (let dayType = 0; dayType < DAY_TYPES.length; dayType++) {
+          if (charge.dayType && DAY_TYPES[dayType] !== charge.dayType) continue;
+          const cell = rateCell(season, dayType, period);
+          if (Number.isNaN(this.rates[cell])) {
+            this.rates[cell] = charge.rate;
+          }
+        }
+      }
+    });
+  }
+
+  /**
+   * 編譯方案（每個方案只編譯一次）
+   */
+  static compile(plan: Plan): CompiledPlan {
+    let compiled = this.cache.get(plan);
+    if (!compiled) {
+      compiled = new CompiledPlan(plan);
+      this.cache.set(plan, compiled);
+    }
+    return compiled;
+  }
+
+  /**
+   * 季節、時段的費率（無費率回傳 undefined）
+   */
+  rate(season: Season['name'], period: Period): number | undefined {
+    const value = this.seasonRates[SEASON_NAMES.indexOf(season) * PERIODS.length + PERIODS.indexOf(period)];
+    return Number.isNaN(value) ? undefined : value;
+  }
+
+  /**
+   * 季節、日期型別、時段的費率（無費率回傳 undefined）
+   */
+  rateAt(season: Season['name'], dayType: DayType, period: Period): number | undefined {
+    const value = this.rates[rateCell(
+      SEASON_NAMES.indexOf(season),
+      DAY_TYPES.indexOf(dayType),
+      PERIODS.indexOf(period)
+    )];
+    return Number.isNaN(value) ? undefined : value;
+  }
+
+  /**
+   * 分類時間點；無時段排程的方案全部歸為 flat 時段
+   */
+  classify(
+    timestamps: ArrayLike<Date>,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): PeriodClassification {
+    if (this.periodTable) {
+      return this.periodTable.classify(timestamps, calendar);
+    }
+
+    const n = timestamps.length;
+    const seasons = new Uint8Array(n);
+    const dayTypes = new Uint8Array(n);
+    const periods = new Uint8Array(n).fill(FLAT);
+    const holidays = calendar.isHolidayMask(timestamps);
+    for (let i = 0; i < n; i++) {
+      seasons[i] = this.seasonLookup.seasonCode(timestamps[i]);
+      dayTypes[i] = dayTypeCode(timestamps[i], holidays[i] === 1);
+    }
+    return { seasons, dayTypes, periods };
+  }
+
+  /**
+   * 分類固定間隔的時間序列（起點 + 間隔分鐘數 + 筆數）
+   *
+   * 間隔整除一天且期間內時區偏移不變時以日模板逐日鋪排，不建立逐筆的 Date；
+   * 其他情況（含跨日光節約時間切換）退回逐筆分類。
+   */
+  classifyRegular(
+    start: Date,
+    stepMinutes: number,
+    count: number,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): PeriodClassification {
+    if (!isRegularStep(start, stepMinutes, count)) {
+      const origin = start.getTime();
+      const timestamps = Array.from({ length: count }, (_, i) => new Date(origin + i * stepMinutes * 60000));
+      return this.classify(timestamps, calendar);
+    }
+    if (this.periodTable) {
+      return this.periodTable.classifyRegular(start, stepMinutes, count, calendar);
+    }
+
+    const template = new Uint8Array(SEASON_NAMES.length * DAY_TYPES.length * (MINUTES_PER_DAY / stepMinutes)).fill(FLAT);
+    return tileDayTemplates(start, stepMinutes, count, template, this.seasonLookup, calendar);
+  }
+
+  /**
+   * 固定間隔用電的逐時段計價（結果同 priceUsage）
+   */
+  priceRegular(
+    start: Date,
+    stepMinutes: number,
+    usage: ArrayLike<number>,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): PricedUsage {
+    if (this.plan.tierRates) {
+      throw new Error('累進費率方案無法逐時段計價');
+    }
+
+    const { seasons, dayTypes, periods } = CalculationMetrics.time('classification', () =>
+      this.classifyRegular(start, stepMinutes, usage.length, calendar)
+    );
+    return CalculationMetrics.time('interval_pricing', () =>
+      this.priceClassified(seasons, dayTypes, periods, usage)
+    );
+  }
+
+  /**
+   * 逐時段計價：先依 [季節][日期型別][時段] 彙總度數，再乘上對應費率
+   */
+  priceUsage(
+    timestamps: ArrayLike<Date>,
+    usage: ArrayLike<number>,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): PricedUsage {
+    if (this.plan.tierRates) {
+      throw new Error('累進費率方案無法逐時段計價');
+    }
+    if (timestamps.length !== usage.length) {
+      throw new Error('用電資料與時間點數量不一致');
+    }
+
+    const { seasons, dayTypes, periods } = CalculationMetrics.time('classification', () =>
+      this.classify(timestamps, calendar)
+    );
+    return CalculationMetrics.time('interval_pricing', () =>
+      this.priceClassified(seasons, dayTypes, periods, usage)
+    );
+  }
+
+  /**
+   * 逐時段的費率與電費序列
+   */
+  intervalCosts(
+    timestamps: ArrayLike<Date>,
+    usage: ArrayLike<number>,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): IntervalCosts {
+    if (this.plan.tierRates) {
+      throw new Error('累進費率方案無法逐時段計價');
+    }
+    if (timestamps.length !== usage.length) {
+      throw new Error('用電資料與時間點數量不一致');
+    }
+
+    const { seasons, dayTypes, periods } = CalculationMetrics.time('classification', () =>
+      this.classify(timestamps, calendar)
+    );
+    const n = usage.length;
+    const rates = new Float64Array(n);
+    const costs = new Float64Array(n);
+    let total = 0;
+    let unpricedKwh = 0;
+
+    for (let i = 0; i < n; i++) {
+      const rate = periods[i] === NO_PERIOD
+        ? NaN
+        : this.rates[rateCell(seasons[i], dayTypes[i], periods[i])];
+      rates[i] = rate;
+      if (Number.isNaN(rate)) {
+        unpricedKwh += usage[i];
+        continue;
+      }
+      costs[i] = usage[i] * rate;
+      total += costs[i];
+    }
+
+    return { rates, costs, total, unpricedKwh };
+  }
+
+  /**
+   * 依已分類的時段計價
+   */
+  priceClassified(
+    seasons: Uint8Array,
+    dayTypes: Uint8Array,
+    periods: Uint8Array,
+    usage: ArrayLike<number>
+  ): PricedUsage {
+    const kwh = new Float64Array(this.rates.length);
+    const cost = new Float64Array(this.rates.length);
+    let totalKwh = 0;
+    let unpricedKwh = 0;
+
+    for (let i = 0; i < usage.length; i++) {
+      const value = usage[i];
+      totalKwh += value;
+      if (periods[i] === NO_PERIOD) {
+        unpricedKwh += value;
+        continue;
+      }
+      kwh[rateCell(seasons[i], dayTypes[i], periods[i])] += value;
+    }
+
+    let total = 0;
+    for (let cell = 0; cell < kwh.length; cell++) {
+      if (kwh[cell] === 0) continue;
+      const rate = this.rates[cell];
+      if (Number.isNaN(rate)) {
+        unpricedKwh += kwh[cell];
+        continue;
+      }
+      cost[cell] = kwh[cell] * rate;
+      total += cost[cell];
+    }
+
+    return { kwh, cost, total, totalKwh, unpricedKwh };
+  }
+}
@@ -0,0 +1,373 @@
+import type { BasicFeeFormula, BasicFeeRate, BillingPeriod, OverContractPenaltyRule, Plan, PowerFactorAdjustmentRule } from '../../types';
+import { CompiledPlan } from './CompiledPlan';
+import { HolidayCalendar } from './HolidayCalendar';
+import { DAY_TYPES, NO_PERIOD, PERIODS, SEASON_NAMES } from './PeriodLookup';
+import type { PeriodClassification } from './PeriodLookup';
+import { CalculationMetrics } from './CalculationMetrics';
+
+/**
+ * 契約容量類別
+ */
+export type ContractCategory = 'regular' | 'non_summer' | 'semi_peak' | 'saturday_semi_peak' | 'off_peak';
+
+/**
+ * 各類契約容量（kW）
+ */
+export type ContractCapacities = Partial<Record<ContractCategory, number>>;
+
+/**
+ * 需量時段：平日尖峰、平日半尖峰、週六半尖峰、離峰（依序累加契約容量）
+ */
+export const DEMAND_WINDOWS = ['regular', 'semi_peak', 'saturday_semi_peak', 'off_peak'] as const;
+
+/**
+ * 需量資料：逐筆時間點，或起點 + 固定間隔（走日模板分類）
+ */
+export type DemandSeries =
+  | { timestamps: ArrayLike<Date>; demandKw: ArrayLike<number> }
+  | { start: Date; stepMinutes: number; demandKw: ArrayLike<number> };
+
+/**
+ * 需量計費輸入
+ */
+export interface DemandBillingInputs {
+  contracts: ContractCapacities;
+  /** 供電相位，決定按戶計收金額（預設為方案的相位，未設定時為單相） */
+  phase?: Phase;
+  /** 功率因數（%），未提供則不調整 */
+  powerFactor?: number;
+  /** 各計費期間的流動電費（列入合計與功率因數調整） */
+  energy?: ArrayLike<number>;
+  /** 假日行事曆（預設為臺灣國定假日） */
+  calendar?: HolidayCalendar;
+}
+
+/**
+ * 多個計費期間的需量計費結果（皆與計費期間一一對應）
+ */
+export interface DemandBillingResult {
+  /** [計費期間][季節][需量時段] 的最高需量（kW），無資料為 0 */
+  maxDemand: Float64Array;
+  /** 超約需量（kW），跨季節期間取各季節合計 */
+  overContractKw: Float64Array;
+  /** 基本電費 */
+  basic: Float64Array;
+  /** 超約附加費 */
+  penalty: Float64Array;
+  /** 流動電費 */
+  energy: Float64Array;
+  /** 功率因數調整（正值加收、負值減收） */
+  powerFactorAdjustment: Float64Array;
+  /** 合計 */
+  total: Float64Array;
+}
+
+const WINDOWS = DEMAND_WINDOWS.length;
+const SEASONS = SEASON_NAMES.length;
+const NON_SUMMER = SEASON_NAMES.indexOf('non_summer');
+
+type Phase = NonNullable<Plan['phase']>;
+
+/** 按戶計收依相位區分時的標籤後綴 */
+const PHASE_SUFFIX: Record<Phase, string> = { single: '單相', three: '三相' };
+
+const DEFAULT_PENALTY: OverContractPenaltyRule = { threshold_ratio: 0.1, rate_low: 2, rate_high: 3 };
+
+/**
+ * [日期型別][時段] → 需量時段（無對應為 NO_PERIOD）
+ */
+const WINDOW_OF = new Uint8Array(DAY_TYPES.length * PERIODS.length).fill(NO_PERIOD);
+DAY_TYPES.forEach((dayType, d) => {
+  WINDOW_OF[d * PERIODS.length + PERIODS.indexOf('peak')] = 0;
+  WINDOW_OF[d * PERIODS.length + PERIODS.indexOf('semi_peak')] = dayType === 'saturday' ? 2 : 1;
+  WINDOW_OF[d * PERIODS.length + PERIODS.indexOf('off_peak')] = 3;
+});
+
+/**
+ * 高壓需量計費引擎
+ *
+ * 依方案的 basic_fee_formula 與 basic_fees 整理 [季節][需量時段] 的契約容量費率，
+ * 計費時只分類一次時間點，再以 [計費期間][季節][需量時段] 為群組一次取得所有期間的最高需量，
+ * 之後基本電費、超約附加費與功率因數調整都只是對各期間小陣列的運算，與需量資料長度無關。
+ *
+ * 契約容量依 經常（非夏月再加非夏月契約）→ 半尖峰 → 週六半尖峰 → 離峰 的順序累加，
+ * 各需量時段的超約需量扣除較高時段已計的超約部分；跨季節的計費期間依各季節時間點比例分攤。
+ */
+export class DemandCharges {
+  private static cache = new WeakMap<Plan, DemandCharges>();
+
+  readonly plan: Plan;
+  readonly formula: BasicFeeFormula;
+  readonly penaltyRule: OverContractPenaltyRule;
+  readonly powerFactorRule: PowerFactorAdjustmentRule | null;
+
+  /** [季節][需量時段] 的契約容量費率（元/kW/月），半尖峰、週六、離峰無費率時以經常契約費率計算超約 */
+  readonly windowRates: Float64Array;
+
+  /** 非夏月契約費率 */
+  private readonly nonSummerRate: number;
+  /** 各相位的按戶計收金額 */
+  private readonly householdFees: Record<Phase, number>;
+  private readonly compiled: CompiledPlan;
+
+  private constructor(plan: Plan, formula: BasicFeeFormula) {
+    const rules = plan.raw?.billing_rules;
+    const fees = plan.raw?.basic_fees ?? [];
+    const fee = (label?: string): BasicFeeRate | undefined =>
+      label === undefined ? undefined : fees.find((entry) => entry.label === label);
+    const seasonRate = (entry: BasicFeeRate | undefined, season: number): number =>
+      entry === undefined ? NaN : (season === NON_SUMMER ? entry.non_summer : entry.summer) ?? entry.cost ?? NaN;
+
+    this.plan = plan;
+    this.formula = formula;
+    this.penaltyRule = rules?.over_contract_penalty ?? DEFAULT_PENALTY;
+    this.powerFactorRule = rules?.power_factor_adjustment ?? null;
+    this.compiled = CompiledPlan.compile(plan);
+
+    const regular = fee(formula.regular_label);
+    if (!regular) {
+      throw new Error(`找不到經常契約基本電費：${formula.regular_label}`);
+    }
+    const labels = [formula.regular_label, formula.semi_peak_label, formula.saturday_label, formula.off_peak_label];
+    this.windowRates = new Float64Array(SEASONS * WINDOWS);
+    for (let season = 0; season < SEASONS; season++) {
+      labels.forEach((label, window) => {
+        const rate = seasonRate(fee(label), season);
+        this.windowRates[season * WINDOWS + window] = Number.isNaN(rate) ? seasonRate(regular, season) : rate;
+      });
+    }
+    this.nonSummerRate = seasonRate(fee(formula.non_summer_label), NON_SUMMER) || 0;
+    // 按戶計收可為單一金額，或依相位分列為「<標籤>-單相」「<標籤>-三相」；方案完全沒有按戶計收時為 0
+    const household = formula.household_label;
+    const householdFor = (phase: Phase) =>
+      household === undefined ? undefined : fee(household) ?? fee(`${household}-${PHASE_SUFFIX[phase]}`);
+    const single = householdFor('single');
+    const three = householdFor('three');
+    if (single === undefined && three === undefined) {
+      this.householdFees = { single: 0, three: 0 };
+    } else if (single?.cost === undefined || three?.cost === undefined) {
+      const missing = single?.cost === undefined ? 'single' : 'three';
+      throw new Error(`找不到按戶計收基本電費：${household}-${PHASE_SUFFIX[missing]}`);
+    } else {
+      this.householdFees = { single: single.cost, three: three.cost };
+    }
+  }
+
+  /**
+   * 編譯方案的需量計費規則（每個方案只編譯一次）
+   */
+  static compile(plan: Plan): DemandCharges {
+    let compiled = this.cache.get(plan);
+    if (!compiled) {
+      const formula = plan.raw?.billing_rules?.basic_fee_formula;
+      if (!formula) {
+        throw new Error(`方案 ${plan.id} 沒有契約容量基本電費規則`);
+      }
+      compiled = new DemandCharges(plan, formula);
+      this.cache.set(plan, compiled);
+    }
+    return compiled;
+  }
+
+  /**
+   * 各季節的月基本電費
+   */
+  basicFees(contracts: ContractCapacities, phase: Phase = this.plan.phase ?? 'single'): Float64Array {
+    const { regular = 0, non_summer = 0, semi_peak = 0, saturday_semi_peak = 0, off_peak = 0 } = contracts;
+    const weekendRatio = this.formula.weekend_ratio ?? 0;
+    const fees = new Float64Array(SEASONS);
+
+    for (let season = 0; season < SEASONS; season++) {
+      const rate = (window: number) => this.windowRates[season * WINDOWS + window];
+      const base = regular + (season === NON_SUMMER ? non_summer : 0);
+
+      // 週六半尖峰、離峰契約在經常契約（含非夏月）一定比例以內免收，先抵週六再抵離峰
+      let allowance = weekendRatio * base;
+      const saturday = Math.max(0, saturday_semi_peak - allowance);
+      allowance = Math.max(0, allowance - saturday_semi_peak);
+      const offPeak = Math.max(0, off_peak - allowance);
+
+      fees[season] = regular * rate(0) +
+        (season === NON_SUMMER ? non_summer * this.nonSummerRate : 0) +
+        semi_peak * rate(1) +
+        saturday * rate(2) +
+        offPeak * rate(3) +
+        this.householdFees[phase];
+    }
+    return fees;
+  }
+
+  /**
+   * [季節][需量時段] 的累加契約容量
+   */
+  contractLevels(contracts: ContractCapacities): Float64Array {
+    const { regular = 0, non_summer = 0, semi_peak = 0, saturday_semi_peak = 0, off_peak = 0 } = contracts;
+    const levels = new Float64Array(SEASONS * WINDOWS);
+    for (let season = 0; season < SEASONS; season++) {
+      let level = regular + (season === NON_SUMMER ? non_summer : 0);
+      [0, semi_peak, saturday_semi_peak, off_peak].forEach((capacity, window) => {
+        level += capacity;
+        levels[season * WINDOWS + window] = level;
+      });
+    }
+    return levels;
+  }
+
+  /**
+   * 批次計算多個計費期間的需量電費
+   * @param periods 計費期間，須依時間排序且不重疊；end 為期間最後一天（含當日）
+   */
+  bill(series: DemandSeries, periods: BillingPeriod[], inputs: DemandBillingInputs): DemandBillingResult {
+    const { demandKw } = series;
+    const calendar = inputs.calendar ?? HolidayCalendar.taiwan();
+    const count = periods.length;
+    const n = demandKw.length;
+    if (count === 0) {
+      throw new Error('至少需要一個計費期間');
+    }
+    if ('timestamps' in series && series.timestamps.length !== n) {
+      throw new Error('需量資料與時間點數量不一致');
+    }
+    if (inputs.energy && inputs.energy.length !== count) {
+      throw new Error('流動電費與計費期間數量不一致');
+    }
+
+    const classification = CalculationMetrics.time('classification', () =>
+      'timestamps' in series
+        ? this.compiled.classify(series.timestamps, calendar)
+        : this.compiled.classifyRegular(series.start, series.stepMinutes, n, calendar)
+    );
+    const timeAt = 'timestamps' in series
+      ? (i: number) => series.timestamps[i].getTime()
+      : (i: number) => series.start.getTime() + i * series.stepMinutes * 60000;
+
+    const maxDemand = new Float64Array(count * SEASONS * WINDOWS);
+    const seasonCount = new Float64Array(count * SEASONS);
+    CalculationMetrics.time('demand_reduction', () => {
+      this.reduceMaxDemand(classification, demandKw, timeAt, periods, maxDemand, seasonCount);
+    });
+
+    return CalculationMetrics.time('demand_pricing', () =>
+      this.price(maxDemand, seasonCount, periods, inputs)
+    );
+  }
+
+  /**
+   * 依 [計費期間][季節][需量時段] 分組取最高需量，並統計各期間各季節的時間點數量
+   */
+  private reduceMaxDemand(
+    { seasons, dayTypes, periods: codes }: PeriodClassification,
+    demandKw: ArrayLike<number>,
+    timeAt: (i: number) => number,
+    periods: BillingPeriod[],
+    maxDemand: Float64Array,
+    seasonCount: Float64Array
+  ): void {
+    const starts = Float64Array.from(periods, (period) => period.start.getTime());
+    const ends = Float64Array.from(periods, ({ end }) =>
+      new Date(end.getFullYear(), end.getMonth(), end.getDate() + 1).getTime()
+    );
+    for (let p = 0; p < periods.length; p++) {
+      if (starts[p] >= ends[p] || (p > 0 && starts[p] < ends[p - 1])) {
+        throw new Error('計費期間須依時間排序且不可重疊');
+      }
+    }
+
+    let p = 0;
+    for (let i = 0; i < demandKw.length; i++) {
+      const time = timeAt(i);
+      // 時間點多半已排序，先檢查目前期間，否則二分搜尋
+      if (!(time >= starts[p] && time < ends[p])) {
+        let lo = 0;
+        let hi = periods.length - 1;
+        while (lo < hi) {
+          const mid = (lo + hi + 1) >> 1;
+          if (starts[mid] <= time) lo = mid;
+          else hi = mid - 1;
+        }
+        p = lo;
+        if (!(time >= starts[p] && time < ends[p])) continue;
+      }
+
+      const season = seasons[i];
+      seasonCount[p * SEASONS + season]++;
+      const period = codes[i];
+      if (period === NO_PERIOD) continue;
+      const window = WINDOW_OF[dayTypes[i] * PERIODS.length + period];
+      if (window === NO_PERIOD) continue;
+
+      const group = (p * SEASONS + season) * WINDOWS + window;
+      if (demandKw[i] > maxDemand[group]) {
+        maxDemand[group] = demandKw[i];
+      }
+    }
+  }
+
+  private price(
+    maxDemand: Float64Array,
+    seasonCount: Float64Array,
+    periods: BillingPeriod[],
+    inputs: DemandBillingInputs
+  ): DemandBillingResult {
+    const count = periods.length;
+    const fees = this.basicFees(inputs.contracts, inputs.phase);
+    const levels = this.contractLevels(inputs.contracts);
+    const { threshold_ratio: thresholdRatio, rate_low: rateLow, rate_high: rateHigh } = this.penaltyRule;
+    const zeroUsageRatio = this.plan.raw?.billing_rules?.zero_usage_basic_fee_ratio;
+    const pfRate = this.powerFactorRate(inputs.powerFactor);
+    const applyToTotal = this.powerFactorRule?.apply_to !== 'energy';
+
+    const overContractKw = new Float64Array(count);
+    const basic = new Float64Array(count);
+    const penalty = new Float64Array(count);
+    const energy = inputs.energy ? Float64Array.from(inputs.energy) : new Float64Array(count);
+    const powerFactorAdjustment = new Float64Array(count);
+    const total = new Float64Array(count);
+
+    for (let p = 0; p < count; p++) {
+      const intervals = seasonCount[p * SEASONS] + seasonCount[p * SEASONS + 1];
+      let peakDemand = 0;
+      // 沒有需量資料的期間以起始日的季節計算基本電費
+      const startSeason = this.compiled.seasonLookup.seasonCode(periods[p].start);
+
+      for (let season = 0; season < SEASONS; season++) {
+        const fraction = intervals > 0 ? seasonCount[p * SEASONS + season] / intervals : Number(season === startSeason);
+        basic[p] += fraction * fees[season];
+        if (seasonCount[p * SEASONS + season] === 0) continue;
+
+        let counted = 0;
+        for (let window = 0; window < WINDOWS; window++) {
+          const cell = season * WINDOWS + window;
+          const demand = maxDemand[(p * SEASONS + season) * WINDOWS + window];
+          peakDemand = Math.max(peakDemand, demand);
+          const excess = Math.max(0, demand - levels[cell] - counted);
+          if (excess === 0) continue;
+
+          const within = Math.min(excess, thresholdRatio * levels[cell]);
+          penalty[p] += fraction * ((within * rateLow + (excess - within) * rateHigh) * this.windowRates[cell]);
+          overContractKw[p] += excess;
+          counted += excess;
+        }
+      }
+
+      // 有需量資料但最高需量為 0 才算無用電；沒有資料的期間照常計收
+      if (zeroUsageRatio !== undefined && intervals > 0 && peakDemand === 0) {
+        basic[p] *= zeroUsageRatio;
+      }
+      powerFactorAdjustment[p] = pfRate * (applyToTotal ? basic[p] + energy[p] : energy[p]);
+      total[p] = basic[p] + penalty[p] + energy[p] + powerFactorAdjustment[p];
+    }
+
+    return { maxDemand, overContractKw, basic, penalty, energy, powerFactorAdjustment, total };
+  }
+
+  /**
+   * 功率因數調整比例：低於基準每 1% 加收、高於基準每 1% 減收 step_percent%（減收以上限為止）
+   */
+  private powerFactorRate(powerFactor?: number): number {
+    if (powerFactor === undefined || !this.powerFactorRule) return 0;
+    const { base_percent: base = 80, max_discount_percent: max = 95, step_percent: step = 0.1 } = this.powerFactorRule;
+    return ((base - Math.min(powerFactor, max)) * step) / 100;
+  }
+}
+
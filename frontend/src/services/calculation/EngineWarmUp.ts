@@ -0,0 +1,78 @@
+import type { CalculationInput } from '../../types';
+import { PlansLoader } from './plans';
+import { CompiledPlan } from './CompiledPlan';
+import { TieredBilling } from './TieredBilling';
+import { HolidayCalendar } from './HolidayCalendar';
+import { RateCalculator } from './RateCalculator';
+
+/**
+ * 暖機用的小型試算輸入
+ */
+const WARM_UP_INPUT: CalculationInput = {
+  consumption: 100,
+  billingPeriod: {
+    start: new Date(2025, 6, 1),
+    end: new Date(2025, 6, 31),
+    days: 31,
+  },
+  voltageType: 'low_voltage',
+  phase: 'single',
+};
+
+/**
+ * 計算引擎暖機
+ *
+ * 載入費率資料與假日行事曆、預先編譯所有方案的查表，並對每個方案做一次小型試算，
+ * 讓使用者第一次試算時不必負擔這些延遲建立的成本。
+ * 暖機只執行一次，同時呼叫會共用同一個 Promise；失敗後可再次呼叫重試。
+ */
+export class EngineWarmUp {
+  private static promise: Promise<void> | null = null;
+  private static ready = false;
+
+  /**
+   * 執行暖機
+   */
+  static run(): Promise<void> {
+    if (!this.promise) {
+      this.promise = this.warmUp().catch((error) => {
+        this.promise = null;
+        throw error;
+      });
+    }
+    return this.promise;
+  }
+
+  /**
+   * 暖機是否已完成
+   */
+  static isReady(): boolean {
+    return this.ready;
+  }
+
+  /**
+   * 清除暖機狀態（費率資料重新載入時使用）
+   */
+  static reset(): void {
+    this.promise = null;
+    this.ready = false;
+  }
+
+  private static async warmUp(): Promise<void> {
+    const plans = await PlansLoader.getAll();
+    const calendar = HolidayCalendar.taiwan();
+
+    for (const plan of plans) {
+      CompiledPlan.compile(plan);
+      if (plan.tierRates && plan.tierRates.length > 0) {
+        TieredBilling.compile(plan);
+      }
+    }
+
+    new RateCalculator(plans, calendar).calculateBatch(
+      plans.map((plan) => ({ planId: plan.id, input: WARM_UP_INPUT }))
+    );
+
+    this.ready = true;
+  }
+}
@@ -0,0 +1,251 @@
+import type { Plan, CalculationInput, BillingInputs, BillingPeriod } from '../../types';
+import { CompiledPlan } from './CompiledPlan';
+import { HolidayCalendar } from './HolidayCalendar';
+import { RateCalculator } from './RateCalculator';
+import { TieredBilling } from './TieredBilling';
+import { NO_PERIOD, PERIODS, SEASON_NAMES } from './PeriodLookup';
+import type { PeriodClassification } from './PeriodLookup';
+
+const MS_PER_DAY = 24 * 60 * 60 * 1000;
+
+/**
+ * 單一電號的用電資料（與 FleetUsage.timestamps 對齊）
+ */
+export interface FleetMeter {
+  meterId: string;
+  usage: ArrayLike<number>;
+  inputs?: BillingInputs;
+}
+
+/**
+ * 多電號用電資料（寬表：所有電號共用同一組時間點）
+ */
+export interface FleetUsage {
+  timestamps: Date[];
+  meters: FleetMeter[];
+}
+
+/**
+ * 長表格式的用電資料列
+ */
+export interface FleetUsageRow {
+  meterId: string;
+  timestamp: Date;
+  kwh: number;
+}
+
+/**
+ * 電號 × 方案 的計費結果列
+ */
+export interface FleetBillRow {
+  meterId: string;
+  planId: string;
+  /** 總度數 */
+  totalKwh: number;
+  /** 基本電費 */
+  basic: number;
+  /** 流動電費 */
+  energy: number;
+  /** 總電費 */
+  total: number;
+  /** 無對應時段或費率而未計價的度數 */
+  unpricedKwh: number;
+  /** 計算失敗的原因（成功時為 undefined） */
+  error?: string;
+}
+
+/**
+ * 多電號計費選項
+ */
+export interface FleetBillingOptions {
+  /** 假日行事曆（預設為臺灣國定假日） */
+  calendar?: HolidayCalendar;
+  /** 累進方案的級距上限倍數（預設依時間點涵蓋的日數換算月數） */
+  cycleMonths?: number;
+}
+
+/**
+ * 多電號計費
+ *
+ * 所有電號共用同一組時間點，季節、日期型別與時段分類只依
+ * CompiledPlan.classificationKey 各做一次，再逐電號彙總各時段度數，
+ * 以實際（非估算）時段用電交給 RateCalculator 計算基本電費、流動電費與總電費。
+ * 時間點應屬同一計費期間，季節依 RateCalculator 的規則以整段期間判斷。
+ */
+export class FleetBilling {
+  /**
+   * 長表轉為寬表：時間點取所有電號的聯集並排序，缺少的時間點度數為 0
+   */
+  static fromLong(rows: Iterable<FleetUsageRow>): FleetUsage {
+    const timeIndex = new Map<number, number>();
+    const times: number[] = [];
+    const meterRows = new Map<string, FleetUsageRow[]>();
+
+    for (const row of rows) {
+      const time = row.timestamp.getTime();
+      if (!timeIndex.has(time)) {
+        timeIndex.set(time, -1);
+        times.push(time);
+      }
+      let list = meterRows.get(row.meterId);
+      if (!list) {
+        list = [];
+        meterRows.set(row.meterId, list);
+      }
+      list.push(row);
+    }
+
+    times.sort((a, b) => a - b);
+    times.forEach((time, index) => timeIndex.set(time, index));
+
+    const meters: FleetMeter[] = [];
+    for (const [meterId, list] of meterRows) {
+      const usage = new Float64Array(times.length);
+      for (const row of list) {
+        usage[timeIndex.get(row.timestamp.getTime())!] += row.kwh;
+      }
+      meters.push({ meterId, usage });
+    }
+
+    return { timestamps: times.map((time) => new Date(time)), meters };
+  }
+
+  /**
+   * 計算所有電號在各方案下的電費，每個 電號 × 方案 一列
+   */
+  static bill(plans: Plan[], fleet: FleetUsage, options: FleetBillingOptions = {}): FleetBillRow[] {
+    const { timestamps, meters } = fleet;
+    const calendar = options.calendar ?? HolidayCalendar.taiwan();
+    for (const meter of meters) {
+      if (meter.usage.length !== timestamps.length) {
+        throw new Error(`電號 ${meter.meterId} 的用電資料與時間點數量不一致`);
+      }
+    }
+    if (timestamps.length === 0) {
+      return plans.flatMap((plan) => meters.map((meter) => this.failedRow(meter, plan, '沒有用電資料')));
+    }
+
+    const billingPeriod = this.billingPeriod(timestamps);
+    const cycleMonths = options.cycleMonths ?? TieredBilling.cycleMonthsForDays(billingPeriod.days);
+    const calculator = new RateCalculator(plans, calendar);
+    const classifications = new Map<string, PeriodClassification>();
+    const rows: FleetBillRow[] = [];
+
+    for (const plan of plans) {
+      // 每個方案的列先收集在本地，失敗時整組換成失敗列，確保每個方案恰好一列一個電號
+      const planRows: FleetBillRow[] = [];
+      try {
+        const compiled = CompiledPlan.compile(plan);
+        let classification = classifications.get(compiled.classificationKey);
+        if (!classification) {
+          classification = compiled.classify(timestamps, calendar);
+          classifications.set(compiled.classificationKey, classification);
+        }
+
+        // 各 季節 × 時段 是否有費率
+        const rated = SEASON_NAMES.map((season) => PERIODS.map((period) => compiled.rate(season, period) !== undefined));
+        for (const meter of meters) {
+          const { kwh, totalKwh, unpricedKwh } = this.periodUsage(classification, rated, meter.usage);
+          const input: CalculationInput = {
+            consumption: totalKwh,
+            billingPeriod,
+            voltageType: meter.inputs?.voltageType ?? 'low_voltage',
+            voltageV: meter.inputs?.voltageV,
+            phase: meter.inputs?.phase ?? 'single',
+            contractCapacity: meter.inputs?.contractCapacity,
+            cycleMonths,
+          };
+          if (plan.touType !== 'none') {
+            input.touConsumption = {
+              peakOnPeak: kwh[PERIODS.indexOf('peak')],
+              semiPeak: kwh[PERIODS.indexOf('semi_peak')],
+              offPeak: kwh[PERIODS.indexOf('off_peak')],
+              isEstimated: false,
+            };
+          }
+          // 實測計價允許 0 度：沒有用電的電號仍計收基本電費與最低用電
+          const { charges } = calculator.calculateMeasured(plan, input);
+          planRows.push({
+            meterId: meter.meterId,
+            planId: plan.id,
+            totalKwh,
+            basic: charges.base,
+            energy: charges.energy,
+            total: charges.total,
+            unpricedKwh: plan.touType === 'none' ? 0 : unpricedKwh,
+          });
+        }
+      } catch (error) {
+        const message = error instanceof Error ? error.message : String(error);
+        planRows.length = 0;
+        for (const meter of meters) {
+          planRows.push(this.failedRow(meter, plan, message));
+        }
+      }
+      rows.push(...planRows);
+    }
+
+    return rows;
+  }
+
+  /**
+   * 彙總單一電號各時段的度數，並累計無對應時段或費率的度數
+   */
+  private static periodUsage(
+    classification: PeriodClassification,
+    rated: boolean[][],
+    usage: ArrayLike<number>
+  ): { kwh: Float64Array; totalKwh: number; unpricedKwh: number } {
+    const { seasons, periods } = classification;
+    const kwh = new Float64Array(PERIODS.length);
+    let totalKwh = 0;
+    let unpricedKwh = 0;
+
+    for (let i = 0; i < usage.length; i++) {
+      const value = usage[i];
+      totalKwh += value;
+      const code = periods[i];
+      if (code === NO_PERIOD) {
+        unpricedKwh += value;
+      } else {
+        kwh[code] += value;
+        if (!rated[seasons[i]][code]) unpricedKwh += value;
+      }
+    }
+
+    return { kwh, totalKwh, unpricedKwh };
+  }
+
+  /**
+   * 時間點涵蓋的計費期間（以日曆日計）
+   */
+  private static billingPeriod(timestamps: Date[]): BillingPeriod {
+    let start = timestamps[0].getTime();
+    let end = start;
+    for (const ts of timestamps) {
+      const time = ts.getTime();
+      if (time < start) start = time;
+      if (time > end) end = time;
+    }
+    const first = new Date(start);
+    const last = new Date(end);
+    const days = Math.round(
+      (new Date(last.getFullYear(), last.getMonth(), last.getDate()).getTime() -
+        new Date(first.getFullYear(), first.getMonth(), first.getDate()).getTime()) / MS_PER_DAY
+    ) + 1;
+    return { start: first, end: last, days };
+  }
+
+  private static failedRow(meter: FleetMeter, plan: Plan, error: string): FleetBillRow {
+    return {
+      meterId: meter.meterId,
+      planId: plan.id,
+      totalKwh: 0,
+      basic: 0,
+      energy: 0,
+      total: 0,
+      unpricedKwh: 0,
+      error,
+    };
+  }
+}
@@ -0,0 +1,290 @@
+import type { BillingInputs, Plan } from '../../types';
+import { FleetBilling } from './FleetBilling';
+import type { FleetBillRow, FleetUsage } from './FleetBilling';
+import { HolidayCalendar } from './HolidayCalendar';
+import { hashString, stableStringify } from './ResultCache';
+
+/**
+ * 送給 Worker 的計費工作
+ */
+export interface FleetTask {
+  id: number;
+  /** 各方案的識別鍵（方案 ID + 內容雜湊） */
+  planKeys: string[];
+  /** 方案資料；Worker 已快取的方案為 null，不再複製 */
+  plans: Array<Plan | null>;
+  /** 時間點（epoch 毫秒）；跨來源隔離時為 SharedArrayBuffer，各 Worker 共用 */
+  times: Float64Array;
+  meterIds: string[];
+  /** 各電號的計費條件（未指定為 null） */
+  meterInputs: Array<BillingInputs | null>;
+  usage: Float64Array[];
+  /** 自訂假日行事曆快取檔（null 表示使用內建臺灣行事曆） */
+  calendar: Uint8Array | null;
+  cycleMonths?: number;
+}
+
+/**
+ * Worker 回傳的計費結果
+ */
+export interface FleetTaskResult {
+  id: number;
+  rows?: FleetBillRow[];
+  error?: string;
+}
+
+/**
+ * Worker 介面（瀏覽器 Worker 的最小子集，方便測試時替換）
+ */
+export interface FleetWorker {
+  postMessage(message: FleetTask, transfer: Transferable[]): void;
+  onmessage: ((event: MessageEvent<FleetTaskResult>) => void) | null;
+  onerror: ((event: ErrorEvent) => void) | null;
+  terminate(): void;
+}
+
+/**
+ * 平行計費選項
+ */
+export interface FleetWorkerPoolOptions {
+  calendar?: HolidayCalendar;
+  cycleMonths?: number;
+}
+
+/**
+ * Worker 內依識別鍵快取的方案：沿用同一個物件，CompiledPlan 等以物件為鍵的查表快取才會命中。
+ * 同一方案 ID 只保留最新內容，快取大小以方案數為上限
+ */
+const workerPlans = new Map<string, Plan>();
+
+/**
+ * 執行一份計費工作（於 Worker 內呼叫）
+ */
+export function runFleetTask(task: FleetTask): FleetBillRow[] {
+  const plans = task.planKeys.map((key, p) => {
+    let plan = workerPlans.get(key);
+    if (!plan) {
+      const received = task.plans[p];
+      if (!received) {
+        throw new Error(`Worker 缺少方案資料：${key}`);
+      }
+      plan = received;
+      for (const [cachedKey, cached] of workerPlans) {
+        if (cached.id === plan.id) workerPlans.delete(cachedKey);
+      }
+      workerPlans.set(key, plan);
+    }
+    return plan;
+  });
+  const calendar = task.calendar ? HolidayCalendar.fromSnapshot(task.calendar) : HolidayCalendar.taiwan();
+  const timestamps = Array.from(task.times, (time) => new Date(time));
+  const meters = task.meterIds.map((meterId, m) => ({
+    meterId,
+    usage: task.usage[m],
+    inputs: task.meterInputs[m] ?? undefined,
+  }));
+  return FleetBilling.bill(plans, { timestamps, meters }, { calendar, cycleMonths: task.cycleMonths });
+}
+
+/**
+ * 可共用時配置於 SharedArrayBuffer，否則配置一般記憶體
+ */
+function sharedCopy<T extends Float64Array | Uint8Array>(
+  source: ArrayLike<number>,
+  create: (buffer: ArrayBufferLike) => T,
+  bytesPerElement: number
+): T {
+  const canShare = typeof SharedArrayBuffer !== 'undefined' && globalThis.crossOriginIsolated === true;
+  const buffer = canShare
+    ? new SharedArrayBuffer(source.length * bytesPerElement)
+    : new ArrayBuffer(source.length * bytesPerElement);
+  const array = create(buffer);
+  array.set(source);
+  return array;
+}
+
+/**
+ * 等待 Worker 回傳的工作
+ */
+interface PendingTask {
+  /** 負責的 Worker 索引 */
+  worker: number;
+  resolve: (rows: FleetBillRow[]) => void;
+  reject: (error: Error) => void;
+  /** Worker 發生錯誤時於目前執行緒計算同一區塊 */
+  fallback: () => FleetBillRow[];
+}
+
+const createDefaultWorker = (): FleetWorker =>
+  new Worker(new URL('./fleetBilling.worker.ts', import.meta.url), { type: 'module' });
+
+/**
+ * 多電號平行計費
+ *
+ * 將電號平均分給多個 Web Worker 計算。方案以「方案 ID + 內容雜湊」識別，
+ * 每個 Worker 只收到一次方案資料並沿用同一個物件，編譯後的查表在後續工作中直接重用。
+ * 時間點與自訂行事曆在跨來源隔離（crossOriginIsolated）時放在 SharedArrayBuffer
+ * 供所有 Worker 共用，否則各複製一份；各電號的用電資料以 transfer 移交不複製。
+ * 結果列順序與 FleetBilling.bill 相同（依方案、再依電號）。
+ * 某個 Worker 發生錯誤時只影響它負責的區塊：改在目前執行緒計算，該 Worker 於下次使用時重新建立。
+ */
+export class FleetWorkerPool {
+  private static planKeys = new WeakMap<Plan, string>();
+
+  private readonly workers: Array<FleetWorker | undefined> = [];
+  /** 各 Worker 已收到的方案（方案 ID → 識別鍵，與 Worker 端相同只保留最新內容） */
+  private readonly knownPlans: Array<Map<string, string>> = [];
+  private readonly pending = new Map<number, PendingTask>();
+  private nextId = 0;
+
+  private readonly createWorker: () => FleetWorker;
+  readonly size: number;
+
+  constructor(
+    createWorker: () => FleetWorker = createDefaultWorker,
+    size: number = globalThis.navigator?.hardwareConcurrency ?? 4
+  ) {
+    this.createWorker = createWorker;
+    this.size = Math.max(1, size);
+  }
+
+  /**
+   * 平行計算所有電號在各方案下的電費
+   */
+  async bill(plans: Plan[], fleet: FleetUsage, options: FleetWorkerPoolOptions = {}): Promise<FleetBillRow[]> {
+    const { timestamps, meters } = fleet;
+    for (const meter of meters) {
+      if (meter.usage.length !== timestamps.length) {
+        throw new Error(`電號 ${meter.meterId} 的用電資料與時間點數量不一致`);
+      }
+    }
+    if (meters.length === 0) return [];
+
+    const times = sharedCopy(
+      timestamps.map((ts) => ts.getTime()),
+      (buffer) => new Float64Array(buffer),
+      Float64Array.BYTES_PER_ELEMENT
+    );
+    const calendar = options.calendar && options.calendar !== HolidayCalendar.taiwan()
+      ? sharedCopy(options.calendar.toSnapshot(), (buffer) => new Uint8Array(buffer), 1)
+      : null;
+
+    const planKeys = plans.map((plan) => FleetWorkerPool.planKey(plan));
+    const chunkCount = Math.min(this.size, meters.length);
+    const chunkSize = Math.ceil(meters.length / chunkCount);
+    const chunks: Array<Promise<FleetBillRow[]>> = [];
+    const chunkMeterCounts: number[] = [];
+
+    for (let c = 0; c * chunkSize < meters.length; c++) {
+      const chunk = meters.slice(c * chunkSize, (c + 1) * chunkSize);
+      const usage = chunk.map((meter) => Float64Array.from(meter.usage));
+      chunkMeterCounts.push(chunk.length);
+      const known = this.knownPlans[c] ?? new Map<string, string>();
+      chunks.push(this.run(c, {
+        id: this.nextId++,
+        planKeys,
+        plans: plans.map((plan, p) => (known.get(plan.id) === planKeys[p] ? null : plan)),
+        times,
+        meterIds: chunk.map((meter) => meter.meterId),
+        meterInputs: chunk.map((meter) => meter.inputs ?? null),
+        usage,
+        calendar,
+        cycleMonths: options.cycleMonths,
+      }, usage.map((array) => array.buffer as ArrayBuffer), () => FleetBilling.bill(plans, { timestamps, meters: chunk }, options)));
+    }
+
+    const chunkRows = await Promise.all(chunks);
+
+    // 各區塊的結果依方案排列，合併為 方案 → 電號 的順序
+    const rows: FleetBillRow[] = [];
+    plans.forEach((_, p) => {
+      chunkRows.forEach((list, c) => {
+        const count = chunkMeterCounts[c];
+        rows.push(...list.slice(p * count, (p + 1) * count));
+      });
+    });
+    return rows;
+  }
+
+  /**
+   * 結束所有 Worker
+   */
+  terminate(): void {
+    for (const worker of this.workers) {
+      worker?.terminate();
+    }
+    this.workers.length = 0;
+    this.knownPlans.length = 0;
+    for (const { reject } of this.pending.values()) {
+      reject(new Error('計費工作已中止'));
+    }
+    this.pending.clear();
+  }
+
+  /**
+   * 方案識別鍵：ID 加內容雜湊，同 ID 但內容不同（如費率更新）的方案不會誤用快取
+   */
+  private static planKey(plan: Plan): string {
+    let key = this.planKeys.get(plan);
+    if (key === undefined) {
+      key = `${plan.id}:${hashString(stableStringify(plan))}`;
+      this.planKeys.set(plan, key);
+    }
+    return key;
+  }
+
+  private run(
+    index: number,
+    task: FleetTask,
+    transfer: Transferable[],
+    fallback: () => FleetBillRow[]
+  ): Promise<FleetBillRow[]> {
+    const worker = this.getWorker(index);
+    const known = this.knownPlans[index];
+    task.plans.forEach((plan, p) => {
+      if (plan) known.set(plan.id, task.planKeys[p]);
+    });
+    return new Promise((resolve, reject) => {
+      this.pending.set(task.id, { worker: index, resolve, reject, fallback });
+      worker.postMessage(task, transfer);
+    });
+  }
+
+  private getWorker(index: number): FleetWorker {
+    let worker = this.workers[index];
+    if (!worker) {
+      worker = this.createWorker();
+      worker.onmessage = (event) => {
+        const { id, rows, error } = event.data;
+        const handlers = this.pending.get(id);
+        if (!handlers) return;
+        this.pending.delete(id);
+        if (rows) {
+          handlers.resolve(rows);
+        } else {
+          handlers.reject(new Error(error ?? '計費工作失敗'));
+        }
+      };
+      worker.onerror = () => {
+        // 用電資料已移交給 Worker，改由原始資料在目前執行緒重算此 Worker 的區塊
+        worker.terminate();
+        if (this.workers[index] === worker) {
+          this.workers[index] = undefined;
+          this.knownPlans[index].clear();
+        }
+        for (const [id, task] of this.pending) {
+          if (task.worker !== index) continue;
+          this.pending.delete(id);
+          try {
+            task.resolve(task.fallback());
+          } catch (error) {
+            task.reject(error instanceof Error ? error : new Error(String(error)));
+          }
+        }
+      };
+      this.workers[index] = worker;
+      this.knownPlans[index] = new Map();
+    }
+    return worker;
+  }
+}
@@ -0,0 +1,189 @@
+import { TAIWAN_HOLIDAY_SNAPSHOT } from './holidaySnapshot';
+
+/**
+ * 每年點陣圖的位元組數（366 天）
+ */
+export const BYTES_PER_YEAR = Math.ceil(366 / 8);
+
+/**
+ * 快取檔識別碼（"TWHC"）
+ */
+export const SNAPSHOT_MAGIC = 0x43485754;
+
+/**
+ * 快取檔格式版本
+ */
+export const SNAPSHOT_VERSION = 1;
+
+/**
+ * 快取檔標頭：識別碼 u32、版本 u16、起始年份 u16、年數 u16、保留 u16（little-endian）
+ */
+export const SNAPSHOT_HEADER_BYTES = 12;
+
+const MS_PER_DAY = 24 * 60 * 60 * 1000;
+
+/**
+ * 一年中的第幾天（1 月 1 日為 0）
+ */
+export function dayOfYear(date: Date): number {
+  const year = date.getFullYear();
+  return (Date.UTC(year, date.getMonth(), date.getDate()) - Date.UTC(year, 0, 1)) / MS_PER_DAY;
+}
+
+/**
+ * base64 字串解碼為位元組
+ */
+function decodeBase64(base64: string): Uint8Array {
+  const binary = atob(base64);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
+/**
+ * 假日行事曆
+ *
+ * 每年以一個依「一年中的第幾天」索引的點陣圖儲存假日，
+ * 查詢單日或整批時間點都只是位元運算，不需逐日比對日期字串。
+ */
+export class HolidayCalendar {
+  private static taiwanCalendar: HolidayCalendar | null = null;
+
+  /** 年份 → 點陣圖 */
+  private readonly years = new Map<number, Uint8Array>();
+
+  /**
+   * 臺灣國定假日行事曆（由內建快取檔載入，共用同一份）
+   */
+  static taiwan(): HolidayCalendar {
+    if (!this.taiwanCalendar) {
+      this.taiwanCalendar = this.fromSnapshot(decodeBase64(TAIWAN_HOLIDAY_SNAPSHOT));
+    }
+    return this.taiwanCalendar;
+  }
+
+  /**
+   * 由快取檔載入行事曆
+   *
+   * 各年點陣圖直接引用快取檔的位元組（不複製），
+   * 同一份快取檔載入的行事曆共用同一塊記憶體。
+   */
+  static fromSnapshot(bytes: Uint8Array): HolidayCalendar {
+    if (bytes.byteLength < SNAPSHOT_HEADER_BYTES) {
+      throw new Error('假日快取檔格式錯誤');
+    }
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    if (view.getUint32(0, true) !== SNAPSHOT_MAGIC) {
+      throw new Error('假日快取檔格式錯誤');
+    }
+    const version = view.getUint16(4, true);
+    if (version !== SNAPSHOT_VERSION) {
+      throw new Error(`不支援的假日快取檔版本：${version}`);
+    }
+    const firstYear = view.getUint16(6, true);
+    const yearCount = view.getUint16(8, true);
+    if (bytes.byteLength !== SNAPSHOT_HEADER_BYTES + yearCount * BYTES_PER_YEAR) {
+      throw new Error('假日快取檔長度不符');
+    }
+
+    const calendar = new HolidayCalendar();
+    for (let i = 0; i < yearCount; i++) {
+      const offset = SNAPSHOT_HEADER_BYTES + i * BYTES_PER_YEAR;
+      calendar.years.set(firstYear + i, bytes.subarray(offset, offset + BYTES_PER_YEAR));
+    }
+    return calendar;
+  }
+
+  /**
+   * 自訂假日行事曆
+   * @param dates 假日日期（Date 或 "YYYY-MM-DD"）
+   */
+  static custom(dates: Iterable<Date | string>): HolidayCalendar {
+    const calendar = new HolidayCalendar();
+    for (const date of dates) {
+      if (typeof date === 'string') {
+        const [year, month, day] = date.split('-').map(Number);
+        calendar.add(new Date(year, month - 1, day));
+      } else {
+        calendar.add(date);
+      }
+    }
+    return calendar;
+  }
+
+  /**
+   * 加入假日
+   */
+  private add(date: Date): void {
+    const year = date.getFullYear();
+    let bits = this.years.get(year);
+    if (!bits) {
+      bits = new Uint8Array(BYTES_PER_YEAR);
+      this.years.set(year, bits);
+    }
+    const doy = dayOfYear(date);
+    bits[doy >> 3] |= 1 << (doy & 7);
+  }
+
+  /**
+   * 是否為假日
+   */
+  isHoliday(date: Date): boolean {
+    const bits = this.years.get(date.getFullYear());
+    if (!bits) return false;
+    const doy = dayOfYear(date);
+    return ((bits[doy >> 3] >> (doy & 7)) & 1) === 1;
+  }
+
+  /**
+   * 批次判斷假日，回傳與輸入等長的遮罩（1 = 假日）
+   */
+  isHolidayMask(dates: ArrayLike<Date>): Uint8Array {
+    const mask = new Uint8Array(dates.length);
+    let year = NaN;
+    let bits: Uint8Array | undefined;
+
+    for (let i = 0; i < dates.length; i++) {
+      const date = dates[i];
+      const dateYear = date.getFullYear();
+      if (dateYear !== year) {
+        year = dateYear;
+        bits = this.years.get(dateYear);
+      }
+      if (!bits) continue;
+      const doy = dayOfYear(date);
+      mask[i] = (bits[doy >> 3] >> (doy & 7)) & 1;
+    }
+
+    return mask;
+  }
+
+  /**
+   * 輸出為快取檔（涵蓋年份之間缺少的年份以空點陣圖補齊）
+   */
+  toSnapshot(): Uint8Array {
+    const years = this.coveredYears();
+    const firstYear = years.length > 0 ? years[0] : 0;
+    const yearCount = years.length > 0 ? years[years.length - 1] - firstYear + 1 : 0;
+
+    const bytes = new Uint8Array(SNAPSHOT_HEADER_BYTES + yearCount * BYTES_PER_YEAR);
+    const view = new DataView(bytes.buffer);
+    view.setUint32(0, SNAPSHOT_MAGIC, true);
+    view.setUint16(4, SNAPSHOT_VERSION, true);
+    view.setUint16(6, firstYear, true);
+    view.setUint16(8, yearCount, true);
+    for (const [year, bits] of this.years) {
+      bytes.set(bits, SNAPSHOT_HEADER_BYTES + (year - firstYear) * BYTES_PER_YEAR);
+    }
+    return bytes;
+  }
+
+  /**
+   * 行事曆涵蓋的年份
+   */
+  coveredYears(): number[] {
+    return [...this.years.keys()].sort((a, b) => a - b);
+  }
+}
@@ -0,0 +1,67 @@
+import type { Plan } from '../../types';
+import { CompiledPlan } from './CompiledPlan';
+import { HolidayCalendar } from './HolidayCalendar';
+
+/**
+ * 逐時段電費匯出選項
+ */
+export interface IntervalCostExportOptions {
+  /** 每批處理的時間點數量（預設 8760，約一年的每小時資料） */
+  chunkSize?: number;
+  /** 假日行事曆（預設為臺灣國定假日） */
+  calendar?: HolidayCalendar;
+  /** 是否輸出標題列（預設 true） */
+  header?: boolean;
+}
+
+export const INTERVAL_COST_CSV_HEADER = 'timestamp,usage_kwh,rate_twd_per_kwh,cost_twd\n';
+
+const pad = (value: number): string => String(value).padStart(2, '0');
+
+/**
+ * 時間點格式化為 "YYYY-MM-DD HH:MM"
+ */
+function formatTimestamp(date: Date): string {
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())} ${pad(date.getHours())}:${pad(date.getMinutes())}`;
+}
+
+/**
+ * 逐批產生逐時段電費 CSV
+ *
+ * 每批只分類、計價 chunkSize 個時間點並輸出對應的 CSV 文字，
+ * 記憶體用量只與批次大小有關，可用於多年份的逐時段稽核檔。
+ * 無時段或費率的時間點，費率欄位留空、電費為 0。
+ */
+export function* intervalCostCsvChunks(
+  plan: Plan,
+  timestamps: ArrayLike<Date>,
+  usage: ArrayLike<number>,
+  options: IntervalCostExportOptions = {}
+): Generator<string> {
+  const { chunkSize = 8760, calendar = HolidayCalendar.taiwan(), header = true } = options;
+  if (timestamps.length !== usage.length) {
+    throw new Error('用電資料與時間點數量不一致');
+  }
+  if (!Number.isInteger(chunkSize) || chunkSize <= 0) {
+    throw new Error('批次大小必須為正整數');
+  }
+
+  const compiled = CompiledPlan.compile(plan);
+  if (header) {
+    yield INTERVAL_COST_CSV_HEADER;
+  }
+
+  for (let start = 0; start < timestamps.length; start += chunkSize) {
+    const end = Math.min(start + chunkSize, timestamps.length);
+    const chunkTimestamps = Array.prototype.slice.call(timestamps, start, end) as Date[];
+    const chunkUsage = Array.prototype.slice.call(usage, start, end) as number[];
+    const { rates, costs } = compiled.intervalCosts(chunkTimestamps, chunkUsage, calendar);
+
+    const lines: string[] = new Array(chunkTimestamps.length);
+    for (let i = 0; i < chunkTimestamps.length; i++) {
+      const rate = Number.isNaN(rates[i]) ? '' : String(rates[i]);
+      lines[i] = `${formatTimestamp(chunkTimestamps[i])},${chunkUsage[i]},${rate},${costs[i]}\n`;
+    }
+    yield lines.join('');
+  }
+}
@@ -0,0 +1,340 @@
+import type { DayType, Period, Plan, ScheduleSlot, Season } from '../../types';
+import { HolidayCalendar } from './HolidayCalendar';
+
+/**
+ * 時段代碼順序（與 plans.json definitions.periods 一致）
+ */
+export const PERIODS: readonly Period[] = ['peak', 'semi_peak', 'off_peak', 'flat'];
+
+/**
+ * 日期型別代碼順序（與 plans.json definitions.day_types 一致）
+ */
+export const DAY_TYPES: readonly DayType[] = ['weekday', 'saturday', 'sunday_holiday'];
+
+/**
+ * 季節代碼順序
+ */
+export const SEASON_NAMES: readonly Season['name'][] = ['summer', 'non_summer'];
+
+/**
+ * 未被任何時段涵蓋的分鐘
+ */
+export const NO_PERIOD = 255;
+
+export const MINUTES_PER_DAY = 24 * 60;
+
+/**
+ * 時段分類結果（每個時間點的季節、日期型別與時段代碼）
+ */
+export interface PeriodClassification {
+  seasons: Uint8Array;
+  dayTypes: Uint8Array;
+  periods: Uint8Array;
+}
+
+/**
+ * "HH:MM" 轉為一天中的分鐘數（"24:00" 為 1440）
+ */
+function toMinutes(hhmm: string): number {
+  const [h, m] = hhmm.split(':').map(Number);
+  return h * 60 + m;
+}
+
+/**
+ * "MM-DD" 轉為 月 * 100 + 日，方便比較
+ */
+function toMonthDay(mmdd: string): number {
+  const [m, d] = mmdd.split('-').map(Number);
+  return m * 100 + d;
+}
+
+/**
+ * 日期型別代碼：週日與假日為 sunday_holiday、週六為 saturday，其餘為 weekday
+ */
+export function dayTypeCode(date: Date, isHoliday = false): number {
+  const day = date.getDay();
+  if (day === 0 || isHoliday) return 2;
+  if (day === 6) return 1;
+  return 0;
+}
+
+/**
+ * 是否可用固定間隔的日模板分類：間隔為整數分鐘且整除一天，起點不含秒數，
+ * 且整段期間的時區偏移不變（執行環境的時區在期間內有日光節約時間切換時，
+ * 當地的一天不再恰好是 1440 / 間隔 個時間點）
+ */
+export function isRegularStep(start: Date, stepMinutes: number, count: number): boolean {
+  if (
+    !Number.isInteger(stepMinutes) ||
+    stepMinutes <= 0 ||
+    MINUTES_PER_DAY % stepMinutes !== 0 ||
+    start.getSeconds() !== 0 ||
+    start.getMilliseconds() !== 0
+  ) {
+    return false;
+  }
+
+  const offset = start.getTimezoneOffset();
+  const last = new Date(start.getTime() + Math.max(0, count - 1) * stepMinutes * 60000);
+  if (last.getTimezoneOffset() !== offset) return false;
+  const days = Math.ceil((start.getHours() * 60 + start.getMinutes() + count * stepMinutes) / MINUTES_PER_DAY);
+  for (let day = 1; day <= days; day++) {
+    if (new Date(start.getFullYear(), start.getMonth(), start.getDate() + day).getTimezoneOffset() !== offset) {
+      return false;
+    }
+  }
+  return true;
+}
+
+/**
+ * 以日模板分類固定間隔的時間序列
+ *
+ * 間隔整除一天時，每天各時間點在一天中的分鐘數都相同，
+ * 只需逐日查季節與日期型別，再複製該 (季節, 日期型別) 的日模板，不必為每個時間點建立 Date。
+ * 時間依當地時間逐日排列，呼叫前須以 isRegularStep 確認期間內時區偏移不變。
+ * @param template [季節][日期型別][日內第幾個時間點] 的時段代碼
+ */
+export function tileDayTemplates(
+  start: Date,
+  stepMinutes: number,
+  count: number,
+  template: Uint8Array,
+  seasonLookup: SeasonLookup,
+  calendar: HolidayCalendar
+): PeriodClassification {
+  const slotsPerDay = MINUTES_PER_DAY / stepMinutes;
+  const seasons = new Uint8Array(count);
+  const dayTypes = new Uint8Array(count);
+  const periods = new Uint8Array(count);
+
+  let slot = Math.floor((start.getHours() * 60 + start.getMinutes()) / stepMinutes);
+  for (let day = 0, i = 0; i < count; day++) {
+    const date = new Date(start.getFullYear(), start.getMonth(), start.getDate() + day);
+    const season = seasonLookup.seasonCode(date);
+    const dayType = dayTypeCode(date, calendar.isHoliday(date));
+    const take = Math.min(slotsPerDay - slot, count - i);
+    const base = (season * DAY_TYPES.length + dayType) * slotsPerDay;
+
+    seasons.fill(season, i, i + take);
+    dayTypes.fill(dayType, i, i + take);
+    periods.set(template.subarray(base + slot, base + slot + take), i);
+    i += take;
+    slot = 0;
+  }
+
+  return { seasons, dayTypes, periods };
+}
+
+/**
+ * 季節查表
+ *
+ * 預先建立 [月 * 32 + 日] → 季節代碼 的陣列，同一組季節定義只建立一次
+ */
+export class SeasonLookup {
+  private static cache = new WeakMap<Plan['seasons'], SeasonLookup>();
+
+  private readonly codes: Uint8Array;
+
+  private constructor(seasons: Plan['seasons']) {
+    const summerStart = toMonthDay(seasons.summer.start);
+    const summerEnd = toMonthDay(seasons.summer.end);
+    this.codes = new Uint8Array(13 * 32);
+    for (let month = 1; month <= 12; month++) {
+      for (let day = 1; day <= 31; day++) {
+        const md = month * 100 + day;
+        const isSummer = summerStart <= summerEnd
+          ? md >= summerStart && md <= summerEnd
+          : md >= summerStart || md <= summerEnd;
+        this.codes[month * 32 + day] = isSummer ? 0 : 1;
+      }
+    }
+  }
+
+  /**
+   * 取得季節定義的查表
+   */
+  static forSeasons(seasons: Plan['seasons']): SeasonLookup {
+    let lookup = this.cache.get(seasons);
+    if (!lookup) {
+      lookup = new SeasonLookup(seasons);
+      this.cache.set(seasons, lookup);
+    }
+    return lookup;
+  }
+
+  /**
+   * 日期的季節代碼（0 = 夏季、1 = 非夏季）
+   */
+  seasonCode(date: Date): number {
+    return this.codes[(date.getMonth() + 1) * 32 + date.getDate()];
+  }
+}
+
+/**
+ * 時段查表
+ *
+ * 依方案時段排程預先建立 (季節, 日期型別, 一天中的分鐘) → 時段代碼 的密集陣列，
+ * 每個方案只建立一次。之後分類任一時間點都只是一次陣列索引，
+ * 成本與方案的時段數量無關。
+ */
+export class PeriodLookupTable {
+  private static cache = new WeakMap<Plan, PeriodLookupTable | null>();
+
+  /** [季節][日期型別][分鐘] 的時段代碼 */
+  readonly codes: Uint8Array;
+
+  /** [季節][日期型別][時段] 的每日分鐘數 */
+  private readonly minuteCounts: Uint16Array;
+
+  /** 方案的季節查表 */
+  readonly seasonLookup: SeasonLookup;
+
+  /** 時段排程的特徵字串，排程相同的方案特徵相同 */
+  readonly scheduleSignature: string;
+
+  /** 各「間隔/相位」的日模板 */
+  private readonly dayTemplates = new Map<string, Uint8Array>();
+
+  private constructor(schedules: ScheduleSlot[], seasons: Plan['seasons']) {
+    const cells = SEASON_NAMES.length * DAY_TYPES.length;
+    this.codes = new Uint8Array(cells * MINUTES_PER_DAY).fill(NO_PERIOD);
+
+    for (const slot of schedules) {
+      const season = SEASON_NAMES.indexOf(slot.season);
+      const dayType = DAY_TYPES.indexOf(slot.dayType);
+      const period = PERIODS.indexOf(slot.period);
+      if (season < 0 || dayType < 0 || period < 0) continue;
+
+      const base = (season * DAY_TYPES.length + dayType) * MINUTES_PER_DAY;
+      const start = toMinutes(slot.start);
+      const end = toMinutes(slot.end);
+
+      if (end > start) {
+        this.codes.fill(period, base + start, base + end);
+      } else {
+        // 跨夜時段（如 22:00-06:00）
+        this.codes.fill(period, base + start, base + MINUTES_PER_DAY);
+        this.codes.fill(period, base, base + end);
+      }
+    }
+
+    this.minuteCounts = new Uint16Array(cells * PERIODS.length);
+    for (let cell = 0; cell < cells; cell++) {
+      const base = cell * MINUTES_PER_DAY;
+      for (let minute = 0; minute < MINUTES_PER_DAY; minute++) {
+        const code = this.codes[base + minute];
+        if (code !== NO_PERIOD) {
+          this.minuteCounts[cell * PERIODS.length + code]++;
+        }
+      }
+    }
+
+    this.seasonLookup = SeasonLookup.forSeasons(seasons);
+    this.scheduleSignature = schedules
+      .map(slot => `${slot.season}/${slot.dayType}/${slot.start}-${slot.end}/${slot.period}`)
+      .sort()
+      .join(';');
+  }
+
+  /**
+   * 取得方案的時段查表（每個方案只建立一次；無時段排程者回傳 null）
+   */
+  static forPlan(plan: Plan): PeriodLookupTable | null {
+    let table = this.cache.get(plan);
+    if (table === undefined) {
+      table = plan.schedules && plan.schedules.length > 0
+        ? new PeriodLookupTable(plan.schedules, plan.seasons)
+        : null;
+      this.cache.set(plan, table);
+    }
+    return table;
+  }
+
+  /**
+   * 日期的季節代碼
+   */
+  seasonCode(date: Date): number {
+    return this.seasonLookup.seasonCode(date);
+  }
+
+  /**
+   * 查詢時段代碼
+   */
+  periodCode(season: number, dayType: number, minute: number): number {
+    return this.codes[(season * DAY_TYPES.length + dayType) * MINUTES_PER_DAY + minute];
+  }
+
+  /**
+   * 查詢時段（未涵蓋的分鐘回傳 undefined）
+   */
+  periodAt(season: Season['name'], dayType: DayType, minute: number): Period | undefined {
+    const code = this.periodCode(SEASON_NAMES.indexOf(season), DAY_TYPES.indexOf(dayType), minute);
+    return code === NO_PERIOD ? undefined : PERIODS[code];
+  }
+
+  /**
+   * 指定季節、日期型別下，某時段每日的總小時數
+   */
+  hoursIn(season: Season['name'], dayType: DayType, period: Period): number {
+    const cell = SEASON_NAMES.indexOf(season) * DAY_TYPES.length + DAY_TYPES.indexOf(dayType);
+    return this.minuteCounts[cell * PERIODS.length + PERIODS.indexOf(period)] / 60;
+  }
+
+  /**
+   * 批次分類時間點（假日依行事曆歸為 sunday_holiday）
+   */
+  classify(
+    timestamps: ArrayLike<Date>,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): PeriodClassification {
+    const n = timestamps.length;
+    const seasons = new Uint8Array(n);
+    const dayTypes = new Uint8Array(n);
+    const periods = new Uint8Array(n);
+    const holidays = calendar.isHolidayMask(timestamps);
+
+    for (let i = 0; i < n; i++) {
+      const ts = timestamps[i];
+      const season = this.seasonCode(ts);
+      const dayType = dayTypeCode(ts, holidays[i] === 1);
+      seasons[i] = season;
+      dayTypes[i] = dayType;
+      periods[i] = this.periodCode(season, dayType, ts.getHours() * 60 + ts.getMinutes());
+    }
+
+    return { seasons, dayTypes, periods };
+  }
+
+  /**
+   * 分類固定間隔的時間序列（須先以 isRegularStep 確認）
+   */
+  classifyRegular(
+    start: Date,
+    stepMinutes: number,
+    count: number,
+    calendar: HolidayCalendar = HolidayCalendar.taiwan()
+  ): PeriodClassification {
+    const phase = (start.getHours() * 60 + start.getMinutes()) % stepMinutes;
+    return tileDayTemplates(start, stepMinutes, count, this.dayTemplate(stepMinutes, phase), this.seasonLookup, calendar);
+  }
+
+  /**
+   * [季節][日期型別][日內第幾個時間點] 的時段代碼，時間點為 phase + j * stepMinutes 分
+   */
+  private dayTemplate(stepMinutes: number, phase: number): Uint8Array {
+    const key = `${stepMinutes}/${phase}`;
+    let template = this.dayTemplates.get(key);
+    if (!template) {
+      const slotsPerDay = MINUTES_PER_DAY / stepMinutes;
+      const cells = SEASON_NAMES.length * DAY_TYPES.length;
+      template = new Uint8Array(cells * slotsPerDay);
+      for (let cell = 0; cell < cells; cell++) {
+        for (let j = 0; j < slotsPerDay; j++) {
+          template[cell * slotsPerDay + j] = this.codes[cell * MINUTES_PER_DAY + phase + j * stepMinutes];
+        }
+      }
+      this.dayTemplates.set(key, template);
+    }
+    return template;
+  }
+}
@@ -8,10 +8,22 @@ import type {
   ResultLabel,
   Comparison,
   BreakdownItem,
-  TimeSlot,
+  DayType,
+  FailedPlan,
+  PlanComparisonResult,
+  PlanComparisonEvent,
+  PlanRanking,
+  BatchCalculationItem,
+  BatchCalculationItemResult,
 } from '../../types';
 import { EstimationMode } from '../../types';
 import { PlansLoader } from './plans';
+import { PeriodLookupTable, SeasonLookup } from './PeriodLookup';
+import { CompiledPlan } from './CompiledPlan';
+import { TieredBilling } from './TieredBilling';
+import { HolidayCalendar } from './HolidayCalendar';
+import { ResultCache, stableStringify } from './ResultCache';
+import { CalculationMetrics } from './CalculationMetrics';
 
 /**
  * 計費期間天數統計
@@ -23,22 +35,65 @@ interface BillingPeriodDays {
   total: number;
 }
 
+/**
+ * 遞迴凍結方案資料
+ */
+function deepFreeze(value: unknown): void {
+  if (value === null || typeof value !== 'object' || Object.isFrozen(value)) return;
+  Object.freeze(value);
+  for (const child of Object.values(value)) {
+    deepFreeze(child);
+  }
+}
+
+/**
+ * 依「季節策略 + 時段排程」分組共用的季節與時段用電
+ */
+type SharedClassifications = Map<string, { season: Season; input: CalculationInput }>;
+
 /**
  * 費率計算引擎
  *
  * 移植自 Python taipower-tou 套件的計算邏輯
  */
 export class RateCalculator {
+  /**
+   * 計算結果快取（所有計算器共用）
+   *
+   * 鍵為方案與假日行事曆的序號加上完整的正規化輸入，不以雜湊代替內容，不會誤中他人的結果。
+   * 方案傳入計算器時即被凍結，內容不可再修改，因此以物件序號識別即可精確對應內容；
+   * 重新載入的費率資料或不同的行事曆序號不同，舊結果自然不再命中。
+   */
+  static readonly resultCache = new ResultCache<PlanCalculationResult[] | PlanComparisonResult>(200);
+
+  private static serials = new WeakMap<object, number>();
+  private static nextSerial = 0;
+
   private plans: Plan[] = [];
+  private calendar: HolidayCalendar;
 
-  constructor(plans: Plan[]) {
+  /** 批次計算期間共用的計費期間天數統計 */
+  private periodDaysMemo: Map<string, BillingPeriodDays> | null = null;
+
+  /**
+   * @param plans 方案資料，傳入後即凍結為唯讀（需修改時請建立新物件）
+   */
+  constructor(plans: Plan[], calendar: HolidayCalendar = HolidayCalendar.taiwan()) {
+    plans.forEach((plan) => RateCalculator.planSerial(plan));
     this.plans = plans;
+    this.calendar = calendar;
   }
 
   /**
    * 計算計費期間的天數統計
    */
   private calculateBillingPeriodDays(period: { start: Date; end: Date }): BillingPeriodDays {
+    const memoKey = `${new Date(period.start).getTime()}|${new Date(period.end).getTime()}`;
+    const memoized = this.periodDaysMemo?.get(memoKey);
+    if (memoized) {
+      return memoized;
+    }
+
     let weekdays = 0;
     let saturdays = 0;
     let sundaysHolidays = 0;
@@ -48,8 +103,8 @@ export class RateCalculator {
 
     while (current <= end) {
       const day = current.getDay();
-      if (day === 0) {
-        // Sunday
+      if (day === 0 || this.calendar.isHoliday(current)) {
+        // Sunday or holiday
         sundaysHolidays++;
       } else if (day === 6) {
         // Saturday
@@ -61,71 +116,332 @@ export class RateCalculator {
       current.setDate(current.getDate() + 1);
     }
 
-    return {
+    const days = {
       weekdays,
       saturdays,
       sundaysHolidays,
       total: weekdays + saturdays + sundaysHolidays,
     };
+    this.periodDaysMemo?.set(memoKey, days);
+    return days;
   }
 
   /**
-   * 計算時段總小時數
+   * 計算所有可用方案
    */
-  private calculatePeriodHours(timeSlots: TimeSlot[]): number {
-    let totalHours = 0;
-    for (const slot of timeSlots) {
-      const [startH, startM] = slot.start.split(':').map(Number);
-      const [endH, endM] = slot.end.split(':').map(Number);
-      const startMinutes = startH * 60 + startM;
-      let endMinutes = endH * 60 + endM;
-
-      // Handle overnight slots (e.g., 22:00-24:00 or 00:00-08:00)
-      if (endMinutes < startMinutes) {
-        endMinutes += 24 * 60; // Next day
-      }
+  calculateAll(input: CalculationInput): PlanCalculationResult[] {
+    this.validateInput(input);
 
-      totalHours += (endMinutes - startMinutes) / 60;
+    const key = this.cacheKey('calculateAll', input);
+    const cached = RateCalculator.resultCache.get(key) as PlanCalculationResult[] | undefined;
+    if (cached) {
+      return structuredClone(cached);
     }
-    return totalHours;
+
+    const results = CalculationMetrics.time('calculate_all', () => this.computeAll(input));
+    RateCalculator.resultCache.set(key, structuredClone(results));
+    return results;
   }
 
   /**
-   * 計算所有可用方案
+   * 計算所有可用方案（不經快取）
+   *
+   * 與 compare 相同，依季節策略與時段排程分組估算時段用電，每個方案以自己的排程估算。
    */
-  calculateAll(input: CalculationInput): PlanCalculationResult[] {
-    // 驗證輸入
-    if (!input || typeof input.consumption !== 'number' || input.consumption <= 0) {
-      throw new Error('用電度數必須大於 0');
+  private computeAll(input: CalculationInput): PlanCalculationResult[] {
+    const classifications: SharedClassifications = new Map();
+
+    // 計算每個方案
+    const results = this.getAvailablePlans().map((plan) => this.priceShared(plan, input, classifications));
+
+    // 依電費排序
+    return results.sort((a, b) => a.charges.total - b.charges.total);
+  }
+
+  /**
+   * 以分組共用的季節與時段用電計算單一方案，並加上標籤與比較資訊
+   */
+  private priceShared(
+    plan: Plan,
+    input: CalculationInput,
+    classifications: SharedClassifications
+  ): PlanCalculationResult {
+    const periodTable = PeriodLookupTable.forPlan(plan);
+    const key = `${plan.seasonStrategy ?? 'seasons'}|${periodTable?.scheduleSignature ?? ''}`;
+
+    let shared = classifications.get(key);
+    if (!shared) {
+      const season = this.determinePlanSeason(plan, input.billingPeriod);
+      shared = {
+        season,
+        input: CalculationMetrics.time('estimation', () =>
+          this.ensureTOUData(input, season, periodTable ? plan : undefined)
+        ),
+      };
+      classifications.set(key, shared);
     }
 
-    if (!input.billingPeriod || !input.billingPeriod.start || !input.billingPeriod.end) {
-      throw new Error('計費期間無效');
+    const { input: sharedInput, season: sharedSeason } = shared;
+    const result = CalculationMetrics.time('pricing', () => this.calculatePlan(plan, sharedInput, sharedSeason));
+
+    // 加入標籤（保留最低用電警告）
+    if (!result.label.badge.includes('最低用電')) {
+      result.label = this.createLabel(result, input, plan);
     }
 
-    const season = this.determineSeason(input.billingPeriod);
-    const processedInput = this.ensureTOUData(input, season);
+    // 加入比較資訊
+    result.comparison = this.createComparison();
+
+    return result;
+  }
 
-    // 取得可用的方案
-    const availablePlans = this.getAvailablePlans();
+  /**
+   * 比較多個方案
+   *
+   * 依季節策略與時段排程將方案分組，每組只判斷一次季節、估算一次時段用電，
+   * 組內各方案共用同一份分類結果計價。個別方案計算失敗不影響其他方案，
+   * 失敗的方案會列在 failedPlans。
+   */
+  compare(input: CalculationInput, planIds?: string[]): PlanComparisonResult {
+    this.validateInput(input);
 
-    // 計算每個方案
-    const results: PlanCalculationResult[] = availablePlans.map((plan) => {
-      const result = this.calculatePlan(plan, processedInput, season);
+    const key = this.cacheKey('compare', input, planIds);
+    const cached = RateCalculator.resultCache.get(key) as PlanComparisonResult | undefined;
+    if (cached) {
+      return structuredClone(cached);
+    }
+
+    const result = CalculationMetrics.time('compare', () => this.computeCompare(input, planIds));
+    RateCalculator.resultCache.set(key, structuredClone(result));
+    return result;
+  }
+
+  /**
+   * 比較多個方案（不經快取）
+   */
+  private computeCompare(input: CalculationInput, planIds?: string[]): PlanComparisonResult {
+    const results: PlanCalculationResult[] = [];
+
+    for (const event of this.compareStream(input, planIds)) {
+      if (event.type === 'result') {
+        results.push(event.result);
+      } else if (event.type === 'summary') {
+        // 與 summary 的排名使用相同的穩定排序
+        results.sort((a, b) => a.charges.total - b.charges.total);
+        results.forEach((result, index) => {
+          result.comparison.rank = event.ranking[index].rank;
+          result.comparison.difference = event.ranking[index].difference;
+        });
+
+        return {
+          comparison: results,
+          failedPlans: event.failedPlans,
+          cheapestPlanId: event.cheapestPlanId,
+          savingsVsMostExpensive: event.savingsVsMostExpensive,
+        };
+      }
+    }
+
+    throw new Error('方案比較未完成');
+  }
 
-      // 加入標籤（保留最低用電警告）
-      if (!result.label.badge.includes('最低用電')) {
-        result.label = this.createLabel(result, input, plan);
+  /**
+   * 串流比較多個方案
+   *
+   * 每個方案算完立即送出 result（名次尚未決定，rank 為 0）或 failed，
+   * 全部完成後送出 summary（排名、最便宜方案與價差）。
+   * 產生器本身只保留各方案的總電費，不保留完整結果。
+   */
+  *compareStream(input: CalculationInput, planIds?: string[]): Generator<PlanComparisonEvent> {
+    this.validateInput(input);
+
+    const failedPlans: FailedPlan[] = [];
+    let plans: Plan[];
+    if (planIds) {
+      plans = [];
+      for (const planId of planIds) {
+        const plan = this.plans.find((p) => p.id === planId);
+        if (plan) {
+          plans.push(plan);
+        } else {
+          const failure = { planId, error: `找不到方案：${planId}` };
+          failedPlans.push(failure);
+          yield { type: 'failed', failure };
+        }
       }
+    } else {
+      plans = this.getAvailablePlans();
+    }
 
-      // 加入比較資訊
-      result.comparison = this.createComparison();
+    // 分類結果依 季節策略 + 時段排程 共用
+    const classifications: SharedClassifications = new Map();
+    const totals: Array<{ planId: string; total: number }> = [];
+
+    for (const plan of plans) {
+      let result: PlanCalculationResult;
+      try {
+        result = this.priceShared(plan, input, classifications);
+      } catch (error) {
+        const failure = {
+          planId: plan.id,
+          error: error instanceof Error ? error.message : String(error),
+        };
+        failedPlans.push(failure);
+        yield { type: 'failed', failure };
+        continue;
+      }
+
+      totals.push({ planId: result.planId, total: result.charges.total });
+      yield { type: 'result', result };
+    }
 
-      return result;
+    totals.sort((a, b) => a.total - b.total);
+
+    const cheapest = totals[0];
+    const mostExpensive = totals[totals.length - 1];
+    const ranking: PlanRanking[] = totals.map((entry, index) => ({
+      planId: entry.planId,
+      total: entry.total,
+      rank: index + 1,
+      difference: entry.total - cheapest.total,
+    }));
+
+    yield {
+      type: 'summary',
+      ranking,
+      failedPlans,
+      cheapestPlanId: cheapest?.planId ?? null,
+      savingsVsMostExpensive: cheapest ? mostExpensive.total - cheapest.total : 0,
+    };
+  }
+
+  /**
+   * 批次計算多個 方案 × 輸入 項目
+   *
+   * 輸入相同的項目合併為一次串流比較，共用季節判斷與時段用電估算；
+   * 計費期間相同的項目共用天數統計。各項目獨立回傳結果或錯誤，順序與輸入相同。
+   */
+  calculateBatch(items: BatchCalculationItem[]): BatchCalculationItemResult[] {
+    const results: BatchCalculationItemResult[] = new Array(items.length);
+    const groups = new Map<string, { input: CalculationInput; indices: number[] }>();
+
+    items.forEach((item, index) => {
+      const key = stableStringify(item.input);
+      let group = groups.get(key);
+      if (!group) {
+        group = { input: item.input, indices: [] };
+        groups.set(key, group);
+      }
+      group.indices.push(index);
     });
 
-    // 依電費排序
-    return results.sort((a, b) => a.charges.total - b.charges.total);
+    this.periodDaysMemo = new Map();
+    try {
+      for (const { input, indices } of groups.values()) {
+        const planIds = [...new Set(indices.map((index) => items[index].planId))];
+        const byPlan = new Map<string, { result?: PlanCalculationResult; error?: string }>();
+
+        try {
+          for (const event of this.compareStream(input, planIds)) {
+            if (event.type === 'result') {
+              byPlan.set(event.result.planId, { result: event.result });
+            } else if (event.type === 'failed') {
+              byPlan.set(event.failure.planId, { error: event.failure.error });
+            }
+          }
+        } catch (error) {
+          const message = error instanceof Error ? error.message : String(error);
+          for (const planId of planIds) {
+            byPlan.set(planId, { error: message });
+          }
+        }
+
+        const delivered = new Set<string>();
+        for (const index of indices) {
+          const { planId } = items[index];
+          const outcome = byPlan.get(planId) ?? { error: `找不到方案：${planId}` };
+          // 同一組內重複的方案各自取得獨立的結果物件
+          const result = outcome.result && delivered.has(planId) ? structuredClone(outcome.result) : outcome.result;
+          delivered.add(planId);
+          results[index] = result ? { planId, result } : { planId, error: outcome.error };
+        }
+      }
+    } finally {
+      this.periodDaysMemo = null;
+    }
+
+    return results;
+  }
+
+  /**
+   * 以實測用電計算單一方案（不經快取）
+   *
+   * 供由逐時段資料彙總用電的計費使用（BillAccumulator、FleetBilling）。
+   * 用電度數可為 0，仍計收基本電費並套用最低用電；時間電價方案須提供非估算的時段用電。
+   */
+  calculateMeasured(plan: Plan, input: CalculationInput): PlanCalculationResult {
+    if (!input || !Number.isFinite(input.consumption) || input.consumption < 0) {
+      throw new Error('用電度數不可為負數');
+    }
+    if (!input.billingPeriod || !input.billingPeriod.start || !input.billingPeriod.end) {
+      throw new Error('計費期間無效');
+    }
+    if (plan.touType !== 'none' && (!input.touConsumption || input.touConsumption.isEstimated)) {
+      throw new Error(`方案 ${plan.id} 需要實測的時段用電`);
+    }
+
+    const season = this.determinePlanSeason(plan, input.billingPeriod);
+    return CalculationMetrics.time('pricing', () => this.calculatePlan(plan, input, season));
+  }
+
+  /**
+   * 結果快取鍵
+   */
+  private cacheKey(operation: string, input: CalculationInput, planIds?: string[]): string {
+    const plans = this.plans.map((plan) => RateCalculator.planSerial(plan)).join(',');
+    const calendar = RateCalculator.serial(this.calendar);
+    return `${operation}:${plans}:${calendar}:${stableStringify({ input, planIds })}`;
+  }
+
+  /**
+   * 方案序號：第一次取得時凍結方案，之後內容不變，序號即可代表內容
+   */
+  private static planSerial(plan: Plan): number {
+    if (!this.serials.has(plan)) {
+      deepFreeze(plan);
+    }
+    return this.serial(plan);
+  }
+
+  /**
+   * 物件序號（行事曆建立後不可修改，同一物件內容相同）
+   */
+  private static serial(target: object): number {
+    let serial = this.serials.get(target);
+    if (serial === undefined) {
+      serial = ++this.nextSerial;
+      this.serials.set(target, serial);
+    }
+    return serial;
+  }
+
+  /**
+   * 驗證計算輸入
+   */
+  private validateInput(input: CalculationInput): void {
+    if (!input || typeof input.consumption !== 'number' || input.consumption <= 0) {
+      throw new Error('用電度數必須大於 0');
+    }
+
+    if (
+      !input.billingPeriod ||
+      !input.billingPeriod.start ||
+      !input.billingPeriod.end ||
+      Number.isNaN(new Date(input.billingPeriod.start).getTime()) ||
+      Number.isNaN(new Date(input.billingPeriod.end).getTime())
+    ) {
+      throw new Error('計費期間無效');
+    }
   }
 
   /**
@@ -180,44 +496,35 @@ export class RateCalculator {
     const isSummer = season.name === 'summer';
 
     // 檢查是否有固定費率（flat rate）
-    const seasonKey = season.name === 'summer' ? 'summer' : 'nonSummer';
-    const flatRate = plan.energyCharges[seasonKey].find(r => r.period === 'flat');
+    const flatRate = CompiledPlan.compile(plan).rate(season.name, 'flat');
 
-    if (flatRate && tierRates.length === 0) {
+    if (flatRate !== undefined && tierRates.length === 0) {
       // 使用固定費率計算（如低壓電力非時間電價）
-      totalEnergyCharge = billableConsumption * flatRate.rate;
+      totalEnergyCharge = billableConsumption * flatRate;
       tierBreakdown.push({
         kwh: billableConsumption,
-        rate: flatRate.rate,
+        rate: flatRate,
         charge: totalEnergyCharge,
         label: '固定費率',
       });
     } else if (tierRates.length > 0) {
-      // 使用累進費率計算 - 修正：使用累積的上限來計算每個級距的度數
-      let remainingKwh = billableConsumption;
-      let lastLimitKwh = 0; // 追蹤前一個級距的上限
-
-      for (const tier of tierRates) {
-        if (remainingKwh <= 0) break;
-
-        const tierEnd = tier.maxKwh ?? Infinity;
-        // 計算本級距的實際度數範圍（本級距上限 - 前一級距上限）
-        const tierLimitKwh = tierEnd - lastLimitKwh;
-        const kwhInTier = Math.min(remainingKwh, tierLimitKwh);
+      // 使用累進費率計算（以累積上限切分各級距度數；未指定計費月數時為單期計費，級距上限不加倍）
+      const tiered = TieredBilling.compile(plan);
+      const { energy, tierKwh } = tiered.bill([billableConsumption], [isSummer ? 1 : 0], input.cycleMonths ?? 1);
+      totalEnergyCharge = energy[0];
+
+      tierRates.forEach((tier, index) => {
+        const kwhInTier = tierKwh[index];
+        if (kwhInTier === 0) return;
         const rate = isSummer ? tier.summerRate : tier.nonSummerRate;
-        const charge = kwhInTier * rate;
-
-        totalEnergyCharge += charge;
-        remainingKwh -= kwhInTier;
-        lastLimitKwh = tierEnd; // 更新累積上限
 
         tierBreakdown.push({
           tier: tier.tier,
           kwh: kwhInTier,
           rate: rate,
-          charge: charge,
+          charge: kwhInTier * rate,
         });
-      }
+      });
     }
 
     // 基本電費（依契約容量）
@@ -302,12 +609,11 @@ export class RateCalculator {
       adjustedOffPeak = touConsumption.offPeak * usageRatio;
     }
 
-    const seasonKey = season.name === 'summer' ? 'summer' : 'nonSummer';
-    const energyCharges = plan.energyCharges[seasonKey];
+    const compiled = CompiledPlan.compile(plan);
 
     // 找出尖峰和離峰費率
-    const peakRate = energyCharges.find((r) => r.period === 'peak')?.rate;
-    const offPeakRate = energyCharges.find((r) => r.period === 'off_peak')?.rate;
+    const peakRate = compiled.rate(season.name, 'peak');
+    const offPeakRate = compiled.rate(season.name, 'off_peak');
 
     // 兩段式時間電價沒有半尖峰費率，將半尖峰度數按比例分配到尖峰和離峰
     let finalPeakKwh = adjustedPeakOnPeak;
@@ -479,13 +785,12 @@ export class RateCalculator {
       adjustedOffPeak = touConsumption.offPeak * usageRatio;
     }
 
-    const seasonKey = season.name === 'summer' ? 'summer' : 'nonSummer';
-    const energyCharges = plan.energyCharges[seasonKey];
+    const compiled = CompiledPlan.compile(plan);
 
     // 找出各時段費率
-    const peakRate = energyCharges.find((r) => r.period === 'peak')?.rate;
-    const semiPeakRate = energyCharges.find((r) => r.period === 'semi_peak')?.rate;
-    const offPeakRate = energyCharges.find((r) => r.period === 'off_peak')?.rate;
+    const peakRate = compiled.rate(season.name, 'peak');
+    const semiPeakRate = compiled.rate(season.name, 'semi_peak');
+    const offPeakRate = compiled.rate(season.name, 'off_peak');
 
     // 處理時段度數分配：如果某時段沒有費率，將其度數分配到其他時段
     let finalPeakKwh = adjustedPeakOnPeak;
@@ -786,24 +1091,48 @@ export class RateCalculator {
     };
   }
 
+  /**
+   * 判斷方案適用的季節
+   * 標準季節沿用 determineSeason；高壓季節（5/16-10/15）則逐日檢查是否落在夏季
+   */
+  private determinePlanSeason(plan: Plan, period: { start: Date; end: Date }): Season {
+    if (plan.seasonStrategy !== 'seasons_high_voltage') {
+      return this.determineSeason(period);
+    }
+
+    const seasonLookup = SeasonLookup.forSeasons(plan.seasons);
+    const current = new Date(period.start);
+    const end = new Date(period.end);
+
+    while (current <= end) {
+      if (seasonLookup.seasonCode(current) === 0) {
+        return plan.seasons.summer;
+      }
+      current.setDate(current.getDate() + 1);
+    }
+
+    return plan.seasons.nonSummer;
+  }
+
   /**
    * 確保有時段用電資料
-   * 如果沒有，使用估算
+   * 如果沒有，使用估算（未指定方案時以第一個有時段資料的方案估算）
    */
   private ensureTOUData(
     input: CalculationInput,
-    season: Season
+    season: Season,
+    schedulePlan?: Plan
   ): CalculationInput {
     // 如果已有時段資料且不是估算的，直接回傳
     if (input.touConsumption && !input.touConsumption.isEstimated) {
       return input;
     }
 
+    // 找一個有時段資料的方案用於估算
+    const planWithSlots = schedulePlan ?? this.plans.find(p => p.schedules);
+
     // 如果有估算設定，使用估算
     if (input.estimationSettings) {
-      // 找一個有時段資料的方案用於估算
-      const planWithSlots = this.plans.find(p => p.timeSlots);
-
       const estimated = this.estimateTOUConsumption(
         input.consumption,
         input.estimationSettings.mode,
@@ -824,7 +1153,6 @@ export class RateCalculator {
     }
 
     // 預設使用平均估算
-    const planWithSlots = this.plans.find(p => p.timeSlots);
     const defaultEstimated = this.estimateTOUConsumption(
       input.consumption,
       EstimationMode.AVERAGE,
@@ -869,13 +1197,14 @@ export class RateCalculator {
     }
 
     // 如果有計費期間資訊和方案時段資料，使用更精確的估算
-    if (billingPeriod && plan && plan.timeSlots) {
+    const periodTable = plan ? PeriodLookupTable.forPlan(plan) : null;
+    if (billingPeriod && periodTable) {
       return this.estimateTOUConsumptionBySchedule(
         totalConsumption,
         mode,
         season,
         billingPeriod,
-        plan.timeSlots
+        periodTable
       );
     }
 
@@ -926,7 +1255,7 @@ export class RateCalculator {
     mode: EstimationMode,
     season: 'summer' | 'non_summer',
     billingPeriod: { start: Date; end: Date },
-    timeSlots: { weekday: TimeSlot[]; saturday: TimeSlot[]; sundayHoliday: TimeSlot[] }
+    periodTable: PeriodLookupTable
   ): TOUConsumption {
     // 計算計費期間天數
     const days = this.calculateBillingPeriodDays(billingPeriod);
@@ -960,31 +1289,19 @@ export class RateCalculator {
     let semiPeakKwh = 0;
     let offPeakKwh = 0;
 
-    // 處理平日
-    for (const slot of timeSlots.weekday) {
-      const slotHours = this.calculatePeriodHours([slot]);
-      const slotKwh = slotHours * avgDailyKwh * dailyPattern.weekday * days.weekdays / 24;
-      if (slot.period === 'peak') peakKwh += slotKwh;
-      else if (slot.period === 'semi_peak') semiPeakKwh += slotKwh;
-      else offPeakKwh += slotKwh;
-    }
-
-    // 處理週六
-    for (const slot of timeSlots.saturday) {
-      const slotHours = this.calculatePeriodHours([slot]);
-      const slotKwh = slotHours * avgDailyKwh * dailyPattern.saturday * days.saturdays / 24;
-      if (slot.period === 'peak') peakKwh += slotKwh;
-      else if (slot.period === 'semi_peak') semiPeakKwh += slotKwh;
-      else offPeakKwh += slotKwh;
-    }
-
-    // 處理週日/假日
-    for (const slot of timeSlots.sundayHoliday) {
-      const slotHours = this.calculatePeriodHours([slot]);
-      const slotKwh = slotHours * avgDailyKwh * dailyPattern.sunday * days.sundaysHolidays / 24;
-      if (slot.period === 'peak') peakKwh += slotKwh;
-      else if (slot.period === 'semi_peak') semiPeakKwh += slotKwh;
-      else offPeakKwh += slotKwh;
+    // 各日期型別的時段時數直接由查表取得，只計入本計費期間季節的時段
+    const dayGroups: Array<[DayType, number, number]> = [
+      ['weekday', days.weekdays, dailyPattern.weekday],
+      ['saturday', days.saturdays, dailyPattern.saturday],
+      ['sunday_holiday', days.sundaysHolidays, dailyPattern.sunday],
+    ];
+
+    for (const [dayType, dayCount, weight] of dayGroups) {
+      const kwhPerHour = avgDailyKwh * weight * dayCount / 24;
+      peakKwh += periodTable.hoursIn(season, dayType, 'peak') * kwhPerHour;
+      semiPeakKwh += periodTable.hoursIn(season, dayType, 'semi_peak') * kwhPerHour;
+      offPeakKwh += (periodTable.hoursIn(season, dayType, 'off_peak') +
+                     periodTable.hoursIn(season, dayType, 'flat')) * kwhPerHour;
     }
 
     return {
@@ -1089,3 +1406,7 @@ export class RateCalculator {
     };
   }
 }
+
+CalculationMetrics.registerGauge('result_cache_hits', () => RateCalculator.resultCache.stats().hits);
+CalculationMetrics.registerGauge('result_cache_misses', () => RateCalculator.resultCache.stats().misses);
+CalculationMetrics.registerGauge('result_cache_size', () => RateCalculator.resultCache.stats().size);
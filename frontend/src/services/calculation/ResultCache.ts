@@ -0,0 +1,118 @@
+/**
+ * 快取統計
+ */
+export interface CacheStats {
+  hits: number;
+  misses: number;
+  evictions: number;
+  size: number;
+  maxEntries: number;
+}
+
+/**
+ * 53 位元字串雜湊（cyrb53），回傳 16 進位字串
+ */
+export function hashString(text: string, seed = 0): string {
+  let h1 = 0xdeadbeef ^ seed;
+  let h2 = 0x41c6ce57 ^ seed;
+  for (let i = 0; i < text.length; i++) {
+    const ch = text.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(16);
+}
+
+/**
+ * 正規化序列化：物件鍵依字母排序、Date 轉為 epoch 毫秒（無效日期為 null，不拋出錯誤）、略過 undefined，
+ * 內容相同的輸入不論鍵的順序都得到相同字串
+ */
+export function stableStringify(value: unknown): string {
+  if (value instanceof Date) {
+    return JSON.stringify(value.getTime());
+  }
+  if (ArrayBuffer.isView(value) && !(value instanceof DataView)) {
+    return `[${Array.from(value as unknown as ArrayLike<number>).join(',')}]`;
+  }
+  if (Array.isArray(value)) {
+    return `[${value.map((item) => (item === undefined ? 'null' : stableStringify(item))).join(',')}]`;
+  }
+  if (value !== null && typeof value === 'object') {
+    const entries = Object.keys(value)
+      .filter((key) => (value as Record<string, unknown>)[key] !== undefined)
+      .sort()
+      .map((key) => `${JSON.stringify(key)}:${stableStringify((value as Record<string, unknown>)[key])}`);
+    return `{${entries.join(',')}}`;
+  }
+  return JSON.stringify(value) ?? 'null';
+}
+
+/**
+ * LRU 結果快取
+ *
+ * 以 Map 的插入順序記錄使用先後，命中時移到最後，超過上限時淘汰最久未使用者。
+ */
+export class ResultCache<V> {
+  private readonly entries = new Map<string, V>();
+  private maxEntries: number;
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+
+  constructor(maxEntries = 100) {
+    this.maxEntries = Math.max(0, maxEntries);
+  }
+
+  get(key: string): V | undefined {
+    const value = this.entries.get(key);
+    if (value === undefined) {
+      this.misses++;
+      return undefined;
+    }
+    this.hits++;
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    return value;
+  }
+
+  set(key: string, value: V): void {
+    this.entries.delete(key);
+    this.entries.set(key, value);
+    this.evict();
+  }
+
+  /**
+   * 調整容量上限（0 表示停用快取）
+   */
+  setMaxEntries(maxEntries: number): void {
+    this.maxEntries = Math.max(0, maxEntries);
+    this.evict();
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+  }
+
+  stats(): CacheStats {
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+    };
+  }
+
+  private evict(): void {
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+      this.evictions++;
+    }
+  }
+}
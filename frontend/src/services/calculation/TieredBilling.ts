@@ -0,0 +1,118 @@
+import type { Plan } from '../../types';
+
+/**
+ * 多個計費期間的累進計費結果
+ */
+export interface TieredBillingResult {
+  /** 各計費期間的流動電費 */
+  energy: Float64Array;
+  /** [計費期間][級距] 的度數 */
+  tierKwh: Float64Array;
+  /** 級距數量 */
+  tierCount: number;
+}
+
+/**
+ * 累進費率計費引擎
+ *
+ * 將方案級距整理成累積上限陣列，一次處理多個計費期間（可跨多個電號）：
+ * 每個級距只需對所有期間做一次 clamp(度數 - 下限, 0, 級距寬度)，
+ * 計算量與期間數呈線性，不需逐期間逐級距扣減剩餘度數。
+ *
+ * 跨季節的計費期間依夏月比例分攤：級距上限與度數同比例分攤後，
+ * 各級距度數恰為整期級距度數乘上夏月比例，
+ * 因此每級距的費率為 夏月比例 * 夏月費率 + (1 - 夏月比例) * 非夏月費率。
+ */
+export class TieredBilling {
+  private static cache = new WeakMap<Plan, TieredBilling>();
+
+  readonly plan: Plan;
+
+  /** 各級距的累積上限（每月度數，最後一級為 Infinity） */
+  readonly upperBounds: Float64Array;
+
+  /** 各級距的夏月費率 */
+  readonly summerRates: Float64Array;
+
+  /** 各級距的非夏月費率 */
+  readonly nonSummerRates: Float64Array;
+
+  /** 計費週期月數（隔月抄表為 2，級距上限加倍） */
+  readonly cycleMonths: number;
+
+  private constructor(plan: Plan) {
+    const tierRates = plan.tierRates ?? [];
+    this.plan = plan;
+    this.upperBounds = Float64Array.from(tierRates, (tier) => tier.maxKwh ?? Infinity);
+    this.summerRates = Float64Array.from(tierRates, (tier) => tier.summerRate);
+    this.nonSummerRates = Float64Array.from(tierRates, (tier) => tier.nonSummerRate);
+    this.cycleMonths = plan.raw?.billing_rules?.billing_cycle_months ?? 1;
+  }
+
+  /**
+   * 編譯方案的累進級距（每個方案只編譯一次）
+   */
+  static compile(plan: Plan): TieredBilling {
+    let tiered = this.cache.get(plan);
+    if (!tiered) {
+      tiered = new TieredBilling(plan);
+      this.cache.set(plan, tiered);
+    }
+    return tiered;
+  }
+
+  /**
+   * 計費期間日數換算的級距上限倍數（以每月 30 日計，至少 1 個月）
+   */
+  static cycleMonthsForDays(days: number): number {
+    return Math.max(1, Math.round(days / 30));
+  }
+
+  /**
+   * 級距數量
+   */
+  get tierCount(): number {
+    return this.upperBounds.length;
+  }
+
+  /**
+   * 批次計算多個計費期間的累進電費
+   * @param kwh 各計費期間的計費度數
+   * @param summerFraction 各計費期間的夏月比例（0–1）
+   * @param cycleMonths 級距上限倍數，預設為方案的計費週期月數
+   */
+  bill(
+    kwh: ArrayLike<number>,
+    summerFraction: ArrayLike<number>,
+    cycleMonths: number = this.cycleMonths
+  ): TieredBillingResult {
+    if (kwh.length !== summerFraction.length) {
+      throw new Error('計費度數與夏月比例數量不一致');
+    }
+
+    const n = kwh.length;
+    const tierCount = this.tierCount;
+    const energy = new Float64Array(n);
+    const tierKwh = new Float64Array(n * tierCount);
+
+    let lower = 0;
+    for (let t = 0; t < tierCount; t++) {
+      const upper = this.upperBounds[t] * cycleMonths;
+      const width = upper - lower;
+      const summerRate = this.summerRates[t];
+      const nonSummerRate = this.nonSummerRates[t];
+
+      for (let i = 0; i < n; i++) {
+        const inTier = Math.min(Math.max(kwh[i] - lower, 0), width);
+        if (inTier === 0) continue;
+        const fraction = summerFraction[i];
+        tierKwh[i * tierCount + t] = inTier;
+        energy[i] += inTier * (fraction * summerRate + (1 - fraction) * nonSummerRate);
+      }
+
+      lower = upper;
+    }
+
+    return { energy, tierKwh, tierCount };
+  }
+}
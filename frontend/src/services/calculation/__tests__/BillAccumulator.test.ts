@@ -0,0 +1,205 @@
+import { describe, it, expect } from 'vitest';
+import { BillAccumulator } from '../BillAccumulator';
+import type { BillAccumulatorState } from '../BillAccumulator';
+import { CompiledPlan } from '../CompiledPlan';
+import { TieredBilling } from '../TieredBilling';
+import { RateCalculator } from '../RateCalculator';
+import { PERIODS } from '../PeriodLookup';
+import { UsageCsvParser } from '../../parser/UsageCsvParser';
+import type { BillingPeriod, CalculationInput, Plan } from '../../../types';
+import { tieredPlan, touPlan } from './fixtures';
+
+describe('BillAccumulator', () => {
+  const periods: BillingPeriod[] = [
+    { start: new Date(2025, 8, 1), end: new Date(2025, 8, 30), days: 30 },
+    { start: new Date(2025, 9, 1), end: new Date(2025, 9, 31), days: 31 },
+  ];
+
+  const timestamps = Array.from({ length: 24 * 61 }, (_, i) => new Date(2025, 8, 1, i));
+  const usage = timestamps.map((_, i) => 0.2 + (i % 24 >= 18 ? 1.1 : 0.1) + (i % 5) * 0.05);
+
+  /** 依日切成多段輸入 */
+  const pushDaily = (accumulator: BillAccumulator, from: number, to: number) => {
+    for (let day = from; day < to; day++) {
+      accumulator.push(timestamps.slice(day * 24, (day + 1) * 24), usage.slice(day * 24, (day + 1) * 24));
+    }
+  };
+
+  /** 整期資料一次分類後，以實測時段用電交給 RateCalculator 比較 */
+  const batchBill = (plan: Plan, period: BillingPeriod, from: number, to: number) => {
+    const { periods: codes } = CompiledPlan.compile(plan).classify(timestamps.slice(from, to));
+    const kwh = new Float64Array(PERIODS.length);
+    usage.slice(from, to).forEach((value, i) => { kwh[codes[i]] += value; });
+    const input: CalculationInput = {
+      consumption: usage.slice(from, to).reduce((sum, value) => sum + value, 0),
+      billingPeriod: period,
+      voltageType: 'low_voltage',
+      phase: 'single',
+      touConsumption: { peakOnPeak: kwh[0], semiPeak: kwh[1], offPeak: kwh[2], isEstimated: false },
+    };
+    return new RateCalculator([plan]).compare(input, [plan.id]).comparison[0].charges;
+  };
+
+  it('分段累計結果應與 RateCalculator 整期計算一致', () => {
+    const plan: Plan = { ...touPlan, raw: { basic_fee: 75 } };
+    const accumulator = new BillAccumulator(plan, periods);
+    pushDaily(accumulator, 0, 61);
+    const bill = accumulator.current();
+
+    const september = batchBill(plan, periods[0], 0, 24 * 30);
+    const october = batchBill(plan, periods[1], 24 * 30, 24 * 61);
+
+    expect(bill.periods[0].basic).toBe(75);
+    expect(bill.periods[0].energy).toBeCloseTo(september.energy, 6);
+    expect(bill.periods[1].total).toBeCloseTo(october.total, 6);
+    expect(bill.periods[1].intervalCount).toBe(24 * 31);
+    expect(bill.total).toBeCloseTo(september.total + october.total, 6);
+    expect(bill.lastTimestamp).toEqual(timestamps[timestamps.length - 1]);
+  });
+
+  it('應依計費條件計算基本電費，尚無資料的期間為 0', () => {
+    const plan: Plan = { ...tieredPlan, billingRules: { min_monthly_fee: 100 } };
+    const accumulator = new BillAccumulator(plan, periods, { inputs: { contractCapacity: 20 } });
+    pushDaily(accumulator, 0, 30);
+    const bill = accumulator.current();
+
+    expect(bill.periods[0].basic).toBe(200);
+    expect(bill.periods[0].total).toBeCloseTo(200 + bill.periods[0].energy, 6);
+    expect(bill.periods[1].total).toBe(0);
+  });
+
+  it('序列化後接續累計應與不中斷的結果相同', () => {
+    const uninterrupted = new BillAccumulator(touPlan, periods);
+    pushDaily(uninterrupted, 0, 61);
+
+    const first = new BillAccumulator(touPlan, periods);
+    pushDaily(first, 0, 20);
+    const state = JSON.parse(JSON.stringify(first.serialize())) as BillAccumulatorState;
+    const resumed = BillAccumulator.resume(touPlan, state);
+    pushDaily(resumed, 20, 61);
+
+    expect(resumed.current().total).toBeCloseTo(uninterrupted.current().total, 6);
+    expect(resumed.current().periods[0].kwh).toEqual(uninterrupted.current().periods[0].kwh);
+  });
+
+  it('累進方案應依各期度數與夏月比例計費', () => {
+    const accumulator = new BillAccumulator(tieredPlan, periods);
+    pushDaily(accumulator, 0, 61);
+    const bill = accumulator.current();
+
+    const september = usage.slice(0, 24 * 30).reduce((sum, value) => sum + value, 0);
+    const october = usage.slice(24 * 30).reduce((sum, value) => sum + value, 0);
+    const { energy } = TieredBilling.compile(tieredPlan).bill([september, october], [1, 0], 1);
+
+    expect(bill.periods[0].energy).toBeCloseTo(energy[0], 6);
+    expect(bill.periods[1].energy).toBeCloseTo(energy[1], 6);
+  });
+
+  it('逐批累計的結果應與一次輸入相同', async () => {
+    const whole = new BillAccumulator(touPlan, periods);
+    whole.push(timestamps, usage);
+
+    async function* chunks() {
+      for (let i = 0; i < timestamps.length; i += 500) {
+        yield {
+          times: timestamps.slice(i, i + 500).map((timestamp) => timestamp.getTime()),
+          usage: usage.slice(i, i + 500),
+        };
+      }
+    }
+    const bill = await BillAccumulator.accumulate(touPlan, periods, chunks());
+
+    expect(bill.total).toBeCloseTo(whole.current().total, 6);
+    expect(bill.totalKwh).toBeCloseTo(whole.current().totalKwh, 6);
+  });
+
+  it('時間倒退或超出計費期間應拋出錯誤且不改變累計', () => {
+    const accumulator = new BillAccumulator(touPlan, periods);
+    pushDaily(accumulator, 0, 2);
+    const before = accumulator.current();
+
+    expect(() => pushDaily(accumulator, 1, 2)).toThrow('依時間順序');
+    expect(() => accumulator.push([new Date(2025, 10, 1)], [1])).toThrow('不在計費期間內');
+    expect(accumulator.current().energy).toBe(before.energy);
+    expect(accumulator.current().lastTimestamp).toEqual(before.lastTimestamp);
+  });
+
+  describe('串流 CSV 計費', () => {
+    const july: BillingPeriod = { start: new Date(2025, 6, 1), end: new Date(2025, 6, 31), days: 31 };
+    const hours = Array.from({ length: 24 * 31 }, (_, i) => new Date(2025, 6, 1, i));
+    const pad = (value: number) => String(value).padStart(2, '0');
+    const csv = (kwh: (i: number) => number) => ['timestamp,usage_kwh', ...hours.map((ts, i) =>
+      `${ts.getFullYear()}-${pad(ts.getMonth() + 1)}-${pad(ts.getDate())} ${pad(ts.getHours())}:00,${kwh(i)}`
+    )].join('\n');
+    const stream = (text: string) => {
+      const bytes = new TextEncoder().encode(text);
+      return new ReadableStream<Uint8Array>({
+        start(controller) {
+          for (let i = 0; i < bytes.length; i += 1024) controller.enqueue(bytes.slice(i, i + 1024));
+          controller.close();
+        },
+      });
+    };
+
+    /** 整份資料一次解析、分類後交給 RateCalculator */
+    const batchCharges = (plan: Plan, text: string, inputs: Partial<CalculationInput>) => {
+      const { times, usage: values } = UsageCsvParser.parseText(text);
+      const { periods: codes } = CompiledPlan.compile(plan).classify(Array.from(times, (time) => new Date(time)));
+      const kwh = new Float64Array(PERIODS.length);
+      values.forEach((value, i) => { kwh[codes[i]] += value; });
+      const input: CalculationInput = {
+        consumption: values.reduce((sum, value) => sum + value, 0),
+        billingPeriod: july,
+        voltageType: 'low_voltage',
+        phase: 'single',
+        touConsumption: { peakOnPeak: kwh[0], semiPeak: kwh[1], offPeak: kwh[2], isEstimated: false },
+        ...inputs,
+      };
+      return new RateCalculator([plan]).compare(input, [plan.id]).comparison[0].charges;
+    };
+
+    const cases: Array<{ name: string; plan: Plan; kwh: (i: number) => number; inputs: Partial<CalculationInput> }> = [
+      {
+        name: '超過 2000 度附加費',
+        plan: { ...touPlan, raw: { basic_fee: 75 }, billingRules: { over_2000_kwh_surcharge: { threshold_kwh: 2000, cost_per_kwh: 0.99 } } },
+        kwh: (i) => 2.5 + (i % 3) * 0.5,
+        inputs: {},
+      },
+      {
+        name: '最低用電',
+        plan: { ...touPlan, raw: { basic_fee: 75 } },
+        kwh: (i) => (i % 24 === 12 ? 0.1 : 0),
+        inputs: { contractCapacity: 30 },
+      },
+      {
+        name: '二段式方案的半尖峰度數',
+        plan: {
+          ...touPlan,
+          schedules: touPlan.schedules!.map((slot) => (slot.dayType === 'saturday' ? { ...slot, period: 'semi_peak' as const } : slot)),
+        },
+        kwh: (i) => 0.3 + (i % 24 >= 18 ? 1 : 0),
+        inputs: {},
+      },
+    ];
+
+    for (const { name, plan, kwh, inputs } of cases) {
+      it(`逐批累計應與整份資料一次計算相同（${name}）`, async () => {
+        const text = csv(kwh);
+        const bill = await BillAccumulator.accumulate(plan, [july], UsageCsvParser.batches(stream(text), 100), {
+          inputs: { contractCapacity: inputs.contractCapacity },
+        });
+        const expected = batchCharges(plan, text, inputs);
+
+        expect(bill.basic).toBeCloseTo(expected.base, 6);
+        expect(bill.energy).toBeCloseTo(expected.energy, 6);
+        expect(bill.total).toBeCloseTo(expected.total, 6);
+      });
+    }
+  });
+
+    it('接續累計的方案不符應拋出錯誤', () => {
+    const state = new BillAccumulator(touPlan, periods).serialize();
+
+    expect(() => BillAccumulator.resume(tieredPlan, state)).toThrow('不符');
+  });
+});
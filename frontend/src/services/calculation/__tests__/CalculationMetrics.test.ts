@@ -0,0 +1,53 @@
+import { describe, it, expect } from 'vitest';
+import { CalculationMetrics, DURATION_BUCKETS } from '../CalculationMetrics';
+import { CompiledPlan } from '../CompiledPlan';
+import { flatPlan } from './fixtures';
+
+describe('CalculationMetrics', () => {
+  it('應記錄階段耗時的累積直方圖', () => {
+    CalculationMetrics.reset();
+    CalculationMetrics.observe('pricing', 0.002);
+    CalculationMetrics.observe('pricing', 0.2);
+
+    const timing = CalculationMetrics.snapshot().stages.pricing;
+
+    expect(timing.count).toBe(2);
+    expect(timing.sumSeconds).toBeCloseTo(0.202, 10);
+    expect(timing.buckets[DURATION_BUCKETS.indexOf(0.001)]).toBe(0);
+    expect(timing.buckets[DURATION_BUCKETS.indexOf(0.005)]).toBe(1);
+    expect(timing.buckets[DURATION_BUCKETS.indexOf(0.5)]).toBe(2);
+  });
+
+  it('time 應回傳結果並在拋出錯誤時仍記錄耗時', () => {
+    CalculationMetrics.reset();
+
+    expect(CalculationMetrics.time('stage', () => 42)).toBe(42);
+    expect(() => CalculationMetrics.time('stage', () => { throw new Error('失敗'); })).toThrow('失敗');
+    expect(CalculationMetrics.snapshot().stages.stage.count).toBe(2);
+  });
+
+  it('應輸出 Prometheus 文字格式', () => {
+    CalculationMetrics.reset();
+    CalculationMetrics.observe('classification', 0.003);
+    CalculationMetrics.increment('csv_bytes', 128);
+    CalculationMetrics.registerGauge('test_gauge', () => 7);
+
+    const text = CalculationMetrics.toPrometheus();
+
+    expect(text).toContain('# TYPE tou_stage_duration_seconds histogram');
+    expect(text).toContain('tou_stage_duration_seconds_bucket{stage="classification",le="+Inf"} 1');
+    expect(text).toContain('tou_stage_duration_seconds_count{stage="classification"} 1');
+    expect(text).toContain('tou_csv_bytes_total 128');
+    expect(text).toContain('tou_test_gauge 7');
+  });
+
+  it('逐時段計價應記錄分類與計價階段', () => {
+    CalculationMetrics.reset();
+
+    CompiledPlan.compile(flatPlan).priceUsage([new Date(2025, 6, 1)], [1]);
+
+    const { stages } = CalculationMetrics.snapshot();
+    expect(stages.classification.count).toBe(1);
+    expect(stages.interval_pricing.count).toBe(1);
+  });
+});
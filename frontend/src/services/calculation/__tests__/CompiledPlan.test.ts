@@ -0,0 +1,220 @@
+import { describe, it, expect } from 'vitest';
+import { CompiledPlan } from '../CompiledPlan';
+import { HolidayCalendar } from '../HolidayCalendar';
+import type { Plan } from '../../../types';
+import { intervals, seasons } from './fixtures';
+
+describe('CompiledPlan', () => {
+  const createMockPlan = (overrides?: Partial<Plan>): Plan => ({
+    id: 'test_plan',
+    name: '測試方案',
+    nameEn: 'test_plan',
+    type: 'lighting',
+    touType: 'simple_2_tier',
+    voltage: 'low_voltage',
+    requiresMeter: true,
+    minimumConsumption: null,
+    basicCharges: [],
+    energyCharges: {
+      summer: [
+        { period: 'peak', rate: 5.16, dayType: 'weekday' },
+        { period: 'off_peak', rate: 2.06, dayType: 'weekday' },
+        { period: 'off_peak', rate: 1.5, dayType: 'saturday' },
+        { period: 'off_peak', rate: 1.0, dayType: 'sunday_holiday' },
+      ],
+      nonSummer: [
+        { period: 'peak', rate: 4.93 },
+        { period: 'off_peak', rate: 1.99 },
+      ],
+    },
+    schedules: [
+      { season: 'summer', dayType: 'weekday', start: '09:00', end: '24:00', period: 'peak' },
+      { season: 'summer', dayType: 'weekday', start: '00:00', end: '09:00', period: 'off_peak' },
+      { season: 'summer', dayType: 'saturday', start: '00:00', end: '24:00', period: 'off_peak' },
+      { season: 'summer', dayType: 'sunday_holiday', start: '00:00', end: '24:00', period: 'off_peak' },
+      { season: 'non_summer', dayType: 'weekday', start: '09:00', end: '24:00', period: 'peak' },
+      { season: 'non_summer', dayType: 'weekday', start: '00:00', end: '09:00', period: 'off_peak' },
+      { season: 'non_summer', dayType: 'saturday', start: '00:00', end: '24:00', period: 'off_peak' },
+      { season: 'non_summer', dayType: 'sunday_holiday', start: '00:00', end: '24:00', period: 'off_peak' },
+    ],
+    seasons,
+    ...overrides,
+  });
+
+  describe('compile', () => {
+    it('同一方案應只編譯一次', () => {
+      const plan = createMockPlan();
+      expect(CompiledPlan.compile(plan)).toBe(CompiledPlan.compile(plan));
+    });
+  });
+
+  describe('rate', () => {
+    it('應回傳季節、時段的第一筆費率', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      expect(compiled.rate('summer', 'off_peak')).toBe(2.06);
+      expect(compiled.rate('non_summer', 'peak')).toBe(4.93);
+      expect(compiled.rate('summer', 'semi_peak')).toBeUndefined();
+    });
+
+    it('應依日期型別區分費率', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      expect(compiled.rateAt('summer', 'saturday', 'off_peak')).toBe(1.5);
+      expect(compiled.rateAt('summer', 'sunday_holiday', 'off_peak')).toBe(1.0);
+      // 未指定日期型別的費率適用於所有日期型別
+      expect(compiled.rateAt('non_summer', 'saturday', 'off_peak')).toBe(1.99);
+    });
+  });
+
+  describe('priceUsage', () => {
+    it('應與逐筆查費率的結果一致', () => {
+      const plan = createMockPlan();
+      const compiled = CompiledPlan.compile(plan);
+      const timestamps = intervals(new Date(2025, 0, 1), 96 * 365, 15);
+      const usage = timestamps.map((_, i) => 0.1 + (i % 7) * 0.05);
+
+      const result = compiled.priceUsage(timestamps, usage);
+
+      let expected = 0;
+      timestamps.forEach((ts, i) => {
+        const month = ts.getMonth() + 1;
+        const season = month >= 6 && month <= 9 ? 'summer' : 'non_summer';
+        const day = ts.getDay();
+        const isHoliday = HolidayCalendar.taiwan().isHoliday(ts);
+        const dayType = day === 0 || isHoliday ? 'sunday_holiday' : day === 6 ? 'saturday' : 'weekday';
+        const period = dayType === 'weekday' && ts.getHours() >= 9 ? 'peak' : 'off_peak';
+        expected += usage[i] * compiled.rateAt(season, dayType, period)!;
+      });
+
+      expect(result.total).toBeCloseTo(expected, 6);
+      expect(result.totalKwh).toBeCloseTo(usage.reduce((a, b) => a + b, 0), 6);
+      expect(result.unpricedKwh).toBe(0);
+    });
+
+    it('無費率的時段度數應列為未計價', () => {
+      const plan = createMockPlan({
+        energyCharges: {
+          summer: [{ period: 'peak', rate: 5.16 }],
+          nonSummer: [],
+        },
+      });
+      const result = CompiledPlan.compile(plan).priceUsage(intervals(new Date(2025, 6, 1), 96, 15), new Array(96).fill(1));
+
+      expect(result.total).toBeCloseTo(60 * 5.16, 6);
+      expect(result.unpricedKwh).toBe(36);
+    });
+
+    it('無時段排程的固定費率方案應全部以 flat 計價', () => {
+      const plan = createMockPlan({
+        touType: 'none',
+        schedules: undefined,
+        energyCharges: {
+          summer: [{ period: 'flat', rate: 4.08 }],
+          nonSummer: [{ period: 'flat', rate: 3.52 }],
+        },
+      });
+      const result = CompiledPlan.compile(plan).priceUsage(
+        [new Date(2025, 6, 1, 12), new Date(2025, 11, 1, 12)],
+        [10, 10]
+      );
+
+      expect(result.total).toBeCloseTo(40.8 + 35.2, 6);
+    });
+
+    it('累進費率方案應拋出錯誤', () => {
+      const plan = createMockPlan({
+        tierRates: [{ tier: 1, minKwh: 0, maxKwh: null, summerRate: 1.78, nonSummerRate: 1.78 }],
+      });
+      expect(() => CompiledPlan.compile(plan).priceUsage([], [])).toThrow('累進費率');
+    });
+  });
+
+  describe('intervalCosts', () => {
+    it('各時間點的費率與電費應與彙總計價一致', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      const timestamps = intervals(new Date(2025, 6, 4), 96 * 3, 15); // 週五至週日
+      const usage = timestamps.map((_, i) => 0.2 + (i % 5) * 0.1);
+
+      const { rates, costs, total, unpricedKwh } = compiled.intervalCosts(timestamps, usage);
+
+      expect(rates).toHaveLength(timestamps.length);
+      expect(rates[0]).toBe(2.06); // 週五 00:00 離峰
+      expect(rates[40]).toBe(5.16); // 週五 10:00 尖峰
+      expect(rates[96]).toBe(1.5); // 週六
+      expect(rates[192]).toBe(1.0); // 週日
+      expect(costs[40]).toBeCloseTo(usage[40] * 5.16, 10);
+      expect(total).toBeCloseTo(compiled.priceUsage(timestamps, usage).total, 6);
+      expect(unpricedKwh).toBe(0);
+    });
+
+    it('無費率的時段應為 NaN 費率與 0 電費', () => {
+      const plan = createMockPlan({
+        energyCharges: { summer: [{ period: 'peak', rate: 5.16 }], nonSummer: [] },
+      });
+      const { rates, costs, unpricedKwh } = CompiledPlan.compile(plan).intervalCosts([new Date(2025, 6, 1, 3)], [2]);
+
+      expect(Number.isNaN(rates[0])).toBe(true);
+      expect(costs[0]).toBe(0);
+      expect(unpricedKwh).toBe(2);
+    });
+  });
+
+  describe('classifyRegular', () => {
+    it('應與逐筆分類結果相同（跨季節與國定假日）', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      const start = new Date(2025, 8, 25, 7, 30);
+      const count = 96 * 18;
+
+      expect(compiled.classifyRegular(start, 15, count)).toEqual(compiled.classify(intervals(start, count, 15)));
+    });
+
+    it('起點不在整點間隔上時應以相同相位分類', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      const start = new Date(2025, 6, 4, 8, 50);
+
+      expect(compiled.classifyRegular(start, 15, 300)).toEqual(compiled.classify(intervals(start, 300, 15)));
+    });
+
+    it('間隔無法整除一天時應退回逐筆分類', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      const start = new Date(2025, 6, 4);
+
+      expect(compiled.classifyRegular(start, 7, 500)).toEqual(compiled.classify(intervals(start, 500, 7)));
+    });
+
+    it('跨日光節約時間切換時應與逐筆分類結果相同', () => {
+      const env = (globalThis as { process?: { env: Record<string, string | undefined> } }).process?.env;
+      if (!env) return;
+      const originalTz = env.TZ;
+      try {
+        env.TZ = 'Europe/Berlin';
+        const compiled = CompiledPlan.compile(createMockPlan());
+        const start = new Date(2025, 9, 20);
+        expect(new Date(2025, 9, 27).getTimezoneOffset()).not.toBe(start.getTimezoneOffset());
+
+        expect(compiled.classifyRegular(start, 15, 96 * 14)).toEqual(compiled.classify(intervals(start, 96 * 14, 15)));
+      } finally {
+        if (originalTz === undefined) delete env.TZ;
+        else env.TZ = originalTz;
+      }
+    });
+
+    it('無時段排程的方案應全部歸為 flat', () => {
+      const compiled = CompiledPlan.compile(createMockPlan({ schedules: undefined }));
+      const start = new Date(2025, 9, 8);
+
+      expect(compiled.classifyRegular(start, 60, 24 * 5)).toEqual(compiled.classify(intervals(start, 24 * 5, 60)));
+    });
+
+    it('priceRegular 應與 priceUsage 結果相同', () => {
+      const compiled = CompiledPlan.compile(createMockPlan());
+      const start = new Date(2025, 8, 28);
+      const usage = Array.from({ length: 96 * 7 }, (_, i) => 0.1 + (i % 7) * 0.05);
+
+      const regular = compiled.priceRegular(start, 15, usage);
+      const priced = compiled.priceUsage(intervals(start, usage.length, 15), usage);
+
+      expect(regular.total).toBeCloseTo(priced.total, 10);
+      expect(regular.kwh).toEqual(priced.kwh);
+    });
+  });
+});
@@ -0,0 +1,179 @@
+import { describe, it, expect } from 'vitest';
+import { DemandCharges } from '../DemandCharges';
+import { PlansLoader } from '../plans';
+import type { RawPlansData } from '../plans';
+import type { BillingPeriod } from '../../../types';
+import { intervals } from './fixtures';
+
+describe('DemandCharges', () => {
+  const rawData: RawPlansData = {
+    version: 'test',
+    definitions: {
+      seasons_high_voltage: [
+        { name: 'summer', start: '05-16', end: '10-15' },
+        { name: 'non_summer', start: '10-16', end: '05-15' },
+      ],
+    },
+    plans: [
+      {
+        id: 'high_voltage_2_tier',
+        name: '高壓二段式時間電價',
+        type: 'TOU',
+        category: 'high_voltage',
+        season_strategy: 'seasons_high_voltage',
+        basic_fees: [
+          { label: '經常契約', unit: 'per_kw_month', summer: 223.6, non_summer: 166.9 },
+          { label: '非夏月契約', unit: 'per_kw_month', non_summer: 166.9 },
+          { label: '週六半尖峰契約', unit: 'per_kw_month', summer: 44.7, non_summer: 33.3 },
+          { label: '離峰契約', unit: 'per_kw_month', summer: 44.7, non_summer: 33.3 },
+        ],
+        rates: [
+          { season: 'summer', period: 'peak', cost: 4.5 },
+          { season: 'summer', period: 'semi_peak', cost: 2.5 },
+          { season: 'summer', period: 'off_peak', cost: 2 },
+          { season: 'non_summer', period: 'peak', cost: 4 },
+          { season: 'non_summer', period: 'semi_peak', cost: 2.4 },
+          { season: 'non_summer', period: 'off_peak', cost: 1.9 },
+        ],
+        schedules: (['summer', 'non_summer'] as const).flatMap((season) => [
+          { season, day_type: 'weekday', start: '09:00', end: '24:00', period: 'peak' },
+          { season, day_type: 'weekday', start: '00:00', end: '09:00', period: 'off_peak' },
+          { season, day_type: 'saturday', start: '09:00', end: '24:00', period: 'semi_peak' },
+          { season, day_type: 'saturday', start: '00:00', end: '09:00', period: 'off_peak' },
+          { season, day_type: 'sunday_holiday', start: '00:00', end: '24:00', period: 'off_peak' },
+        ]),
+        billing_rules: {
+          over_contract_penalty: { threshold_ratio: 0.1, rate_low: 2, rate_high: 3, base_fee_label: '經常契約', tier: 'two_stage' },
+          zero_usage_basic_fee_ratio: 0.5,
+          power_factor_adjustment: { base_percent: 80, max_discount_percent: 95, step_percent: 0.1, apply_to: 'total' },
+          basic_fee_formula: {
+            type: 'two_stage',
+            regular_label: '經常契約',
+            non_summer_label: '非夏月契約',
+            saturday_label: '週六半尖峰契約',
+            off_peak_label: '離峰契約',
+            weekend_ratio: 0.5,
+          },
+        },
+      },
+    ],
+  };
+
+  const { plans } = PlansLoader.loadFromData(rawData);
+  const demand = DemandCharges.compile(plans[0]);
+  const contracts = { regular: 100, non_summer: 20, saturday_semi_peak: 10, off_peak: 10 };
+  const july: BillingPeriod = { start: new Date(2025, 6, 1), end: new Date(2025, 6, 31), days: 31 };
+  const november: BillingPeriod = { start: new Date(2025, 10, 1), end: new Date(2025, 10, 30), days: 30 };
+
+  it('應依季節計算契約容量基本電費', () => {
+    const fees = demand.basicFees(contracts);
+
+    // 週六半尖峰與離峰契約在經常契約 50% 以內免收
+    expect(fees[0]).toBeCloseTo(100 * 223.6, 6);
+    expect(fees[1]).toBeCloseTo(100 * 166.9 + 20 * 166.9, 6);
+  });
+
+  it('尖峰需量超約應分兩段計收附加費', () => {
+    const start = new Date(2025, 6, 15);
+    const result = demand.bill(
+      { start, stepMinutes: 15, demandKw: new Float64Array(96).fill(120) },
+      [july],
+      { contracts }
+    );
+
+    // 超約 20 kW：10% 以內 10 kW 按 2 倍、其餘 10 kW 按 3 倍
+    expect(result.overContractKw[0]).toBe(20);
+    expect(result.penalty[0]).toBeCloseTo(10 * 2 * 223.6 + 10 * 3 * 223.6, 6);
+    expect(result.basic[0]).toBeCloseTo(100 * 223.6, 6);
+  });
+
+  it('固定間隔與逐筆時間點的結果應相同', () => {
+    const start = new Date(2025, 6, 1);
+    const count = 96 * (31 + 31 + 30 + 31 + 30);
+    const demandKw = Float64Array.from({ length: count }, (_, i) => 60 + ((i * 37) % 71));
+    const timestamps = intervals(start, count, 15);
+    const periods: BillingPeriod[] = [6, 7, 8, 9, 10].map((month) => ({
+      start: new Date(2025, month, 1),
+      end: new Date(2025, month + 1, 0),
+      days: new Date(2025, month + 1, 0).getDate(),
+    }));
+
+    const regular = demand.bill({ start, stepMinutes: 15, demandKw }, periods, { contracts });
+    const explicit = demand.bill({ timestamps, demandKw }, periods, { contracts });
+
+    expect(regular.maxDemand).toEqual(explicit.maxDemand);
+    expect(regular.total).toEqual(explicit.total);
+    expect(regular.penalty[0]).toBeGreaterThan(0);
+  });
+
+  it('功率因數應依基準增減電費', () => {
+    const series = { start: new Date(2025, 10, 3), stepMinutes: 60, demandKw: new Float64Array(24).fill(50) };
+
+    const high = demand.bill(series, [november], { contracts, powerFactor: 82, energy: [10000] });
+    const capped = demand.bill(series, [november], { contracts, powerFactor: 99, energy: [10000] });
+    const low = demand.bill(series, [november], { contracts, powerFactor: 75, energy: [10000] });
+
+    const amount = high.basic[0] + 10000;
+    expect(high.powerFactorAdjustment[0]).toBeCloseTo(-amount * 0.002, 6);
+    expect(capped.powerFactorAdjustment[0]).toBeCloseTo(-amount * 0.015, 6);
+    expect(low.powerFactorAdjustment[0]).toBeCloseTo(amount * 0.005, 6);
+    expect(high.total[0]).toBeCloseTo(amount + high.powerFactorAdjustment[0], 6);
+  });
+
+  it('無用電的期間基本電費應依比例減收', () => {
+    const result = demand.bill(
+      { start: new Date(2025, 10, 1), stepMinutes: 60, demandKw: new Float64Array(24 * 30) },
+      [november],
+      { contracts }
+    );
+
+    expect(result.basic[0]).toBeCloseTo(0.5 * (100 * 166.9 + 20 * 166.9), 6);
+    expect(result.penalty[0]).toBe(0);
+  });
+
+  it('沒有需量資料的期間不應視為無用電', () => {
+    const result = demand.bill(
+      { start: new Date(2025, 6, 1), stepMinutes: 60, demandKw: new Float64Array(24 * 31).fill(50) },
+      [july, november],
+      { contracts }
+    );
+
+    expect(result.basic[1]).toBeCloseTo(100 * 166.9 + 20 * 166.9, 6);
+  });
+
+  describe('按戶計收', () => {
+    const withHousehold = (labels: string[]) => {
+      const raw = plans[0].raw!;
+      const rules = raw.billing_rules!;
+      return DemandCharges.compile({
+        ...plans[0],
+        raw: {
+          ...raw,
+          basic_fees: [
+            ...raw.basic_fees!,
+            ...labels.map((label, i) => ({ label, unit: 'per_household_month', cost: 100 * (i + 1) })),
+          ],
+          billing_rules: { ...rules, basic_fee_formula: { ...rules.basic_fee_formula!, household_label: '按戶計收' } },
+        },
+      });
+    };
+
+    it('應依相位選擇按戶計收金額', () => {
+      const charges = withHousehold(['按戶計收-單相', '按戶計收-三相']);
+      const base = demand.basicFees(contracts);
+
+      expect(charges.basicFees(contracts, 'single')[0]).toBeCloseTo(base[0] + 100, 6);
+      expect(charges.basicFees(contracts, 'three')[0]).toBeCloseTo(base[0] + 200, 6);
+    });
+
+    it('缺少某一相位的按戶計收時應拋出錯誤', () => {
+      expect(() => withHousehold(['按戶計收-單相'])).toThrow('按戶計收-三相');
+    });
+  });
+
+    it('沒有契約容量規則的方案應拋出錯誤', () => {
+    const plan = { ...plans[0], raw: {} };
+
+    expect(() => DemandCharges.compile(plan)).toThrow('沒有契約容量基本電費規則');
+  });
+});
@@ -0,0 +1,57 @@
+import { describe, it, expect } from 'vitest';
+import { EngineWarmUp } from '../EngineWarmUp';
+import { PlansLoader } from '../plans';
+import type { RawPlansData } from '../plans';
+
+describe('EngineWarmUp', () => {
+  const rawData: RawPlansData = {
+    version: 'test',
+    plans: [
+      {
+        id: 'residential_non_tou',
+        name: '表燈非時間電價',
+        type: 'TIERED',
+        category: 'residential',
+        season_strategy: 'seasons',
+        tiers: [
+          { min: 0, max: 120, summer: 1.78, non_summer: 1.78 },
+          { min: 121, max: null, summer: 2.55, non_summer: 2.26 },
+        ],
+        billing_rules: { billing_cycle_months: 2 },
+      },
+      {
+        id: 'residential_simple_2_tier',
+        name: '簡易型二段式時間電價',
+        type: 'TOU',
+        category: 'residential',
+        season_strategy: 'seasons',
+        basic_fee: 75,
+        rates: [
+          { season: 'summer', period: 'peak', cost: 5.16 },
+          { season: 'summer', period: 'off_peak', cost: 2.06 },
+          { season: 'non_summer', period: 'peak', cost: 4.93 },
+          { season: 'non_summer', period: 'off_peak', cost: 1.99 },
+        ],
+        schedules: [
+          { season: 'summer', day_type: 'weekday', start: '09:00', end: '24:00', period: 'peak' },
+          { season: 'summer', day_type: 'weekday', start: '00:00', end: '09:00', period: 'off_peak' },
+          { season: 'summer', day_type: 'saturday', start: '00:00', end: '24:00', period: 'off_peak' },
+          { season: 'summer', day_type: 'sunday_holiday', start: '00:00', end: '24:00', period: 'off_peak' },
+        ],
+      },
+    ],
+  };
+
+  it('暖機完成前應回報尚未就緒，完成後回報就緒', async () => {
+    PlansLoader.loadFromData(rawData);
+    EngineWarmUp.reset();
+
+    expect(EngineWarmUp.isReady()).toBe(false);
+    const first = EngineWarmUp.run();
+    expect(EngineWarmUp.run()).toBe(first);
+
+    await first;
+
+    expect(EngineWarmUp.isReady()).toBe(true);
+  });
+});
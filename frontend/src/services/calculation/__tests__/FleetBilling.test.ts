@@ -0,0 +1,111 @@
+import { describe, it, expect } from 'vitest';
+import { FleetBilling } from '../FleetBilling';
+import { CompiledPlan } from '../CompiledPlan';
+import { TieredBilling } from '../TieredBilling';
+import type { Plan } from '../../../types';
+import { tieredPlan, touPlan } from './fixtures';
+
+describe('FleetBilling', () => {
+  const timestamps = Array.from({ length: 24 * 30 }, (_, i) => new Date(2025, 6, 1, i));
+  const fleet = {
+    timestamps,
+    meters: [
+      { meterId: 'A', usage: timestamps.map((_, i) => 0.5 + (i % 4) * 0.25) },
+      { meterId: 'B', usage: timestamps.map((_, i) => (i % 24 >= 18 ? 1.2 : 0.1)) },
+    ],
+  };
+
+  it('應回傳每個電號 × 方案一列', () => {
+    const rows = FleetBilling.bill([touPlan, tieredPlan], fleet);
+
+    expect(rows.map((row) => `${row.planId}/${row.meterId}`)).toEqual([
+      'test_tou/A', 'test_tou/B', 'test_tiered/A', 'test_tiered/B',
+    ]);
+  });
+
+  it('時間電價結果應與逐電號計價一致', () => {
+    const rows = FleetBilling.bill([touPlan], fleet);
+
+    fleet.meters.forEach((meter, m) => {
+      const priced = CompiledPlan.compile(touPlan).priceUsage(timestamps, meter.usage);
+      expect(rows[m].energy).toBeCloseTo(priced.total, 6);
+      expect(rows[m].totalKwh).toBeCloseTo(priced.totalKwh, 6);
+    });
+  });
+
+  it('累進方案應以各電號總度數計費', () => {
+    const rows = FleetBilling.bill([tieredPlan], fleet);
+    const totalA = fleet.meters[0].usage.reduce((a, b) => a + b, 0);
+
+    expect(rows[0].totalKwh).toBeCloseTo(totalA, 6);
+    expect(rows[0].energy).toBeCloseTo(TieredBilling.compile(tieredPlan).bill([totalA], [1]).energy[0], 6);
+  });
+
+  it('應依各電號的計費條件計算基本電費與總電費', () => {
+    const feePlan: Plan = { ...tieredPlan, id: 'test_tiered_fee', billingRules: { min_monthly_fee: 100 } };
+    const rows = FleetBilling.bill([feePlan, { ...touPlan, raw: { basic_fee: 75 } }], {
+      timestamps,
+      meters: [
+        { ...fleet.meters[0], inputs: { contractCapacity: 20 } },
+        fleet.meters[1],
+      ],
+    });
+
+    expect(rows.map((row) => row.basic)).toEqual([200, 100, 75, 75]);
+    rows.forEach((row) => expect(row.total).toBeCloseTo(row.basic + row.energy, 6));
+  });
+
+  it('累進級距上限倍數應依時間點涵蓋的月數換算', () => {
+    const twoMonths = Array.from({ length: 24 * 62 }, (_, i) => new Date(2025, 6, 1, i));
+    const rows = FleetBilling.bill([tieredPlan], {
+      timestamps: twoMonths,
+      meters: [{ meterId: 'A', usage: twoMonths.map(() => 1) }],
+    });
+
+    expect(rows[0].energy).toBeCloseTo(TieredBilling.compile(tieredPlan).bill([24 * 62], [1], 2).energy[0], 6);
+  });
+
+    it('沒有用電的電號仍應計收基本電費', () => {
+    const rows = FleetBilling.bill([{ ...touPlan, raw: { basic_fee: 75 } }, tieredPlan], {
+      timestamps,
+      meters: [{ meterId: 'Z', usage: new Float64Array(timestamps.length) }],
+    });
+
+    expect(rows.map((row) => row.error)).toEqual([undefined, undefined]);
+    expect(rows[0].total).toBe(75);
+    // 累進方案以最低用電計費
+    expect(rows[1].energy).toBeGreaterThan(0);
+  });
+
+  it('方案中途失敗時每個電號應只有一列失敗結果', () => {
+    const rows = FleetBilling.bill([touPlan, tieredPlan], {
+      timestamps,
+      meters: [...fleet.meters, { meterId: 'N', usage: timestamps.map(() => -1) }],
+    });
+
+    expect(rows.map((row) => `${row.planId}/${row.meterId}`)).toEqual([
+      'test_tou/A', 'test_tou/B', 'test_tou/N', 'test_tiered/A', 'test_tiered/B', 'test_tiered/N',
+    ]);
+    expect(rows.every((row) => row.error !== undefined)).toBe(true);
+  });
+
+    it('長表應轉為以時間點聯集對齊的寬表', () => {
+    const t0 = new Date(2025, 6, 1, 0);
+    const t1 = new Date(2025, 6, 1, 1);
+    const wide = FleetBilling.fromLong([
+      { meterId: 'A', timestamp: t1, kwh: 2 },
+      { meterId: 'B', timestamp: t0, kwh: 3 },
+      { meterId: 'A', timestamp: t0, kwh: 1 },
+    ]);
+
+    expect(wide.timestamps.map((ts) => ts.getTime())).toEqual([t0.getTime(), t1.getTime()]);
+    expect(wide.meters.map((meter) => [meter.meterId, Array.from(meter.usage)])).toEqual([
+      ['A', [1, 2]],
+      ['B', [3, 0]],
+    ]);
+  });
+
+  it('電號資料長度不一致時應拋出錯誤', () => {
+    expect(() => FleetBilling.bill([touPlan], { timestamps, meters: [{ meterId: 'X', usage: [1] }] })).toThrow('X');
+  });
+});
@@ -0,0 +1,199 @@
+import { describe, it, expect } from 'vitest';
+import { FleetWorkerPool, runFleetTask } from '../FleetWorkerPool';
+import type { FleetTask, FleetTaskResult, FleetWorker } from '../FleetWorkerPool';
+import { FleetBilling } from '../FleetBilling';
+import { HolidayCalendar } from '../HolidayCalendar';
+import type { Plan } from '../../../types';
+import { touPlan } from './fixtures';
+
+/**
+ * 於同一執行緒非同步執行工作的 Worker 替身；與真正的 Worker 一樣以 structuredClone 複製工作內容
+ */
+class InlineWorker implements FleetWorker {
+  onmessage: ((event: MessageEvent<FleetTaskResult>) => void) | null = null;
+  onerror: ((event: ErrorEvent) => void) | null = null;
+  tasks: FleetTask[] = [];
+
+  postMessage(message: FleetTask): void {
+    const task = structuredClone(message);
+    this.tasks.push(task);
+    setTimeout(() => {
+      let result: FleetTaskResult;
+      try {
+        result = { id: task.id, rows: runFleetTask(task) };
+      } catch (error) {
+        result = { id: task.id, error: (error as Error).message };
+      }
+      this.onmessage?.({ data: result } as MessageEvent<FleetTaskResult>);
+    }, 0);
+  }
+
+  terminate(): void {}
+}
+
+/**
+ * 收到工作即發生錯誤的 Worker 替身
+ */
+class CrashingWorker extends InlineWorker {
+  terminated = false;
+
+  postMessage(message: FleetTask): void {
+    this.tasks.push(message);
+    setTimeout(() => this.onerror?.({ message: 'worker crashed' } as ErrorEvent), 0);
+  }
+
+  terminate(): void {
+    this.terminated = true;
+  }
+}
+
+describe('FleetWorkerPool', () => {
+  const cheaperPlan: Plan = { ...touPlan, id: 'test_tou_cheaper', energyCharges: {
+    summer: [{ period: 'peak', rate: 4 }, { period: 'off_peak', rate: 1.5 }],
+    nonSummer: [{ period: 'peak', rate: 3 }, { period: 'off_peak', rate: 1.5 }],
+  } };
+
+  const timestamps = Array.from({ length: 24 * 14 }, (_, i) => new Date(2025, 6, 1, i));
+  const fleet = {
+    timestamps,
+    meters: Array.from({ length: 7 }, (_, m) => ({
+      meterId: `M${m}`,
+      usage: timestamps.map((_, i) => ((i + m) % 5) * 0.3),
+      inputs: { contractCapacity: 10 + m * 5 },
+    })),
+  };
+
+  it('結果應與單執行緒計費相同且順序一致', async () => {
+    const workers: InlineWorker[] = [];
+    const pool = new FleetWorkerPool(() => {
+      const worker = new InlineWorker();
+      workers.push(worker);
+      return worker;
+    }, 3);
+
+    const rows = await pool.bill([touPlan, cheaperPlan], fleet);
+    const expected = FleetBilling.bill([touPlan, cheaperPlan], fleet);
+
+    expect(workers).toHaveLength(3);
+    expect(rows.map((row) => `${row.planId}/${row.meterId}`)).toEqual(
+      expected.map((row) => `${row.planId}/${row.meterId}`)
+    );
+    rows.forEach((row, i) => {
+      expect(row.energy).toBeCloseTo(expected[i].energy, 6);
+      expect(row.total).toBeCloseTo(expected[i].total, 6);
+    });
+  });
+
+  it('應重複使用已建立的 Worker', async () => {
+    let created = 0;
+    const pool = new FleetWorkerPool(() => {
+      created++;
+      return new InlineWorker();
+    }, 2);
+
+    await pool.bill([touPlan], fleet);
+    await pool.bill([touPlan], fleet);
+
+    expect(created).toBe(2);
+  });
+
+  it('同一 Worker 已收到的方案不應重複傳送', async () => {
+    const workers: InlineWorker[] = [];
+    const pool = new FleetWorkerPool(() => {
+      const worker = new InlineWorker();
+      workers.push(worker);
+      return worker;
+    }, 2);
+
+    await pool.bill([touPlan, cheaperPlan], fleet);
+    const rows = await pool.bill([touPlan, cheaperPlan], fleet);
+    const expected = FleetBilling.bill([touPlan, cheaperPlan], fleet);
+
+    for (const worker of workers) {
+      expect(worker.tasks[0].plans.every((sent) => sent !== null)).toBe(true);
+      expect(worker.tasks[1].plans.every((sent) => sent === null)).toBe(true);
+    }
+    rows.forEach((row, i) => expect(row.energy).toBeCloseTo(expected[i].energy, 6));
+  });
+
+  it('同 ID 但內容不同的方案應重新傳送', async () => {
+    const worker = new InlineWorker();
+    const pool = new FleetWorkerPool(() => worker, 1);
+    const repriced: Plan = { ...touPlan, energyCharges: {
+      summer: [{ period: 'peak', rate: 6 }, { period: 'off_peak', rate: 3 }],
+      nonSummer: [{ period: 'peak', rate: 5 }, { period: 'off_peak', rate: 3 }],
+    } };
+
+    await pool.bill([touPlan], fleet);
+    const rows = await pool.bill([repriced], fleet);
+    const expected = FleetBilling.bill([repriced], fleet);
+
+    expect(worker.tasks[1].plans[0]).not.toBeNull();
+    rows.forEach((row, i) => expect(row.energy).toBeCloseTo(expected[i].energy, 6));
+  });
+
+  it('同 ID 的方案只快取最新內容，換回舊內容時應重新傳送', async () => {
+    const worker = new InlineWorker();
+    const pool = new FleetWorkerPool(() => worker, 1);
+    const repriced: Plan = { ...touPlan, energyCharges: {
+      summer: [{ period: 'peak', rate: 6 }, { period: 'off_peak', rate: 3 }],
+      nonSummer: [{ period: 'peak', rate: 5 }, { period: 'off_peak', rate: 3 }],
+    } };
+
+    await pool.bill([touPlan], fleet);
+    await pool.bill([repriced], fleet);
+    // 舊內容已被同 ID 的新方案取代
+    expect(() => runFleetTask({ ...worker.tasks[0], plans: [null] })).toThrow('缺少方案資料');
+
+    const rows = await pool.bill([touPlan], fleet);
+    const expected = FleetBilling.bill([touPlan], fleet);
+
+    expect(worker.tasks[2].plans[0]).not.toBeNull();
+    rows.forEach((row, i) => expect(row.energy).toBeCloseTo(expected[i].energy, 6));
+  });
+
+  it('Worker 發生錯誤時只改算該 Worker 的區塊，並於下次重新建立', async () => {
+    const workers: InlineWorker[] = [];
+    const pool = new FleetWorkerPool(() => {
+      const worker = workers.length === 1 ? new CrashingWorker() : new InlineWorker();
+      workers.push(worker);
+      return worker;
+    }, 3);
+
+    const rows = await pool.bill([touPlan, cheaperPlan], fleet);
+    const expected = FleetBilling.bill([touPlan, cheaperPlan], fleet);
+
+    expect(rows.map((row) => `${row.planId}/${row.meterId}`)).toEqual(
+      expected.map((row) => `${row.planId}/${row.meterId}`)
+    );
+    rows.forEach((row, i) => expect(row.total).toBeCloseTo(expected[i].total, 6));
+    expect((workers[1] as CrashingWorker).terminated).toBe(true);
+
+    await pool.bill([touPlan], fleet);
+
+    expect(workers).toHaveLength(4);
+    expect(workers[3].tasks[0].plans[0]).not.toBeNull();
+    expect(workers[0].tasks[1].plans[0]).toBeNull();
+  });
+
+    it('應將自訂行事曆傳給 Worker', async () => {
+    const calendar = HolidayCalendar.custom(['2025-07-01', '2025-07-02']);
+    const pool = new FleetWorkerPool(() => new InlineWorker(), 2);
+
+    const rows = await pool.bill([touPlan], fleet, { calendar });
+    const expected = FleetBilling.bill([touPlan], fleet, { calendar });
+
+    rows.forEach((row, i) => expect(row.energy).toBeCloseTo(expected[i].energy, 6));
+  });
+
+  it('電號資料長度不一致時應拋出錯誤', async () => {
+    const pool = new FleetWorkerPool(() => new InlineWorker(), 2);
+    let message = '';
+    try {
+      await pool.bill([touPlan], { timestamps, meters: [{ meterId: 'X', usage: [1] }] });
+    } catch (error) {
+      message = (error as Error).message;
+    }
+    expect(message).toContain('X');
+  });
+});
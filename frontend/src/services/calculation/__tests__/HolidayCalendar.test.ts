@@ -0,0 +1,98 @@
+import { describe, it, expect } from 'vitest';
+import { HolidayCalendar, SNAPSHOT_HEADER_BYTES, BYTES_PER_YEAR, dayOfYear } from '../HolidayCalendar';
+
+describe('HolidayCalendar', () => {
+  describe('taiwan', () => {
+    it('應包含國定假日', () => {
+      const calendar = HolidayCalendar.taiwan();
+      expect(calendar.isHoliday(new Date(2025, 0, 1))).toBe(true); // 元旦
+      expect(calendar.isHoliday(new Date(2025, 1, 28))).toBe(true); // 和平紀念日
+      expect(calendar.isHoliday(new Date(2025, 9, 10))).toBe(true); // 國慶日
+      expect(calendar.isHoliday(new Date(2025, 9, 10, 23, 45))).toBe(true);
+    });
+
+    it('一般日期不應為假日', () => {
+      const calendar = HolidayCalendar.taiwan();
+      expect(calendar.isHoliday(new Date(2025, 6, 1))).toBe(false);
+      expect(calendar.isHoliday(new Date(2030, 0, 2))).toBe(false);
+    });
+
+    it('應共用同一份行事曆', () => {
+      expect(HolidayCalendar.taiwan()).toBe(HolidayCalendar.taiwan());
+    });
+
+    it('內建快取檔應涵蓋 2024–2026 年', () => {
+      const calendar = HolidayCalendar.taiwan();
+      expect(calendar.coveredYears()).toEqual([2024, 2025, 2026]);
+      expect(calendar.isHoliday(new Date(2024, 1, 10))).toBe(true); // 春節
+      expect(calendar.isHoliday(new Date(2026, 11, 25))).toBe(true); // 行憲紀念日
+    });
+  });
+
+  describe('custom', () => {
+    it('應支援字串與 Date 日期', () => {
+      const calendar = HolidayCalendar.custom(['2025-07-01', new Date(2024, 11, 31)]);
+      expect(calendar.isHoliday(new Date(2025, 6, 1))).toBe(true);
+      expect(calendar.isHoliday(new Date(2024, 11, 31))).toBe(true); // 閏年最後一天
+      expect(calendar.isHoliday(new Date(2025, 6, 2))).toBe(false);
+      expect(calendar.coveredYears()).toEqual([2024, 2025]);
+    });
+  });
+
+  describe('snapshot', () => {
+    it('輸出後再載入應得到相同的假日', () => {
+      const original = HolidayCalendar.custom(['2024-02-29', '2026-12-31']);
+      const bytes = original.toSnapshot();
+      const loaded = HolidayCalendar.fromSnapshot(bytes);
+
+      expect(bytes.byteLength).toBe(SNAPSHOT_HEADER_BYTES + 3 * BYTES_PER_YEAR);
+      expect(loaded.coveredYears()).toEqual([2024, 2025, 2026]);
+      expect(loaded.isHoliday(new Date(2024, 1, 29))).toBe(true);
+      expect(loaded.isHoliday(new Date(2026, 11, 31))).toBe(true);
+      expect(loaded.isHoliday(new Date(2025, 5, 1))).toBe(false);
+    });
+
+    it('應直接引用快取檔的位元組', () => {
+      const bytes = HolidayCalendar.custom(['2025-07-01']).toSnapshot();
+      const loaded = HolidayCalendar.fromSnapshot(bytes);
+
+      bytes.fill(0, SNAPSHOT_HEADER_BYTES);
+
+      expect(loaded.isHoliday(new Date(2025, 6, 1))).toBe(false);
+    });
+
+    it('格式錯誤的快取檔應拋出錯誤', () => {
+      const bytes = HolidayCalendar.custom(['2025-07-01']).toSnapshot();
+
+      expect(() => HolidayCalendar.fromSnapshot(new Uint8Array(4))).toThrow('格式錯誤');
+      expect(() => HolidayCalendar.fromSnapshot(bytes.subarray(0, bytes.length - 1))).toThrow('長度不符');
+
+      const future = bytes.slice();
+      future[4] = 99;
+      expect(() => HolidayCalendar.fromSnapshot(future)).toThrow('版本');
+    });
+  });
+
+  describe('isHolidayMask', () => {
+    it('應與逐日判斷結果一致', () => {
+      const calendar = HolidayCalendar.taiwan();
+      const dates = Array.from({ length: 3 * 366 }, (_, i) => new Date(2024, 0, 1 + i, 12));
+
+      const mask = calendar.isHolidayMask(dates);
+
+      expect(mask).toHaveLength(dates.length);
+      dates.forEach((date, i) => {
+        expect(mask[i]).toBe(calendar.isHoliday(date) ? 1 : 0);
+      });
+      expect(mask.reduce((sum, bit) => sum + bit, 0)).toBeGreaterThan(30);
+    });
+  });
+
+  describe('dayOfYear', () => {
+    it('應回傳一年中的第幾天', () => {
+      expect(dayOfYear(new Date(2025, 0, 1))).toBe(0);
+      expect(dayOfYear(new Date(2025, 11, 31, 23, 59))).toBe(364);
+      expect(dayOfYear(new Date(2024, 11, 31))).toBe(365);
+    });
+  });
+});
@@ -0,0 +1,33 @@
+import { describe, it, expect } from 'vitest';
+import { intervalCostCsvChunks, INTERVAL_COST_CSV_HEADER } from '../IntervalCostExport';
+import { flatPlan, intervals } from './fixtures';
+
+describe('intervalCostCsvChunks', () => {
+  it('應依批次輸出標題列與資料列', () => {
+    const timestamps = intervals(new Date(2025, 8, 30, 22), 5);
+    const usage = [1, 2, 3, 4, 5];
+
+    const chunks = [...intervalCostCsvChunks(flatPlan, timestamps, usage, { chunkSize: 2 })];
+
+    expect(chunks).toHaveLength(4);
+    expect(chunks[0]).toBe(INTERVAL_COST_CSV_HEADER);
+    const lines = chunks.slice(1).join('').trimEnd().split('\n');
+    expect(lines).toHaveLength(5);
+    expect(lines[0]).toBe('2025-09-30 22:00,1,4,4');
+    expect(lines[2]).toBe('2025-10-01 00:00,3,3,9');
+  });
+
+  it('分批結果應與一次輸出相同', () => {
+    const timestamps = intervals(new Date(2025, 0, 1), 1000);
+    const usage = timestamps.map((_, i) => (i % 10) / 4);
+
+    const whole = [...intervalCostCsvChunks(flatPlan, timestamps, usage, { chunkSize: 1000 })].join('');
+    const chunked = [...intervalCostCsvChunks(flatPlan, timestamps, usage, { chunkSize: 64 })].join('');
+
+    expect(chunked).toBe(whole);
+  });
+
+  it('資料長度不一致時應拋出錯誤', () => {
+    expect(() => [...intervalCostCsvChunks(flatPlan, [new Date()], [])]).toThrow('數量不一致');
+  });
+});
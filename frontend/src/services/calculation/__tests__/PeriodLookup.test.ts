@@ -0,0 +1,106 @@
+import { describe, it, expect } from 'vitest';
+import { PeriodLookupTable, PERIODS, NO_PERIOD } from '../PeriodLookup';
+import { HolidayCalendar } from '../HolidayCalendar';
+import type { Plan, ScheduleSlot } from '../../../types';
+import { seasons } from './fixtures';
+
+describe('PeriodLookupTable', () => {
+  const createMockPlan = (schedules?: ScheduleSlot[]): Plan => ({
+    id: 'test_plan',
+    name: '測試方案',
+    nameEn: 'test_plan',
+    type: 'lighting',
+    touType: 'simple_2_tier',
+    voltage: 'low_voltage',
+    requiresMeter: true,
+    minimumConsumption: null,
+    basicCharges: [],
+    energyCharges: { summer: [], nonSummer: [] },
+    schedules,
+    seasons,
+  });
+
+  // 簡易型二段式：夏季平日 09:00-24:00 尖峰，其餘離峰
+  const twoTierSchedules: ScheduleSlot[] = [
+    { season: 'summer', dayType: 'weekday', start: '09:00', end: '24:00', period: 'peak' },
+    { season: 'summer', dayType: 'weekday', start: '00:00', end: '09:00', period: 'off_peak' },
+    { season: 'summer', dayType: 'saturday', start: '00:00', end: '24:00', period: 'off_peak' },
+    { season: 'summer', dayType: 'sunday_holiday', start: '00:00', end: '24:00', period: 'off_peak' },
+    { season: 'non_summer', dayType: 'weekday', start: '06:00', end: '11:00', period: 'peak' },
+    { season: 'non_summer', dayType: 'weekday', start: '22:00', end: '06:00', period: 'off_peak' },
+  ];
+
+  describe('forPlan', () => {
+    it('沒有時段排程的方案應回傳 null', () => {
+      expect(PeriodLookupTable.forPlan(createMockPlan())).toBeNull();
+    });
+
+    it('同一方案應重複使用同一份查表', () => {
+      const plan = createMockPlan(twoTierSchedules);
+      expect(PeriodLookupTable.forPlan(plan)).toBe(PeriodLookupTable.forPlan(plan));
+    });
+  });
+
+  describe('periodAt', () => {
+    const table = PeriodLookupTable.forPlan(createMockPlan(twoTierSchedules))!;
+
+    it('應依季節與日期型別查出時段', () => {
+      expect(table.periodAt('summer', 'weekday', 9 * 60)).toBe('peak');
+      expect(table.periodAt('summer', 'weekday', 9 * 60 - 1)).toBe('off_peak');
+      expect(table.periodAt('summer', 'saturday', 12 * 60)).toBe('off_peak');
+    });
+
+    it('應正確處理跨夜時段', () => {
+      expect(table.periodAt('non_summer', 'weekday', 23 * 60)).toBe('off_peak');
+      expect(table.periodAt('non_summer', 'weekday', 3 * 60)).toBe('off_peak');
+    });
+
+    it('未涵蓋的分鐘應回傳 undefined', () => {
+      expect(table.periodAt('non_summer', 'weekday', 12 * 60)).toBeUndefined();
+      expect(table.periodAt('non_summer', 'saturday', 12 * 60)).toBeUndefined();
+    });
+  });
+
+  describe('hoursIn', () => {
+    it('應回傳各時段每日的總小時數', () => {
+      const table = PeriodLookupTable.forPlan(createMockPlan(twoTierSchedules))!;
+
+      expect(table.hoursIn('summer', 'weekday', 'peak')).toBe(15);
+      expect(table.hoursIn('summer', 'weekday', 'off_peak')).toBe(9);
+      expect(table.hoursIn('non_summer', 'weekday', 'peak')).toBe(5);
+      expect(table.hoursIn('non_summer', 'weekday', 'off_peak')).toBe(8);
+    });
+  });
+
+  describe('classify', () => {
+    it('應批次分類每個時間點', () => {
+      const table = PeriodLookupTable.forPlan(createMockPlan(twoTierSchedules))!;
+      const timestamps = [
+        new Date(2025, 6, 1, 10, 0), // 夏季週二 10:00
+        new Date(2025, 6, 5, 10, 0), // 夏季週六 10:00
+        new Date(2025, 0, 6, 7, 30), // 非夏季週一 07:30
+        new Date(2025, 0, 6, 12, 0), // 非夏季週一 12:00（未涵蓋）
+      ];
+
+      const { seasons, dayTypes, periods } = table.classify(timestamps);
+
+      expect(Array.from(seasons)).toEqual([0, 0, 1, 1]);
+      expect(Array.from(dayTypes)).toEqual([0, 1, 0, 0]);
+      expect(PERIODS[periods[0]]).toBe('peak');
+      expect(PERIODS[periods[1]]).toBe('off_peak');
+      expect(PERIODS[periods[2]]).toBe('peak');
+      expect(periods[3]).toBe(NO_PERIOD);
+    });
+
+    it('假日應歸為 sunday_holiday', () => {
+      const table = PeriodLookupTable.forPlan(createMockPlan(twoTierSchedules))!;
+      const timestamps = [
+        new Date(2025, 9, 10, 10, 0), // 國慶日（週五）
+        new Date(2025, 6, 1, 10, 0), // 自訂假日（週二）
+      ];
+
+      expect(Array.from(table.classify(timestamps).dayTypes)).toEqual([2, 0]);
+      expect(Array.from(table.classify(timestamps, HolidayCalendar.custom(['2025-07-01'])).dayTypes)).toEqual([0, 2]);
+    });
+  });
+});
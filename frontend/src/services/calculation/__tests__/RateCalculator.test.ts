@@ -0,0 +1,243 @@
+import { describe, it, expect } from 'vitest';
+import { RateCalculator } from '../RateCalculator';
+import { EstimationMode } from '../../../types';
+import type { CalculationInput, Plan, ScheduleSlot } from '../../../types';
+import { seasons, tieredPlan } from './fixtures';
+
+describe('RateCalculator', () => {
+  const allDay = (period: ScheduleSlot['period']): ScheduleSlot[] =>
+    (['summer', 'non_summer'] as const).flatMap((season) =>
+      (['weekday', 'saturday', 'sunday_holiday'] as const).map((dayType) => ({
+        season, dayType, start: '00:00', end: '24:00', period,
+      }))
+    );
+
+  const createTwoTierPlan = (id: string, schedules: ScheduleSlot[], peakRate: number): Plan => ({
+    id,
+    name: `簡易型二段式 ${id}`,
+    nameEn: id,
+    type: 'lighting',
+    category: 'lighting',
+    touType: 'simple_2_tier',
+    voltage: 'low_voltage',
+    requiresMeter: true,
+    minimumConsumption: null,
+    basicCharges: [],
+    energyCharges: {
+      summer: [{ period: 'peak', rate: peakRate }, { period: 'off_peak', rate: 2.0 }],
+      nonSummer: [{ period: 'peak', rate: peakRate }, { period: 'off_peak', rate: 2.0 }],
+    },
+    schedules,
+    seasons,
+    raw: { basic_fee: 75 },
+  });
+
+  const peakEveryDay = createTwoTierPlan('simple_2_tier_peak', allDay('peak'), 5.0);
+  const peakEveryDayCheaper = createTwoTierPlan('simple_2_tier_peak_cheaper', allDay('peak'), 4.0);
+  const offPeakEveryDay = createTwoTierPlan('simple_2_tier_off_peak', allDay('off_peak'), 5.0);
+
+  const createInput = (overrides?: Partial<CalculationInput>): CalculationInput => ({
+    consumption: 300,
+    billingPeriod: {
+      start: new Date(2025, 6, 1),
+      end: new Date(2025, 6, 31),
+      days: 31,
+    },
+    voltageType: 'low_voltage',
+    phase: 'single',
+    estimationSettings: { mode: EstimationMode.AVERAGE, season: 'summer' },
+    ...overrides,
+  });
+
+  describe('compare', () => {
+    const calculator = new RateCalculator([tieredPlan, peakEveryDay, peakEveryDayCheaper, offPeakEveryDay]);
+
+    it('應依總電費排序並標示名次', () => {
+      const result = calculator.compare(createInput());
+
+      const totals = result.comparison.map((r) => r.charges.total);
+      expect(totals).toEqual([...totals].sort((a, b) => a - b));
+      expect(result.comparison.map((r) => r.comparison.rank)).toEqual([1, 2, 3, 4]);
+      expect(result.cheapestPlanId).toBe(result.comparison[0].planId);
+      expect(result.savingsVsMostExpensive).toBeCloseTo(totals[totals.length - 1] - totals[0], 6);
+      expect(result.failedPlans).toEqual([]);
+    });
+
+    it('應依各方案自己的時段排程估算時段用電', () => {
+      const result = calculator.compare(createInput(), [peakEveryDay.id, offPeakEveryDay.id]);
+      const peak = result.comparison.find((r) => r.planId === peakEveryDay.id)!;
+      const offPeak = result.comparison.find((r) => r.planId === offPeakEveryDay.id)!;
+
+      // 全日尖峰的方案以尖峰費率計價，全日離峰的方案以離峰費率計價
+      expect(peak.charges.energy).toBeCloseTo(300 * 5.0, 6);
+      expect(offPeak.charges.energy).toBeCloseTo(300 * 2.0, 6);
+    });
+
+    it('時段排程相同的方案應得到一致的時段用電', () => {
+      const result = calculator.compare(createInput(), [peakEveryDay.id, peakEveryDayCheaper.id]);
+      const kwh = result.comparison.map((r) => r.breakdown.touBreakdown!.reduce((sum, item) => sum + item.kwh, 0));
+
+      expect(kwh[0]).toBeCloseTo(kwh[1], 6);
+      expect(result.cheapestPlanId).toBe(peakEveryDayCheaper.id);
+    });
+
+    it('找不到的方案應列在 failedPlans，其餘方案照常計算', () => {
+      const result = calculator.compare(createInput(), [peakEveryDay.id, 'invalid_plan_xyz']);
+
+      expect(result.comparison).toHaveLength(1);
+      expect(result.failedPlans).toHaveLength(1);
+      expect(result.failedPlans[0].planId).toBe('invalid_plan_xyz');
+    });
+
+    it('所有方案都失敗時應回傳空的比較結果', () => {
+      const result = calculator.compare(createInput(), ['invalid_plan_1', 'invalid_plan_2']);
+
+      expect(result.comparison).toEqual([]);
+      expect(result.cheapestPlanId).toBeNull();
+      expect(result.savingsVsMostExpensive).toBe(0);
+      expect(result.failedPlans).toHaveLength(2);
+    });
+
+    it('用電度數無效時應拋出錯誤', () => {
+      expect(() => calculator.compare(createInput({ consumption: 0 }))).toThrow('用電度數');
+    });
+  });
+
+  describe('calculateAll', () => {
+    const calculator = new RateCalculator([tieredPlan, peakEveryDay, offPeakEveryDay]);
+
+    it('應依各方案自己的時段排程估算時段用電', () => {
+      const results = calculator.calculateAll(createInput());
+      const offPeak = results.find((r) => r.planId === offPeakEveryDay.id)!;
+
+      expect(offPeak.charges.energy).toBeCloseTo(300 * 2.0, 6);
+    });
+
+    it('各方案電費應與 compare 一致', () => {
+      const compared = calculator.compare(createInput()).comparison;
+      const results = calculator.calculateAll(createInput());
+
+      expect(results.map((r) => r.planId)).toEqual(compared.map((r) => r.planId));
+      results.forEach((r, i) => expect(r.charges.total).toBeCloseTo(compared[i].charges.total, 6));
+    });
+  });
+
+  describe('compareStream', () => {
+    const calculator = new RateCalculator([tieredPlan, peakEveryDay, peakEveryDayCheaper, offPeakEveryDay]);
+
+    it('應逐方案送出結果，最後送出排名摘要', () => {
+      const events = [...calculator.compareStream(createInput(), [peakEveryDay.id, 'invalid_plan_xyz', offPeakEveryDay.id])];
+
+      expect(events.map((event) => event.type)).toEqual(['failed', 'result', 'result', 'summary']);
+      const summary = events[events.length - 1];
+      if (summary.type !== 'summary') throw new Error('缺少摘要');
+      expect(summary.ranking.map((entry) => entry.planId)).toEqual([offPeakEveryDay.id, peakEveryDay.id]);
+      expect(summary.ranking.map((entry) => entry.rank)).toEqual([1, 2]);
+      expect(summary.cheapestPlanId).toBe(offPeakEveryDay.id);
+      expect(summary.failedPlans.map((failure) => failure.planId)).toEqual(['invalid_plan_xyz']);
+    });
+
+    it('第一個方案應在其餘方案計算前送出', () => {
+      const stream = calculator.compareStream(createInput());
+      const first = stream.next();
+
+      expect(first.done).toBe(false);
+      expect(first.value.type).toBe('result');
+    });
+
+    it('摘要應與 compare 的結果一致', () => {
+      RateCalculator.resultCache.clear();
+      const events = [...calculator.compareStream(createInput())];
+      const summary = events[events.length - 1];
+      const result = calculator.compare(createInput());
+
+      if (summary.type !== 'summary') throw new Error('缺少摘要');
+      expect(summary.ranking.map((entry) => entry.planId)).toEqual(result.comparison.map((r) => r.planId));
+      expect(summary.savingsVsMostExpensive).toBeCloseTo(result.savingsVsMostExpensive, 10);
+    });
+  });
+
+  describe('calculateBatch', () => {
+    const calculator = new RateCalculator([tieredPlan, peakEveryDay, peakEveryDayCheaper, offPeakEveryDay]);
+
+    it('應依輸入順序回傳各項目結果或錯誤', () => {
+      const july = createInput();
+      const august = createInput({
+        consumption: 450,
+        billingPeriod: { start: new Date(2025, 7, 1), end: new Date(2025, 7, 31), days: 31 },
+      });
+
+      const results = calculator.calculateBatch([
+        { planId: peakEveryDay.id, input: july },
+        { planId: 'invalid_plan_xyz', input: july },
+        { planId: offPeakEveryDay.id, input: august },
+        { planId: peakEveryDay.id, input: { ...july } },
+        { planId: peakEveryDay.id, input: createInput({ consumption: 0 }) },
+      ]);
+
+      expect(results.map((item) => item.planId)).toEqual([
+        peakEveryDay.id, 'invalid_plan_xyz', offPeakEveryDay.id, peakEveryDay.id, peakEveryDay.id,
+      ]);
+      expect(results[0].result!.charges.energy).toBeCloseTo(300 * 5.0, 6);
+      expect(results[1].error).toContain('找不到方案');
+      expect(results[2].result!.charges.energy).toBeCloseTo(450 * 2.0, 6);
+      expect(results[3].result).toEqual(results[0].result);
+      expect(results[3].result).not.toBe(results[0].result);
+      expect(results[4].error).toContain('用電度數');
+    });
+
+    it('結果應與 compare 中同一方案的電費一致', () => {
+      const input = createInput();
+      const [item] = calculator.calculateBatch([{ planId: tieredPlan.id, input }]);
+      const compared = calculator.compare(input).comparison.find((r) => r.planId === tieredPlan.id)!;
+
+      expect(item.result!.charges.total).toBeCloseTo(compared.charges.total, 10);
+    });
+  });
+
+  describe('resultCache', () => {
+    it('相同輸入應命中快取並回傳獨立的結果', () => {
+      const calculator = new RateCalculator([tieredPlan, peakEveryDay]);
+      RateCalculator.resultCache.clear();
+
+      const first = calculator.compare(createInput());
+      const second = new RateCalculator([tieredPlan, peakEveryDay]).compare(createInput({ phase: 'single' }));
+
+      // 方案陣列不同但方案物件相同，鍵相同
+      expect(RateCalculator.resultCache.stats()).toMatchObject({ hits: 1, misses: 1 });
+      expect(second).toEqual(first);
+      expect(second).not.toBe(first);
+
+      second.comparison[0].charges.total = -1;
+      expect(calculator.compare(createInput()).comparison[0].charges.total).toBe(first.comparison[0].charges.total);
+    });
+
+    it('費率資料或輸入不同時不應命中快取', () => {
+      RateCalculator.resultCache.clear();
+      new RateCalculator([tieredPlan, peakEveryDay]).calculateAll(createInput());
+      new RateCalculator([tieredPlan, peakEveryDayCheaper]).calculateAll(createInput());
+      new RateCalculator([tieredPlan, peakEveryDay]).calculateAll(createInput({ consumption: 301 }));
+
+      expect(RateCalculator.resultCache.stats()).toMatchObject({ hits: 0, misses: 3, size: 3 });
+    });
+
+    it('方案傳入後應凍結，無法就地修改而取得過期結果', () => {
+      const plan: Plan = structuredClone(peakEveryDay);
+      new RateCalculator([plan]).compare(createInput());
+
+      expect(Object.isFrozen(plan.energyCharges.summer[0])).toBe(true);
+      expect(() => {
+        plan.energyCharges.summer[0].rate = 0;
+      }).toThrow();
+    });
+
+    it('無效的計費期間應在建立快取鍵前被拒絕', () => {
+      const calculator = new RateCalculator([tieredPlan]);
+      const input = createInput();
+      input.billingPeriod = { ...input.billingPeriod, start: new Date(NaN) };
+
+      expect(() => calculator.calculateAll(input)).toThrow('計費期間無效');
+      expect(() => calculator.compare(input)).toThrow('計費期間無效');
+    });
+  });
+});
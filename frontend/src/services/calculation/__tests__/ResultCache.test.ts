@@ -0,0 +1,55 @@
+import { describe, it, expect } from 'vitest';
+import { ResultCache, hashString, stableStringify } from '../ResultCache';
+
+describe('ResultCache', () => {
+  it('應淘汰最久未使用的項目', () => {
+    const cache = new ResultCache<number>(2);
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.get('a');
+    cache.set('c', 3);
+
+    expect(cache.get('a')).toBe(1);
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('c')).toBe(3);
+    expect(cache.stats()).toEqual({ hits: 3, misses: 1, evictions: 1, size: 2, maxEntries: 2 });
+  });
+
+  it('容量設為 0 時應停用快取', () => {
+    const cache = new ResultCache<number>(2);
+    cache.set('a', 1);
+    cache.setMaxEntries(0);
+    cache.set('b', 2);
+
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.stats().size).toBe(0);
+  });
+
+  it('clear 應清除項目與統計', () => {
+    const cache = new ResultCache<number>();
+    cache.set('a', 1);
+    cache.get('a');
+    cache.clear();
+
+    expect(cache.stats()).toEqual({ hits: 0, misses: 0, evictions: 0, size: 0, maxEntries: 100 });
+  });
+});
+
+describe('stableStringify', () => {
+  it('鍵的順序不同應得到相同結果', () => {
+    expect(stableStringify({ b: 1, a: { d: [1, 2], c: 'x' } })).toBe(stableStringify({ a: { c: 'x', d: [1, 2] }, b: 1 }));
+  });
+
+  it('應正規化日期、具型別陣列並略過 undefined', () => {
+    expect(stableStringify({ at: new Date(Date.UTC(2025, 6, 1)), skip: undefined })).toBe('{"at":1751328000000}');
+    expect(stableStringify({ at: new Date(NaN) })).toBe('{"at":null}');
+    expect(stableStringify(new Float64Array([1.5, 2]))).toBe(stableStringify([1.5, 2]));
+  });
+});
+
+describe('hashString', () => {
+  it('相同內容應得到相同雜湊', () => {
+    expect(hashString('abc')).toBe(hashString('abc'));
+    expect(hashString('abc')).not.toBe(hashString('abd'));
+  });
+});
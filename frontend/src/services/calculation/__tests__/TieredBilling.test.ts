@@ -0,0 +1,70 @@
+import { describe, it, expect } from 'vitest';
+import { TieredBilling } from '../TieredBilling';
+import type { Plan } from '../../../types';
+import { seasons } from './fixtures';
+
+describe('TieredBilling', () => {
+  const createMockPlan = (billingCycleMonths?: number): Plan => ({
+    id: 'test_tiered',
+    name: '測試累進方案',
+    nameEn: 'test_tiered',
+    type: 'residential',
+    touType: 'none',
+    voltage: 'low_voltage',
+    requiresMeter: false,
+    minimumConsumption: null,
+    basicCharges: [],
+    energyCharges: { summer: [], nonSummer: [] },
+    tierRates: [
+      { tier: 1, minKwh: 0, maxKwh: 120, summerRate: 1.78, nonSummerRate: 1.78 },
+      { tier: 2, minKwh: 121, maxKwh: 330, summerRate: 2.55, nonSummerRate: 2.26 },
+      { tier: 3, minKwh: 331, maxKwh: null, summerRate: 3.8, nonSummerRate: 3.13 },
+    ],
+    seasons,
+    raw: billingCycleMonths ? { billing_rules: { billing_cycle_months: billingCycleMonths } } : undefined,
+  });
+
+  it('應以累積上限切分各級距度數', () => {
+    const { energy, tierKwh, tierCount } = TieredBilling.compile(createMockPlan()).bill([100, 120, 400], [1, 1, 1]);
+
+    expect(tierCount).toBe(3);
+    expect(Array.from(tierKwh)).toEqual([100, 0, 0, 120, 0, 0, 120, 210, 70]);
+    expect(energy[0]).toBeCloseTo(100 * 1.78, 10);
+    expect(energy[2]).toBeCloseTo(120 * 1.78 + 210 * 2.55 + 70 * 3.8, 10);
+  });
+
+  it('隔月計費的方案級距上限應加倍', () => {
+    const tiered = TieredBilling.compile(createMockPlan(2));
+    const { tierKwh } = tiered.bill([400], [0]);
+
+    expect(tiered.cycleMonths).toBe(2);
+    expect(Array.from(tierKwh)).toEqual([240, 160, 0]);
+    // 可指定倍數覆寫方案設定
+    expect(Array.from(tiered.bill([400], [0], 1).tierKwh)).toEqual([120, 210, 70]);
+  });
+
+  it('跨季節的計費期間應依夏月比例混合費率', () => {
+    const tiered = TieredBilling.compile(createMockPlan());
+    const [mixed] = tiered.bill([400], [0.25]).energy;
+    const [summer] = tiered.bill([400], [1]).energy;
+    const [nonSummer] = tiered.bill([400], [0]).energy;
+
+    expect(mixed).toBeCloseTo(0.25 * summer + 0.75 * nonSummer, 10);
+  });
+
+  it('批次計算應與逐期間計算一致', () => {
+    const tiered = TieredBilling.compile(createMockPlan(2));
+    const kwh = Array.from({ length: 500 }, (_, i) => i * 3.7);
+    const fractions = kwh.map((_, i) => (i % 5) / 4);
+
+    const batch = tiered.bill(kwh, fractions);
+
+    kwh.forEach((value, i) => {
+      expect(batch.energy[i]).toBeCloseTo(tiered.bill([value], [fractions[i]]).energy[0], 10);
+    });
+  });
+
+  it('資料長度不一致時應拋出錯誤', () => {
+    expect(() => TieredBilling.compile(createMockPlan()).bill([100], [])).toThrow('數量不一致');
+  });
+});
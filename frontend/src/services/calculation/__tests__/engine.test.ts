@@ -0,0 +1,20 @@
+import { describe, it, expect } from 'vitest';
+import { loadCalculationEngine } from '../engine';
+
+describe('loadCalculationEngine', () => {
+  it('應在時間預算內載入計算模組', async () => {
+    const start = performance.now();
+    const engine = await loadCalculationEngine();
+    const elapsed = performance.now() - start;
+
+    expect(typeof engine.PlansLoader.getAll).toBe('function');
+    expect(typeof engine.RateCalculator).toBe('function');
+    expect(typeof engine.EngineWarmUp.run).toBe('function');
+    // 寬鬆上限，只用來攔截載入時就建立大型查表之類的回歸
+    expect(elapsed).toBeLessThan(2000);
+  });
+
+  it('多次呼叫應共用同一個 Promise', () => {
+    expect(loadCalculationEngine()).toBe(loadCalculationEngine());
+  });
+});
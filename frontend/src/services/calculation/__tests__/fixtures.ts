@@ -0,0 +1,78 @@
+import type { Plan } from '../../../types';
+
+/**
+ * 測試共用的方案與時間點
+ */
+
+/** 標準季節：夏月 6/1-9/30 */
+export const seasons: Plan['seasons'] = {
+  summer: { name: 'summer', start: '06-01', end: '09-30' },
+  nonSummer: { name: 'non_summer', start: '10-01', end: '05-31' },
+};
+
+/** 兩段式時間電價：平日 09:00-24:00 尖峰，其餘離峰 */
+export const touPlan: Plan = {
+  id: 'test_tou',
+  name: '測試時間電價',
+  nameEn: 'test_tou',
+  type: 'lighting',
+  category: 'lighting',
+  touType: 'simple_2_tier',
+  voltage: 'low_voltage',
+  requiresMeter: true,
+  minimumConsumption: null,
+  basicCharges: [],
+  energyCharges: {
+    summer: [{ period: 'peak', rate: 5 }, { period: 'off_peak', rate: 2 }],
+    nonSummer: [{ period: 'peak', rate: 4 }, { period: 'off_peak', rate: 2 }],
+  },
+  schedules: (['summer', 'non_summer'] as const).flatMap((season) => [
+    { season, dayType: 'weekday' as const, start: '09:00', end: '24:00', period: 'peak' as const },
+    { season, dayType: 'weekday' as const, start: '00:00', end: '09:00', period: 'off_peak' as const },
+    { season, dayType: 'saturday' as const, start: '00:00', end: '24:00', period: 'off_peak' as const },
+    { season, dayType: 'sunday_holiday' as const, start: '00:00', end: '24:00', period: 'off_peak' as const },
+  ]),
+  seasons,
+};
+
+/** 兩級累進方案 */
+export const tieredPlan: Plan = {
+  id: 'test_tiered',
+  name: '測試累進方案',
+  nameEn: 'test_tiered',
+  type: 'residential',
+  category: 'lighting',
+  touType: 'none',
+  voltage: 'low_voltage',
+  requiresMeter: false,
+  minimumConsumption: null,
+  basicCharges: [],
+  energyCharges: { summer: [], nonSummer: [] },
+  tierRates: [
+    { tier: 1, minKwh: 0, maxKwh: 120, summerRate: 1.78, nonSummerRate: 1.78 },
+    { tier: 2, minKwh: 121, maxKwh: null, summerRate: 2.55, nonSummerRate: 2.26 },
+  ],
+  seasons,
+};
+
+/** 固定費率方案：夏月 4 元、非夏月 3 元 */
+export const flatPlan: Plan = {
+  id: 'test_flat',
+  name: '測試固定費率',
+  nameEn: 'test_flat',
+  type: 'lighting',
+  touType: 'none',
+  voltage: 'low_voltage',
+  requiresMeter: false,
+  minimumConsumption: null,
+  basicCharges: [],
+  energyCharges: {
+    summer: [{ period: 'flat', rate: 4 }],
+    nonSummer: [{ period: 'flat', rate: 3 }],
+  },
+  seasons,
+};
+
+/** 自 start 起每隔 stepMinutes 分鐘的 count 個時間點 */
+export const intervals = (start: Date, count: number, stepMinutes = 60): Date[] =>
+  Array.from({ length: count }, (_, i) => new Date(start.getTime() + i * stepMinutes * 60 * 1000));
@@ -0,0 +1,42 @@
+import type { PlansLoader } from './plans';
+import type { RateCalculator } from './RateCalculator';
+import type { EngineWarmUp } from './EngineWarmUp';
+
+/**
+ * 延遲載入的計算引擎
+ */
+export interface CalculationEngine {
+  PlansLoader: typeof PlansLoader;
+  RateCalculator: typeof RateCalculator;
+  EngineWarmUp: typeof EngineWarmUp;
+}
+
+let enginePromise: Promise<CalculationEngine> | null = null;
+
+/**
+ * 載入計算引擎
+ *
+ * 以動態 import 取得計算模組，打包時會拆成獨立 chunk，不佔首頁載入時間；
+ * 假日行事曆、方案查表等也都在第一次使用時才建立。多次呼叫共用同一個 Promise，
+ * 載入失敗後可再次呼叫重試。
+ */
+export function loadCalculationEngine(): Promise<CalculationEngine> {
+  if (!enginePromise) {
+    enginePromise = Promise.all([
+      import('./plans'),
+      import('./RateCalculator'),
+      import('./EngineWarmUp'),
+    ]).then(
+      ([plans, calculator, warmUp]) => ({
+        PlansLoader: plans.PlansLoader,
+        RateCalculator: calculator.RateCalculator,
+        EngineWarmUp: warmUp.EngineWarmUp,
+      }),
+      (error) => {
+        enginePromise = null;
+        throw error;
+      }
+    );
+  }
+  return enginePromise;
+}
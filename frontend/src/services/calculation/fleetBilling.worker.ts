@@ -0,0 +1,13 @@
+import { runFleetTask } from './FleetWorkerPool';
+import type { FleetTask, FleetTaskResult } from './FleetWorkerPool';
+
+self.onmessage = (event: MessageEvent<FleetTask>) => {
+  const { id } = event.data;
+  let result: FleetTaskResult;
+  try {
+    result = { id, rows: runFleetTask(event.data) };
+  } catch (error) {
+    result = { id, error: error instanceof Error ? error.message : String(error) };
+  }
+  self.postMessage(result);
+};
@@ -0,0 +1,9 @@
+/**
+ * 內建臺灣國定假日快取檔（HolidayCalendar 快取檔格式第 1 版，base64 編碼）
+ *
+ * 涵蓋 2024–2026 年中華民國紀念日及節日實施條例所定放假日，不含補假與調整放假。
+ * 以二進位點陣圖內建，冷啟動時不需連網也不需解析 JSON；
+ * 更新時以 HolidayCalendar.custom(日期清單).toSnapshot() 重新產生。
+ */
+export const TAIWAN_HOLIDAY_SNAPSHOT =
+  'VFdIQwEA6AcDAAAAAQAAAIAHAAQAAABAAAAAAAAAAAACAAAAAAAAAAAAAAAQAAAIAAAAAAAAAAAAAAEAAHgAAAAEAAAAIAAAAAEAAEAAAAAAAAAAAAAAAAAAAEBABAACAAAAAAAAQAABAAAAAOADBAAAAGAAAAABAAAAAAACAAAAAAAAAAAAAABIAAQAAgAAAAAAAEAA';
@@ -1,16 +1,8 @@
-import type { Plan, PlansData, TierRate, EnergyChargeRate, BasicChargeRate, TimeSlot } from '../../types';
+import type { Plan, PlansData, TierRate, EnergyChargeRate, BasicChargeRate, TimeSlot, ScheduleSlot, DayType, BasicFeeRate, BillingRules } from '../../types';
 
 /**
  * Raw plan data from JSON
  */
-interface BasicFeeEntry {
-  label: string;
-  unit: string;
-  cost?: number;
-  summer?: number;
-  non_summer?: number;
-}
-
 interface RawPlan {
   id: string;
   name: string;
@@ -18,10 +10,10 @@ interface RawPlan {
   category: 'lighting' | 'residential' | 'commercial' | 'low_voltage' | 'high_voltage' | 'extra_high_voltage';
   season_strategy: string;
   basic_fee?: number;
-  basic_fees?: BasicFeeEntry[];
+  basic_fees?: BasicFeeRate[];
   over_2000_kwh_surcharge?: number;  // 方案層級的超額附加費率
   tiers?: Array<{ min: number; max: number | null; summer: number; non_summer: number }>;
-  rates?: Array<{ season: string; period: string; cost: number }>;
+  rates?: Array<{ season: string; period: string; day_type?: string; cost: number }>;
   schedules?: Array<{
     season: string;
     day_type: string;
@@ -29,17 +21,20 @@ interface RawPlan {
     end: string;
     period: string;
   }>;
-  billing_rules?: {
-    min_monthly_fee?: number;
-    minimum_usage_rules_ref?: string;
-    billing_cycle_months?: number;
-    over_2000_kwh_surcharge?: { threshold_kwh: number; cost_per_kwh: number };
-  };
+  billing_rules?: BillingRules;
+}
+
+interface RawSeason {
+  name: 'summer' | 'non_summer';
+  start: string;
+  end: string;
 }
 
-interface RawPlansData {
+export interface RawPlansData {
   version: string;
   definitions?: {
+    seasons?: RawSeason[];
+    seasons_high_voltage?: RawSeason[];
     minimum_usage_rules?: {
       lighting_minimum_usage?: Array<{
         label: string;
@@ -89,14 +84,7 @@ export class PlansLoader {
       }
 
       const rawData: RawPlansData = await response.json();
-      this.rawDefinitions = rawData.definitions;
-      this.plans = rawData.plans.map(this.transformPlan);
-      this.data = {
-        version: rawData.version,
-        plans: this.plans,
-      };
-
-      return this.data!;
+      return this.loadFromData(rawData);
     } catch (error) {
       console.error('Error loading plans:', error);
 
@@ -115,10 +103,23 @@ export class PlansLoader {
     }
   }
 
+  /**
+   * 由已取得的原始 JSON 資料載入費率資料（不經網路，供測試與效能量測使用）
+   */
+  static loadFromData(rawData: RawPlansData): PlansData {
+    this.rawDefinitions = rawData.definitions;
+    this.plans = rawData.plans.map((plan) => this.transformPlan(plan, rawData.definitions));
+    this.data = {
+      version: rawData.version,
+      plans: this.plans,
+    };
+    return this.data;
+  }
+
   /**
    * 轉換原始 JSON 資料為 Plan 介面格式
    */
-  private static transformPlan(raw: RawPlan): Plan {
+  private static transformPlan(raw: RawPlan, definitions?: RawPlansData['definitions']): Plan {
     // 決定 touType
     let touType: 'none' | 'simple_2_tier' | 'simple_3_tier' | 'full_tou';
     if (raw.type === 'TIERED' || raw.type === 'NON_TOU') {
@@ -230,19 +231,25 @@ export class PlansLoader {
         const period = rate.period === 'peak' ? 'peak' :
                        rate.period === 'off_peak' ? 'off_peak' :
                        rate.period === 'semi_peak' ? 'semi_peak' : 'flat';
+        const dayType = rate.day_type === 'weekday' ? 'weekday' :
+                        rate.day_type === 'saturday' ? 'saturday' :
+                        rate.day_type === 'sunday_holiday' ? 'sunday_holiday' : undefined;
         energyCharges[rate.season === 'summer' ? 'summer' : 'nonSummer'].push({
           period,
           rate: rate.cost,
+          ...(dayType ? { dayType } : {}),
         });
       });
     }
 
     // 轉換時段表 (timeSlots)
     let timeSlots: { weekday: TimeSlot[]; saturday: TimeSlot[]; sundayHoliday: TimeSlot[] } | undefined;
+    let schedules: ScheduleSlot[] | undefined;
     if (raw.schedules && raw.schedules.length > 0) {
       const weekday: TimeSlot[] = [];
       const saturday: TimeSlot[] = [];
       const sundayHoliday: TimeSlot[] = [];
+      schedules = [];
 
       for (const sched of raw.schedules) {
         const slot: TimeSlot = {
@@ -253,13 +260,25 @@ export class PlansLoader {
           end: sched.end,
         };
 
+        let dayType: DayType;
         if (sched.day_type === 'weekday') {
           weekday.push(slot);
+          dayType = 'weekday';
         } else if (sched.day_type === 'saturday') {
           saturday.push(slot);
+          dayType = 'saturday';
         } else if (sched.day_type === 'sunday_holiday') {
           sundayHoliday.push(slot);
+          dayType = 'sunday_holiday';
+        } else {
+          continue;
         }
+
+        schedules.push({
+          ...slot,
+          season: sched.season === 'summer' ? 'summer' : 'non_summer',
+          dayType,
+        });
       }
 
       timeSlots = { weekday, saturday, sundayHoliday };
@@ -289,6 +308,13 @@ export class PlansLoader {
       voltage = 'high_voltage';
     }
 
+    // 依季節策略取得季節定義（高壓、特高壓使用 seasons_high_voltage）
+    const seasonDefs = raw.season_strategy === 'seasons_high_voltage'
+      ? definitions?.seasons_high_voltage
+      : definitions?.seasons;
+    const summerDef = seasonDefs?.find(season => season.name === 'summer');
+    const nonSummerDef = seasonDefs?.find(season => season.name === 'non_summer');
+
     return {
       id: raw.id,
       name: raw.name,
@@ -304,13 +330,16 @@ export class PlansLoader {
       energyCharges,
       tierRates: tierRates.length > 0 ? tierRates : undefined,
       timeSlots,
+      schedules,
+      seasonStrategy: raw.season_strategy,
       seasons: {
-        summer: { name: 'summer', start: '06-01', end: '09-30' },
-        nonSummer: { name: 'non_summer', start: '10-01', end: '05-31' },
+        summer: { name: 'summer', start: summerDef?.start ?? '06-01', end: summerDef?.end ?? '09-30' },
+        nonSummer: { name: 'non_summer', start: nonSummerDef?.start ?? '10-01', end: nonSummerDef?.end ?? '05-31' },
       },
       billingRules,
       raw: {
         basic_fee: raw.basic_fee || baseCharge,
+        basic_fees: raw.basic_fees,
         billing_rules: billingRules,
       },
     };
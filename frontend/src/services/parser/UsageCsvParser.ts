@@ -0,0 +1,376 @@
+import { CalculationMetrics } from '../calculation/CalculationMetrics';
+
+/**
+ * 用電 CSV 解析統計
+ */
+export interface UsageCsvStatistics {
+  recordCount: number;
+  totalUsageKwh: number;
+  minUsageKwh: number;
+  maxUsageKwh: number;
+  meanUsageKwh: number;
+  zeroCount: number;
+  negativeCount: number;
+}
+
+/**
+ * 用電 CSV 驗證結果
+ */
+export interface UsageCsvValidation {
+  valid: boolean;
+  warnings: string[];
+}
+
+/**
+ * 用電 CSV 解析結果
+ */
+export interface ParsedUsageCsv {
+  /** 各筆資料的時間（epoch 毫秒） */
+  times: Float64Array;
+  /** 各筆資料的用電度數 */
+  usage: Float64Array;
+  start: Date;
+  end: Date;
+  /** 資料間隔（分鐘），取第一個間隔 */
+  intervalMinutes: number | null;
+  statistics: UsageCsvStatistics;
+  validation: UsageCsvValidation;
+}
+
+/**
+ * 分批解析的一批資料
+ */
+export interface UsageCsvBatch {
+  /** 各筆資料的時間（epoch 毫秒） */
+  times: Float64Array;
+  /** 各筆資料的用電度數 */
+  usage: Float64Array;
+}
+
+/**
+ * 分批解析結束時的統計與驗證
+ */
+export interface UsageCsvSummary {
+  start: Date;
+  end: Date;
+  intervalMinutes: number | null;
+  statistics: UsageCsvStatistics;
+  validation: UsageCsvValidation;
+}
+
+const TIMESTAMP_COLUMNS = ['timestamp', 'datetime', 'date_time', 'time', '時間', '日期時間'];
+const USAGE_COLUMNS = ['usage_kwh', 'usage', 'kwh', 'consumption', '用電度數', '度數'];
+
+const TIMESTAMP_PATTERN = /^(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?$/;
+
+/**
+ * 解析時間字串（"YYYY-MM-DD HH:MM[:SS]" 以當地時間解讀，其他格式交給 Date.parse）
+ */
+function parseTimestamp(text: string): number {
+  const match = TIMESTAMP_PATTERN.exec(text);
+  if (match) {
+    const [, year, month, day, hour = '0', minute = '0', second = '0'] = match;
+    return new Date(+year, +month - 1, +day, +hour, +minute, +second).getTime();
+  }
+  return Date.parse(text);
+}
+
+/**
+ * 拆解 CSV 一行：以雙引號包住的欄位可含逗號，欄位內的 "" 表示一個引號
+ */
+function splitCsvLine(line: string): string[] {
+  if (!line.includes('"')) {
+    return line.split(',').map((field) => field.trim());
+  }
+
+  const fields: string[] = [];
+  let field = '';
+  let quoted = false;
+  for (let i = 0; i < line.length; i++) {
+    const ch = line[i];
+    if (quoted) {
+      if (ch !== '"') {
+        field += ch;
+      } else if (line[i + 1] === '"') {
+        field += '"';
+        i++;
+      } else {
+        quoted = false;
+      }
+    } else if (ch === '"') {
+      quoted = true;
+    } else if (ch === ',') {
+      fields.push(field.trim());
+      field = '';
+    } else {
+      field += ch;
+    }
+  }
+  fields.push(field.trim());
+  return fields;
+}
+
+/**
+ * 串流用電 CSV 解析器
+ *
+ * 逐段接收文字，只保留未完成的最後一行，已完成的列直接寫入可成長的具型別陣列，
+ * 統計與驗證資訊在解析同時累計。除輸出陣列外，記憶體用量只與單段文字大小有關，
+ * 多年份的 AMI 匯出檔也不需一次讀入。
+ */
+export class UsageCsvParser {
+  private remainder = '';
+  private headerParsed = false;
+  private timestampColumn = -1;
+  private usageColumn = -1;
+
+  private times = new Float64Array(1024);
+  private usage = new Float64Array(1024);
+  /** 緩衝中的筆數 */
+  private count = 0;
+
+  private recordCount = 0;
+  private lastTime = NaN;
+  private minTime = Infinity;
+  private maxTime = -Infinity;
+  private total = 0;
+  private min = Infinity;
+  private max = -Infinity;
+  private zeroCount = 0;
+  private negativeCount = 0;
+  private droppedCount = 0;
+  private unorderedCount = 0;
+  private duplicateCount = 0;
+  private irregularCount = 0;
+  private intervalMs: number | null = null;
+
+  /**
+   * 解析串流（如 File.stream()）
+   */
+  static async parseStream(stream: ReadableStream<Uint8Array>): Promise<ParsedUsageCsv> {
+    const parser = new UsageCsvParser();
+    const decoder = new TextDecoder('utf-8');
+    const reader = stream.getReader();
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      CalculationMetrics.increment('csv_bytes', value.byteLength);
+      CalculationMetrics.time('csv_parse', () => parser.push(decoder.decode(value, { stream: true })));
+    }
+    parser.push(decoder.decode());
+    return CalculationMetrics.time('csv_parse', () => parser.finish());
+  }
+
+  /**
+   * 分批解析串流：緩衝達 batchSize 筆即輸出一批並清空，
+   * 記憶體用量只與批次大小有關，可邊讀邊計費。產生器的回傳值為整份資料的統計與驗證。
+   */
+  static async *batches(
+    stream: ReadableStream<Uint8Array>,
+    batchSize = 8192
+  ): AsyncGenerator<UsageCsvBatch, UsageCsvSummary> {
+    const parser = new UsageCsvParser();
+    const decoder = new TextDecoder('utf-8');
+    const reader = stream.getReader();
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      CalculationMetrics.increment('csv_bytes', value.byteLength);
+      CalculationMetrics.time('csv_parse', () => parser.push(decoder.decode(value, { stream: true })));
+      if (parser.count >= batchSize) {
+        yield parser.takeBatch();
+      }
+    }
+    parser.push(decoder.decode());
+    parser.flush();
+    if (parser.count > 0) {
+      yield parser.takeBatch();
+    }
+    return parser.summary();
+  }
+
+  /**
+   * 解析檔案
+   */
+  static parseFile(file: Blob): Promise<ParsedUsageCsv> {
+    return this.parseStream(file.stream());
+  }
+
+  /**
+   * 解析完整文字
+   */
+  static parseText(text: string): ParsedUsageCsv {
+    CalculationMetrics.increment('csv_bytes', text.length);
+    return CalculationMetrics.time('csv_parse', () => {
+      const parser = new UsageCsvParser();
+      parser.push(text);
+      return parser.finish();
+    });
+  }
+
+  /**
+   * 接收一段文字
+   */
+  push(chunk: string): void {
+    const text = this.remainder + chunk;
+    let lineStart = 0;
+    let newline = text.indexOf('\n', lineStart);
+    while (newline >= 0) {
+      this.parseLine(text.slice(lineStart, newline));
+      lineStart = newline + 1;
+      newline = text.indexOf('\n', lineStart);
+    }
+    this.remainder = text.slice(lineStart);
+  }
+
+  /**
+   * 結束解析並回傳結果
+   */
+  finish(): ParsedUsageCsv {
+    this.flush();
+    const summary = this.summary();
+    return { ...this.takeBatch(), ...summary };
+  }
+
+  /**
+   * 解析最後一行未以換行結尾的資料
+   */
+  private flush(): void {
+    if (this.remainder) {
+      this.parseLine(this.remainder);
+      this.remainder = '';
+    }
+  }
+
+  /**
+   * 取出緩衝中的資料並清空緩衝
+   */
+  private takeBatch(): UsageCsvBatch {
+    const batch = {
+      times: this.times.slice(0, this.count),
+      usage: this.usage.slice(0, this.count),
+    };
+    this.count = 0;
+    return batch;
+  }
+
+  private summary(): UsageCsvSummary {
+    if (!this.headerParsed) {
+      throw new Error('CSV 檔案沒有內容');
+    }
+    if (this.recordCount === 0) {
+      throw new Error('CSV 檔案沒有有效的用電數值');
+    }
+
+    const warnings: string[] = [];
+    if (this.droppedCount > 0) {
+      warnings.push(`已略過 ${this.droppedCount} 筆時間或用電數值無效的資料`);
+    }
+    if (this.negativeCount > 0) {
+      warnings.push(`有 ${this.negativeCount} 筆負值用電（negative usage）`);
+    }
+    if (this.zeroCount > 0) {
+      warnings.push(`有 ${this.zeroCount} 筆用電為 0`);
+    }
+    if (this.unorderedCount > 0) {
+      warnings.push(`有 ${this.unorderedCount} 筆資料時間未依序排列`);
+    }
+    if (this.duplicateCount > 0) {
+      warnings.push(`有 ${this.duplicateCount} 筆資料時間與前一筆重複`);
+    }
+    if (this.irregularCount > 0) {
+      warnings.push(`有 ${this.irregularCount} 個資料間隔與第一個間隔不同`);
+    }
+
+    return {
+      start: new Date(this.minTime),
+      end: new Date(this.maxTime),
+      intervalMinutes: this.intervalMs === null ? null : this.intervalMs / 60000,
+      statistics: {
+        recordCount: this.recordCount,
+        totalUsageKwh: this.total,
+        minUsageKwh: this.min,
+        maxUsageKwh: this.max,
+        meanUsageKwh: this.total / this.recordCount,
+        zeroCount: this.zeroCount,
+        negativeCount: this.negativeCount,
+      },
+      // 負值與 0 度只是提醒；略過、順序錯亂、重複或間隔不一的資料會影響計費，視為無效
+      validation: {
+        valid: this.droppedCount === 0 && this.unorderedCount === 0 && this.duplicateCount === 0 && this.irregularCount === 0,
+        warnings,
+      },
+    };
+  }
+
+  private parseLine(rawLine: string): void {
+    const line = rawLine.endsWith('\r') ? rawLine.slice(0, -1) : rawLine;
+    if (line.trim() === '') return;
+
+    const fields = splitCsvLine(line);
+    if (!this.headerParsed) {
+      this.parseHeader(fields);
+      return;
+    }
+
+    const time = parseTimestamp(fields[this.timestampColumn] ?? '');
+    const usageText = fields[this.usageColumn] ?? '';
+    const value = usageText === '' ? NaN : Number(usageText);
+    if (Number.isNaN(time) || !Number.isFinite(value)) {
+      this.droppedCount++;
+      return;
+    }
+
+    this.append(time, value);
+  }
+
+  private parseHeader(fields: string[]): void {
+    const names = fields.map((field) => field.replace(/^\uFEFF/, '').toLowerCase());
+    this.timestampColumn = names.findIndex((name) => TIMESTAMP_COLUMNS.includes(name));
+    this.usageColumn = names.findIndex((name) => USAGE_COLUMNS.includes(name));
+    if (this.timestampColumn < 0) {
+      throw new Error(`找不到時間欄位（timestamp），可用欄位：${TIMESTAMP_COLUMNS.join('、')}`);
+    }
+    if (this.usageColumn < 0) {
+      throw new Error(`找不到用電欄位（usage），可用欄位：${USAGE_COLUMNS.join('、')}`);
+    }
+    this.headerParsed = true;
+  }
+
+  private append(time: number, value: number): void {
+    if (this.count === this.times.length) {
+      const times = new Float64Array(this.count * 2);
+      const usage = new Float64Array(this.count * 2);
+      times.set(this.times);
+      usage.set(this.usage);
+      this.times = times;
+      this.usage = usage;
+    }
+
+    if (this.recordCount > 0) {
+      const interval = time - this.lastTime;
+      if (interval === 0) {
+        this.duplicateCount++;
+      } else if (interval < 0) {
+        this.unorderedCount++;
+      } else if (this.intervalMs === null) {
+        this.intervalMs = interval;
+      } else if (interval !== this.intervalMs) {
+        this.irregularCount++;
+      }
+    }
+
+    this.times[this.count] = time;
+    this.usage[this.count] = value;
+    this.count++;
+    this.recordCount++;
+    this.lastTime = time;
+    if (time < this.minTime) this.minTime = time;
+    if (time > this.maxTime) this.maxTime = time;
+
+    this.total += value;
+    if (value < this.min) this.min = value;
+    if (value > this.max) this.max = value;
+    if (value === 0) this.zeroCount++;
+    if (value < 0) this.negativeCount++;
+  }
+}
@@ -0,0 +1,136 @@
+import { describe, it, expect } from 'vitest';
+import { UsageCsvParser } from '../UsageCsvParser';
+
+describe('UsageCsvParser', () => {
+  const sample = [
+    'timestamp,usage_kwh',
+    '2025-07-01 00:00,1.2',
+    '2025-07-01 01:00,0.0',
+    '2025-07-01 02:00,-0.5',
+    '2025-07-01 03:00,1.0',
+    '',
+  ].join('\r\n');
+
+  it('應解析時間與用電並計算統計', () => {
+    const result = UsageCsvParser.parseText(sample);
+
+    expect(Array.from(result.usage)).toEqual([1.2, 0, -0.5, 1.0]);
+    expect(result.start.getTime()).toBe(new Date(2025, 6, 1, 0).getTime());
+    expect(result.end.getTime()).toBe(new Date(2025, 6, 1, 3).getTime());
+    expect(result.intervalMinutes).toBe(60);
+    expect(result.statistics).toMatchObject({ recordCount: 4, minUsageKwh: -0.5, maxUsageKwh: 1.2, zeroCount: 1, negativeCount: 1 });
+    expect(result.statistics.totalUsageKwh).toBeCloseTo(1.7, 10);
+    expect(result.validation.valid).toBe(true);
+    expect(result.validation.warnings.some((w) => w.includes('negative'))).toBe(true);
+  });
+
+  it('分段接收的結果應與一次解析相同（含跨段的行）', () => {
+    const lines = ['\uFEFF時間,用電度數'];
+    for (let i = 0; i < 3000; i++) {
+      lines.push(`2025/01/01 ${String(Math.floor(i / 4) % 24).padStart(2, '0')}:${String((i % 4) * 15).padStart(2, '0')},${(i % 9) / 10}`);
+    }
+    const text = lines.join('\n');
+
+    const parser = new UsageCsvParser();
+    for (let i = 0; i < text.length; i += 37) {
+      parser.push(text.slice(i, i + 37));
+    }
+    const chunked = parser.finish();
+    const whole = UsageCsvParser.parseText(text);
+
+    expect(chunked.statistics).toEqual(whole.statistics);
+    expect(Array.from(chunked.usage)).toEqual(Array.from(whole.usage));
+    expect(chunked.statistics.recordCount).toBe(3000);
+  });
+
+  it('應由位元組串流解析', async () => {
+    const bytes = new TextEncoder().encode(sample);
+    const stream = new ReadableStream<Uint8Array>({
+      start(controller) {
+        for (let i = 0; i < bytes.length; i += 5) {
+          controller.enqueue(bytes.slice(i, i + 5));
+        }
+        controller.close();
+      },
+    });
+
+    const result = await UsageCsvParser.parseStream(stream);
+
+    expect(result.statistics.recordCount).toBe(4);
+  });
+
+  it('分批解析應依批次大小輸出，合併後與一次解析相同', async () => {
+    const lines = ['timestamp,usage_kwh'];
+    for (let i = 0; i < 1000; i++) {
+      lines.push(`2025-07-${String(1 + Math.floor(i / 96)).padStart(2, '0')} ${String(Math.floor(i / 4) % 24).padStart(2, '0')}:${String((i % 4) * 15).padStart(2, '0')},${(i % 7) / 10}`);
+    }
+    const text = lines.join('\n');
+    const bytes = new TextEncoder().encode(text);
+    const stream = new ReadableStream<Uint8Array>({
+      start(controller) {
+        for (let i = 0; i < bytes.length; i += 512) {
+          controller.enqueue(bytes.slice(i, i + 512));
+        }
+        controller.close();
+      },
+    });
+
+    const batches = UsageCsvParser.batches(stream, 100);
+    const usage: number[] = [];
+    let batchCount = 0;
+    let next = await batches.next();
+    while (!next.done) {
+      batchCount++;
+      expect(next.value.times.length).toBe(next.value.usage.length);
+      usage.push(...next.value.usage);
+      next = await batches.next();
+    }
+    const whole = UsageCsvParser.parseText(text);
+
+    expect(batchCount).toBeGreaterThan(1);
+    expect(usage).toEqual(Array.from(whole.usage));
+    expect(next.value.statistics).toEqual(whole.statistics);
+    expect(next.value.intervalMinutes).toBe(15);
+  });
+
+  it('無效的用電數值應略過並警告', () => {
+    const result = UsageCsvParser.parseText('timestamp,usage_kwh\n2025-07-01 00:00,abc\n2025-07-01 01:00,1.2\n');
+
+    expect(result.statistics.recordCount).toBe(1);
+    expect(result.validation.warnings[0]).toContain('略過 1 筆');
+    expect(result.validation.valid).toBe(false);
+  });
+
+  it('時間未依序或重複時應標為無效，起訖取最早與最晚時間', () => {
+    const result = UsageCsvParser.parseText([
+      'timestamp,usage_kwh',
+      '2025-07-01 02:00,1',
+      '2025-07-01 00:00,1',
+      '2025-07-01 03:00,1',
+      '2025-07-01 03:00,1',
+    ].join('\n'));
+
+    expect(result.start.getTime()).toBe(new Date(2025, 6, 1, 0).getTime());
+    expect(result.end.getTime()).toBe(new Date(2025, 6, 1, 3).getTime());
+    expect(result.validation.valid).toBe(false);
+    expect(result.validation.warnings.some((w) => w.includes('未依序'))).toBe(true);
+    expect(result.validation.warnings.some((w) => w.includes('重複'))).toBe(true);
+  });
+
+  it('應正確拆解以引號包住含逗號的欄位', () => {
+    const result = UsageCsvParser.parseText([
+      '"meter, name","timestamp","usage_kwh"',
+      '"A, ""main""","2025-07-01 00:00"," 1.5 "',
+      '"B",2025-07-01 01:00,2',
+    ].join('\n'));
+
+    expect(Array.from(result.usage)).toEqual([1.5, 2]);
+    expect(result.validation.valid).toBe(true);
+  });
+
+  it('缺少必要欄位或沒有資料時應拋出錯誤', () => {
+    expect(() => UsageCsvParser.parseText('dt,usage_kwh\n2025-07-01 00:00,1.2\n')).toThrow('timestamp');
+    expect(() => UsageCsvParser.parseText('timestamp,value\n2025-07-01 00:00,1.2\n')).toThrow('usage');
+    expect(() => UsageCsvParser.parseText('timestamp,usage_kwh\n')).toThrow('沒有有效的用電數值');
+  });
+});
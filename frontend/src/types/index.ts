@@ -48,6 +48,14 @@ export interface TimeSlot {
   end: string;   // "HH:MM"
 }
 
+/**
+ * 時段排程（含季節與日期型別）
+ */
+export interface ScheduleSlot extends TimeSlot {
+  season: Season['name'];
+  dayType: DayType;
+}
+
 /**
  * 每日用電模式
  */
@@ -102,6 +110,54 @@ export interface MinimumUsageRule {
   kwh_per_ampere_over?: number;
 }
 
+/**
+ * 基本電費項目（plans.json basic_fees）
+ */
+export interface BasicFeeRate {
+  label: string;
+  unit: string;
+  cost?: number;
+  summer?: number;
+  non_summer?: number;
+}
+
+/**
+ * 超約附加費規則：超出契約容量 threshold_ratio 以內按 rate_low 倍、超出部分按 rate_high 倍計收
+ */
+export interface OverContractPenaltyRule {
+  threshold_ratio: number;
+  rate_low: number;
+  rate_high: number;
+  base_fee_label?: string;
+  tier?: string;
+}
+
+/**
+ * 功率因數調整規則：以 base_percent 為準，每差 1% 增減電費 step_percent%，
+ * 功率因數超過 max_discount_percent 的部分不再減收
+ */
+export interface PowerFactorAdjustmentRule {
+  base_percent?: number;
+  max_discount_percent?: number;
+  step_percent?: number;
+  apply_to: 'total' | 'energy';
+}
+
+/**
+ * 契約容量基本電費計算方式（各類契約對應的 basic_fees 標籤）
+ */
+export interface BasicFeeFormula {
+  type: 'two_stage' | 'three_stage' | 'regular_only';
+  regular_label: string;
+  non_summer_label?: string;
+  semi_peak_label?: string;
+  saturday_label?: string;
+  off_peak_label?: string;
+  /** 週六半尖峰與離峰契約容量在經常契約容量此比例以內免收基本電費 */
+  weekend_ratio?: number;
+  household_label?: string;
+}
+
 /**
  * 計費規則
  */
@@ -110,6 +166,10 @@ export interface BillingRules {
   minimum_usage_rules_ref?: string;
   billing_cycle_months?: number;
   over_2000_kwh_surcharge?: { threshold_kwh: number; cost_per_kwh: number };
+  over_contract_penalty?: OverContractPenaltyRule;
+  zero_usage_basic_fee_ratio?: number;
+  power_factor_adjustment?: PowerFactorAdjustmentRule;
+  basic_fee_formula?: BasicFeeFormula;
 }
 
 /**
@@ -141,9 +201,15 @@ export interface Plan {
     sundayHoliday: TimeSlot[];
   };
 
+  // 依季節區分的完整時段排程（時段查表用）
+  schedules?: ScheduleSlot[];
+
   // 累進費率專用
   tierRates?: TierRate[];
 
+  // 季節策略（seasons 或 seasons_high_voltage）
+  seasonStrategy?: string;
+
   // 季節定義
   seasons: {
     summer: Season;
@@ -156,6 +222,7 @@ export interface Plan {
   // 原始資料（用於訪問最低用電規則等）
   raw?: {
     basic_fee?: number;
+    basic_fees?: BasicFeeRate[];
     billing_rules?: BillingRules;
   };
 }
@@ -180,6 +247,7 @@ export interface BasicChargeRate {
 export interface EnergyChargeRate {
   period: Period;
   rate: number; // 元/kWh
+  dayType?: DayType; // 僅適用於特定日期型別的費率
 }
 
 /**
@@ -294,6 +362,8 @@ export interface CalculationInput {
   voltageV?: number; // 實際電壓值 (110, 220, etc.) - 用於最低用電計算
   phase: 'single' | 'three';
   contractCapacity?: number;
+  /** 累進級距上限倍數（預設 1，即單月計費） */
+  cycleMonths?: number;
   estimationSettings?: {
     mode: EstimationMode;
     season: 'summer' | 'non_summer';
@@ -305,6 +375,17 @@ export interface CalculationInput {
   };
 }
 
+/**
+ * 電號的計費條件（未指定的欄位沿用 RateCalculator 的預設值）
+ */
+export interface BillingInputs {
+  voltageType?: CalculationInput['voltageType'];
+  voltageV?: number;
+  phase?: CalculationInput['phase'];
+  /** 契約容量（安培） */
+  contractCapacity?: number;
+}
+
 /**
  * 費用明細
  */
@@ -376,6 +457,65 @@ export interface PlanCalculationResult {
   seasonInfo: SeasonInfo;
 }
 
+/**
+ * 計算失敗的方案
+ */
+export interface FailedPlan {
+  planId: string;
+  error: string;
+}
+
+/**
+ * 方案比較結果
+ */
+export interface PlanComparisonResult {
+  comparison: PlanCalculationResult[]; // 依總電費排序，rank 從 1 開始
+  failedPlans: FailedPlan[];
+  cheapestPlanId: string | null;
+  savingsVsMostExpensive: number;
+}
+
+/**
+ * 方案排名
+ */
+export interface PlanRanking {
+  planId: string;
+  total: number;
+  rank: number;
+  difference: number; // 與最便宜方案的差額
+}
+
+/**
+ * 串流比較事件：每個方案算完即送出 result 或 failed，最後送出 summary
+ */
+export type PlanComparisonEvent =
+  | { type: 'result'; result: PlanCalculationResult }
+  | { type: 'failed'; failure: FailedPlan }
+  | {
+      type: 'summary';
+      ranking: PlanRanking[];
+      failedPlans: FailedPlan[];
+      cheapestPlanId: string | null;
+      savingsVsMostExpensive: number;
+    };
+
+/**
+ * 批次計算項目
+ */
+export interface BatchCalculationItem {
+  planId: string;
+  input: CalculationInput;
+}
+
+/**
+ * 批次計算項目結果（成功時有 result，失敗時有 error）
+ */
+export interface BatchCalculationItemResult {
+  planId: string;
+  result?: PlanCalculationResult;
+  error?: string;
+}
+
 /**
  * 計算回應
  */